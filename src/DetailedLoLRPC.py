@@ -15,14 +15,19 @@ from lcu_driver import Connector
 try:
     from .utilities import (
         GITHUBURL, CLIENTID,
-        fetchConfig, procPath, addLog, logger,
+        fetchConfig, fetchConfigSnapshot, procPath, addLog, logger,
         register_config_changed_callback, release_lock
     )
     from .cdngen import mapIcon, rankedEmblem, availabilityImg, profileIcon, localeDiscordStrings, localeChatStrings
     from .disabler import disableNativePresence
     import src.tray_icon as tray_module
-    from .modes import updateInProgressRPC
-    from .lcu import LcuManager
+    from .modes import updateInProgressRPC, SkinPresentationPrefetcher
+    from .polling import AdaptivePollScheduler
+    from .gamestats import close_live_client_session
+    from .catalog import skin_catalog, champion_index
+    from .presence import PresenceSink, PresenceDispatcher, PresenceState, PresenceRenderLoop, PRESENCE_CLEAR
+    from .lcustate import RankedStatsStore, LobbyState, GameflowPhaseState
+    from .lcu import LcuManager, LcuEventCoalescer
     from . import gui as gui_module
     from . import updater 
 except ImportError as e:
@@ -42,6 +47,8 @@ INITIAL_SUMMONER_FETCH_RETRY_DELAY = 2
 IDLE_STATE_CONFIRMATION_DELAY = 1.5
 RCS_UX_WAIT_TIMEOUT = 30
 LCU_DISCONNECT_SHUTDOWN_DELAY = 10
+LCU_BOOTSTRAP_STEP_TIMEOUT = 10 # Per optional startup step; the presence starts without that step's data if it times out
+LOCALE_STRINGS_FETCH_TIMEOUT = 10
 
 MAP_ICON_STYLE_TO_ASSET_KEY = {
     "Active": "game-select-icon-active",
@@ -52,6 +59,12 @@ MAP_ICON_STYLE_TO_ASSET_KEY = {
 }
 DEFAULT_MAP_ICON_KEY = "game-select-icon-active"
 
+ACTIVE_GAMEFLOW_PHASES = ("Lobby", "Matchmaking", "ChampSelect", "InProgress")
+IDLE_GAMEFLOW_PHASES = ("None", "TerminatedInError", "WaitingForStats", "PreEndOfGame", "EndOfGame")
+POST_GAME_PHASES = ("PreEndOfGame", "EndOfGame") # Presence is cleared rather than set to idle
+FALLBACK_LOCALE_STRINGS = {"bot": "Bot Game", "champSelect": "Champion Select", "lobby": "In Lobby", "inGame": "In Game", "inQueue": "In Queue", "custom": "Custom Game", "practicetool": "Practice Tool", "away": "Away", "chat": "Online", "dnd": "Do Not Disturb"}
+PHASE_TRAY_STATUS = {"Lobby": "Status: In Lobby", "Matchmaking": "Status: In Queue", "ChampSelect": "Status: In Champ Select", "InProgress": "Status: In Game"}
+
 
 class DetailedLoLRPC:
     def __init__(self):
@@ -62,27 +75,39 @@ class DetailedLoLRPC:
             self._main_loop_ref = None
 
         self.rpc = Presence(client_id=CLIENTID, loop=self._main_loop_ref)
+        self.presence_sink = PresenceSink(self.rpc) # Skips payloads that would not change what Discord shows
         self.connector = Connector(loop=self._main_loop_ref) 
         self.lcu_manager = LcuManager(self.connector)
+        self.lcu_events = LcuEventCoalescer() # Collapses bursts of websocket UPDATEs per URI
 
         self.lcu_connected = False
         self.rpc_connected = False
         self.shutting_down = False
         self.rpc_lock = asyncio.Lock()
+        # Every presence write goes through the dispatcher: latest payload wins, paced to Discord's rate limit
+        self.presence_dispatcher = PresenceDispatcher(self.presence_sink, self.rpc_lock,
+                                                      is_connected=lambda: self.rpc_connected,
+                                                      on_pipe_error=self._on_presence_pipe_error)
+        # Handlers only update the presence state; one render loop derives the presence from it
+        self.presence_state = PresenceState()
+        self.presence_renderer = PresenceRenderLoop(self.presence_state, self._derive_presence, self.presence_dispatcher)
 
         self.summoner_data = {}
+        self.ranked_stats = RankedStatsStore() # Kept current by the ranked stats websocket
+        self.lobby_state = LobbyState() # Kept current by the lobby websocket
+        self.gameflow_phase = GameflowPhaseState() # Kept current by the gameflow websockets
         self.locale_strings = {}
         self.current_champ_selection = (0, 0)
+        self.skin_prefetcher = SkinPresentationPrefetcher() # Resolves the in-game skin art during champ select
         self.ingame_rpc_task = None
+        self.ingame_poll_scheduler = None
         self._delayed_idle_handler_task = None
         self._lcu_disconnect_shutdown_task = None
+        self._lcu_bootstrap_task = None # Loads locale strings, ranks and lobby in the background after connecting
         self._final_exit_code = 0
 
         self.config_changed_event = asyncio.Event()
         self._config_watcher_task = None
-        self.last_gameflow_event_data = None
-        self.last_chat_event_data = None
-        self.last_connection_obj_for_refresh = None
         self.current_map_icon_asset_key_name = MAP_ICON_STYLE_TO_ASSET_KEY.get(fetchConfig("mapIconStyle"), DEFAULT_MAP_ICON_KEY)
 
         self._register_lcu_handlers()
@@ -123,22 +148,14 @@ class DetailedLoLRPC:
             try:
                 await self.config_changed_event.wait()
                 if self.shutting_down: break
-                self.current_map_icon_asset_key_name = MAP_ICON_STYLE_TO_ASSET_KEY.get(
-                    fetchConfig("mapIconStyle"), DEFAULT_MAP_ICON_KEY
-                )
-                
-                # If RPC mute state changed, we might need to clear current presence
-                if 'isRpcMuted' in self.config_changed_event._flag_name_for_debug if hasattr(self.config_changed_event, '_flag_name_for_debug') else True: # Heuristic
-                    if fetchConfig("isRpcMuted") and self.rpc_connected:
-                        logger.info("RPC Mute enabled, clearing presence.")
-                        await self._update_rpc_presence(clear=True) # Ensure presence is cleared if muted
-                    elif not fetchConfig("isRpcMuted"):
-                         logger.info("RPC Unmuted, refreshing presence.")
-                         # Refresh will be handled by the create_task below
-                
-                logger.info(f"Config change detected. Refreshing presence. Muted: {fetchConfig('isRpcMuted')}")
-                asyncio.create_task(self.refresh_current_presence())
                 self.config_changed_event.clear()
+                config = fetchConfigSnapshot()
+                self.current_map_icon_asset_key_name = MAP_ICON_STYLE_TO_ASSET_KEY.get(config.mapIconStyle, DEFAULT_MAP_ICON_KEY)
+                if self.ingame_poll_scheduler and self.ingame_rpc_task and not self.ingame_rpc_task.done():
+                    self.ingame_poll_scheduler.wake("config changed")
+
+                logger.info(f"Config change detected. Re-rendering presence. Muted: {config.isRpcMuted}")
+                self.presence_state.update("config") # Mute, ranks, idle options etc. are applied by the render loop
             except asyncio.CancelledError:
                 logger.debug("Config change listener task cancelled.")
                 break
@@ -148,78 +165,164 @@ class DetailedLoLRPC:
                 await asyncio.sleep(5)
         logger.debug("Config change listener stopped.")
 
-    async def refresh_current_presence(self):
-        logger.info("Attempting to refresh current presence...")
-        if fetchConfig("isRpcMuted"):
-            logger.info("RPC is muted. Clearing presence if connected, otherwise ensuring it stays clear.")
-            if self.rpc_connected:
-                await self._update_rpc_presence(clear=True)
+    async def _resync_presence_state(self, connection):
+        """Rebuilds the presence state from the LCU after (re)connecting. Events keep it current afterwards."""
+        phase = await self.gameflow_phase.current(connection) # From memory once an event was seen
+        if phase is None:
+            logger.warning("Resync: Could not get current gameflow phase.")
             return
-
-        if not self.lcu_connected or not self.lcu_manager.current_connection:
-            logger.warning("Cannot refresh presence: LCU not connected or no active connection object.")
-            await self._update_rpc_presence(clear=True)
-            return
-
-        connection = self.lcu_manager.current_connection
-        if self.ingame_rpc_task and not self.ingame_rpc_task.done():
-            logger.debug("In-game task is active; it will pick up config changes.")
+        logger.info(f"Resync: Live phase is '{phase}'.")
+
+        session = self.presence_state.session
+        if phase in ACTIVE_GAMEFLOW_PHASES and (not session or session.get('phase') != phase):
+            gameflow_session_resp = await connection.request('get', '/lol-gameflow/v1/session')
+            if gameflow_session_resp and gameflow_session_resp.status == 200:
+                try: session = await gameflow_session_resp.json()
+                except JSONDecodeError: logger.error(f"Resync: Error parsing session for '{phase}'.")
+            else: logger.warning(f"Resync: Failed to get session for '{phase}'.")
+        self.presence_state.update("resync", session=session)
+        await self._on_phase(connection, self.gameflow_phase.phase)
+
+    async def _on_phase(self, connection, phase):
+        """Applies the gameflow phase to the presence state and runs the side effects of entering it."""
+        if phase == self.presence_state.phase:
+            await self._sync_ingame_task(connection) # The session may have caught up with the phase
             return
-
-        gameflow_phase_resp = await connection.request('get', '/lol-gameflow/v1/gameflow-phase')
-        live_phase_from_http = None
-        if gameflow_phase_resp and gameflow_phase_resp.status == 200:
-            try:
-                live_phase_from_http_raw = await gameflow_phase_resp.json()
-                live_phase_from_http = str(live_phase_from_http_raw).strip('"') if isinstance(live_phase_from_http_raw, (str, int, float, bool)) else "Unknown"
-            except JSONDecodeError:
-                logger.error("Refresh Presence: Error parsing gameflow phase JSON.")
-                await self._update_rpc_presence(clear=True); return
-        else:
-            logger.warning("Refresh Presence: Could not get current gameflow phase. Clearing RPC.")
-            await self._update_rpc_presence(clear=True); return
+        logger.info(f"Gameflow phase: '{self.presence_state.phase}' -> '{phase}'.")
+        self.presence_state.update("phase", phase=phase)
+        await self._cancel_delayed_idle_task()
+        if phase != "InProgress": await self._cancel_ingame_task()
+        if phase in PHASE_TRAY_STATUS: tray_module.updateStatus(PHASE_TRAY_STATUS[phase])
+
+        if phase in IDLE_GAMEFLOW_PHASES:
+            self._delayed_idle_handler_task = asyncio.create_task(self._confirm_idle_state(connection))
+        elif phase in ACTIVE_GAMEFLOW_PHASES and phase != "InProgress" and (self._lcu_bootstrap_task is None or self._lcu_bootstrap_task.done()):
+            # The lobby presence reads ranks and party size from memory; load them now if priming at startup failed
+            if not self.ranked_stats.ready and await self.ranked_stats.prime(connection): self.presence_state.update("ranked")
+            if not self.lobby_state.ready and await self.lobby_state.prime(connection): self.presence_state.update("lobby")
+        await self._sync_ingame_task(connection)
+
+    async def _sync_ingame_task(self, connection):
+        """Starts the in-game loop once both the phase and the gameflow session say InProgress."""
+        session = self.presence_state.session
+        if self.presence_state.phase != "InProgress" or not session or session.get('phase') != "InProgress": return
+        if self.ingame_rpc_task and not self.ingame_rpc_task.done(): return
+        game_data = session.get('gameData', {}); queue_data = game_data.get('queue', {}); map_data = session.get('map', {})
+        self.ingame_poll_scheduler = AdaptivePollScheduler()
+        self.ingame_rpc_task = asyncio.create_task(updateInProgressRPC(lambda: not self.lcu_connected or self.shutting_down, int(time()), self.current_champ_selection, map_data, self._map_icon_path(map_data), queue_data, game_data, self.summoner_data.get('internalName'), self.summoner_data.get('displayName'), connection, self.summoner_data.get('summonerId'), self.locale_strings, self.presence_state, self.ingame_poll_scheduler, self.skin_prefetcher.take(*self.current_champ_selection)))
+
+    def _map_icon_path(self, map_data):
+        map_asset_data = map_data.get("assets")
+        if not map_asset_data: return None
+        return map_asset_data.get(self.current_map_icon_asset_key_name) or map_asset_data.get(DEFAULT_MAP_ICON_KEY)
+
+    def _derive_presence(self):
+        """
+        The presence reducer: derives what Discord should show from the presence state and config.
+        Returns a payload, PRESENCE_CLEAR, or None to keep the current presence. Makes no requests.
+        """
+        state = self.presence_state; config = fetchConfigSnapshot()
+        if config.isRpcMuted or not state.lcu_connected: return PRESENCE_CLEAR
+        if not self.locale_strings: return None
+        phase = state.phase
+        if phase == "InProgress": return state.in_game # Rendered by the in-game loop; None until its first frame
+        if phase in ACTIVE_GAMEFLOW_PHASES: return self._gameflow_presence(config, phase, state.session or {})
+        if phase in IDLE_GAMEFLOW_PHASES:
+            if not state.idle_confirmed: return None # Don't flash the idle presence on brief passes through these phases
+            if phase in POST_GAME_PHASES or config.idleStatus == 0 or not state.chat: return PRESENCE_CLEAR
+            return self._idle_presence(config, state.chat, state.idle_since)
+        return None # Unknown phases (ReadyCheck, GameStart...) keep the current presence
+
+    def _gameflow_presence(self, config, phase, session):
+        game_data = session.get('gameData', {}); queue_data = game_data.get('queue', {}); map_data = session.get('map', {})
+        if phase == "Lobby" and queue_data.get("mapId") == 0 and not map_data.get('name'): return PRESENCE_CLEAR
+        map_icon_path = self._map_icon_path(map_data)
+        if not map_icon_path: logger.debug(f"No map icon for phase {phase}. Map: {map_data.get('name')}")
+
+        queue_desc = queue_data.get('description', "Unknown Mode")
+        if queue_data.get("type") == "BOT": queue_desc = f"{self.locale_strings.get('bot', 'Bot')} {queue_desc}"
+        if queue_data.get("category") == "Custom": queue_desc = self.locale_strings.get('custom', 'Custom Game')
+        if queue_data.get('gameMode') == "PRACTICETOOL": queue_desc = self.locale_strings.get('practicetool', 'Practice Tool')
+
+        rank_emblem_url, small_text_str = None, None
+        current_queue_type = queue_data.get("type")
+        if current_queue_type and config.showRanks.get(current_queue_type, False):
+            queue_rank_info = self.ranked_stats.get(current_queue_type) # From memory, kept current by the websocket
+            if queue_rank_info and queue_rank_info.get("tier", "") not in ("", "NONE", "UNRANKED"):
+                tier = queue_rank_info['tier'].capitalize(); division = queue_rank_info['division']
+                small_text_parts_temp = [f"{tier} {division}"]
+                rank_emblem_url = rankedEmblem(queue_rank_info['tier'])
+                if config.rankedStats.get("lp"): small_text_parts_temp.append(f"{queue_rank_info.get('leaguePoints', 0)} LP")
+                if config.rankedStats.get("w"): small_text_parts_temp.append(f"{queue_rank_info.get('wins', 0)}W")
+                if config.rankedStats.get("l"): small_text_parts_temp.append(f"{queue_rank_info.get('losses', 0)}L")
+                small_text_str = " • ".join(small_text_parts_temp)
+
+        rpc_base = {"details": f"{map_data.get('name', 'Unknown Map')} ({queue_desc})", "large_text": map_data.get('name'), "small_image": rank_emblem_url, "small_text": small_text_str, "large_image": mapIcon(map_icon_path) if map_icon_path else None}
+        if phase == "Lobby":
+            rpc_base["state"] = self.locale_strings.get('lobby', 'In Lobby')
+            if config.showPartyInfo and queue_data.get("maximumParticipantListSize", 0) > 0: rpc_base["party_size"] = [self.lobby_state.member_count, queue_data["maximumParticipantListSize"]]
+        elif phase == "Matchmaking":
+            rpc_base["state"] = self.locale_strings.get('inQueue', 'In Queue'); rpc_base["start"] = self.presence_state.phase_started_at
+        elif phase == "ChampSelect":
+            rpc_base["state"] = self.locale_strings.get('champSelect', 'Champion Select')
+        return {k: v for k, v in rpc_base.items() if v is not None}
+
+    def _idle_presence(self, config, chat_data, idle_since):
+        availability = chat_data.get("availability", "chat").lower(); status_message = chat_data.get("statusMessage")
+        availability_text = self.locale_strings.get(availability, chat_data.get("availability", "Online"))
+        if config.idleStatus == 1:
+            profile_display_config = config.idleProfileInfoDisplay
+            large_text_parts = []
+            if profile_display_config.get("showRiotId"):
+                large_text_parts.append(self.summoner_data.get('gameName', 'Player'))
+            if profile_display_config.get("showTagLine") and self.summoner_data.get('tagLine'):
+                if not large_text_parts or not profile_display_config.get("showRiotId"): 
+                    large_text_parts.append(f"#{self.summoner_data.get('tagLine')}")
+                else: 
+                    large_text_parts[-1] += f"#{self.summoner_data.get('tagLine')}"
             
-        logger.info(f"Refresh Presence: Live phase is '{live_phase_from_http}'.")
-
-        actively_managed_by_gameflow = ("Lobby", "Matchmaking", "ChampSelect", "InProgress")
-        idle_or_post_game_phases = ("None", "TerminatedInError", "WaitingForStats", "PreEndOfGame", "EndOfGame")
-        
-        phase_to_process = live_phase_from_http
-        data_for_event = None
-        last_event_phase = self.last_gameflow_event_data.get('phase') if self.last_gameflow_event_data else None
-
-        if live_phase_from_http in actively_managed_by_gameflow and last_event_phase in idle_or_post_game_phases:
-            logger.warning(f"Refresh Presence: HTTP phase '{live_phase_from_http}' conflicts with last event '{last_event_phase}'. Using last event.")
-            phase_to_process = last_event_phase
-            data_for_event = self.last_gameflow_event_data
-        
-        if phase_to_process in actively_managed_by_gameflow:
-            if not data_for_event or data_for_event.get('phase') != phase_to_process:
-                gameflow_session_resp = await connection.request('get', '/lol-gameflow/v1/session')
-                if gameflow_session_resp and gameflow_session_resp.status == 200:
-                    try: data_for_event = await gameflow_session_resp.json()
-                    except JSONDecodeError: logger.error(f"Refresh: Error parsing session for '{phase_to_process}'."); await self._update_rpc_presence(clear=True); return
-                else: logger.warning(f"Refresh: Failed to get session for '{phase_to_process}'."); await self._update_rpc_presence(clear=True); return
+            level_str = f"Lvl {self.summoner_data.get('summonerLevel', 'N/A')}"
+            if profile_display_config.get("showSummonerLevel"):
+                if large_text_parts and (profile_display_config.get("showRiotId") or profile_display_config.get("showTagLine")): 
+                    large_text_parts.append("|") 
+                large_text_parts.append(level_str)
             
-            if data_for_event: await self.on_gameflow_update(connection, type('Event', (), {'data': data_for_event})())
-            else: logger.error(f"Refresh: Data for event '{phase_to_process}' is None."); await self._update_rpc_presence(clear=True)
-        
-        elif phase_to_process in idle_or_post_game_phases:
-            mock_event_data = data_for_event if data_for_event else self.last_gameflow_event_data
-            if not mock_event_data or mock_event_data.get('phase') not in idle_or_post_game_phases:
-                mock_event_data = {'phase': phase_to_process}
-            await self.on_gameflow_update(connection, type('Event', (), {'data': mock_event_data})())
+            final_large_text = " ".join(large_text_parts).replace(" | ", "|") 
+            if not final_large_text.strip():
+                 final_large_text = "League of Legends"
+
+            rpc_payload_idle = {
+                "state": availability_text, 
+                "large_image": profileIcon(chat_data.get("icon")) if self.summoner_data else availabilityImg("leagueIcon"), 
+                "large_text": final_large_text,
+                "small_image": availabilityImg(availability), 
+                "small_text": status_message if status_message else availability_text
+            }
+        elif config.idleStatus == 2: 
+            rpc_payload_idle = {
+                "large_image": config.idleCustomImageLink or availabilityImg("leagueIcon"), 
+                "large_text": config.idleCustomText or "Idle", 
+                "details": config.idleCustomText or "Chilling...", 
+                "small_image": availabilityImg(availability) if config.idleCustomShowStatusCircle else None, 
+                "small_text": (status_message or availability_text) if config.idleCustomShowStatusCircle else None, 
+                "start": idle_since if config.idleCustomShowTimeElapsed else None
+            }
         else:
-            logger.info(f"Refresh Presence: Unknown gameflow phase '{phase_to_process}'. No RPC update made.")
-
-        logger.info("Presence refresh attempt complete.")
+            return PRESENCE_CLEAR
+        return {k: v for k, v in rpc_payload_idle.items() if v is not None}
 
     def _register_lcu_handlers(self):
         self.connector.ready(self.on_lcu_ready)
         self.connector.close(self.on_lcu_disconnect)
-        self.connector.ws.register("/lol-gameflow/v1/session", event_types=("CREATE", "UPDATE", "DELETE"))(self.on_gameflow_update)
-        self.connector.ws.register("/lol-chat/v1/me", event_types=("CREATE", "UPDATE", "DELETE"))(self.on_chat_update)
-        self.connector.ws.register("/lol-champ-select/v1/session", event_types=("CREATE", "UPDATE"))(self.on_champ_select_update)
+        coalesce = self.lcu_events.wrap
+        # Gameflow session updates that change the phase are handled immediately; the rest are coalesced
+        self.connector.ws.register("/lol-gameflow/v1/session", event_types=("CREATE", "UPDATE", "DELETE"))(
+            coalesce("/lol-gameflow/v1/session", self.on_gameflow_update, urgent_key=lambda event: (event.data or {}).get('phase')))
+        self.connector.ws.register("/lol-gameflow/v1/gameflow-phase", event_types=("CREATE", "UPDATE", "DELETE"))(self.on_gameflow_phase_update)
+        self.connector.ws.register("/lol-chat/v1/me", event_types=("CREATE", "UPDATE", "DELETE"))(coalesce("/lol-chat/v1/me", self.on_chat_update))
+        self.connector.ws.register("/lol-champ-select/v1/session", event_types=("CREATE", "UPDATE"))(coalesce("/lol-champ-select/v1/session", self.on_champ_select_update))
+        self.connector.ws.register("/lol-ranked/v1/current-ranked-stats", event_types=("CREATE", "UPDATE", "DELETE"))(self.on_ranked_stats_update)
+        self.connector.ws.register("/lol-lobby/v2/lobby", event_types=("CREATE", "UPDATE", "DELETE"))(coalesce("/lol-lobby/v2/lobby", self.on_lobby_update))
 
     async def _fetch_json_from_url(self, session, url, description="data"):
         try:
@@ -239,123 +342,137 @@ class DetailedLoLRPC:
             logger.error(f"Unexpected error in _fetch_json_from_url for {description}: {e}", exc_info=True)
             return None
 
-    async def _initialize_lcu_data(self, connection):
-        tray_module.updateStatus("Status: Initializing LCU Data...")
-        summoner_data_fetched = False
-        fetch_start_time = time()
-        while not summoner_data_fetched and not self.shutting_down:
-            if time() - fetch_start_time > INITIAL_SUMMONER_FETCH_TIMEOUT:
-                logger.error(f"Timeout fetching summoner data after {INITIAL_SUMMONER_FETCH_TIMEOUT}s.")
-                return False
+    async def _run_bootstrap_step(self, description, awaitable, timeout=LCU_BOOTSTRAP_STEP_TIMEOUT):
+        """Runs one LCU startup step with its own timeout. A failed or timed out step only leaves its data at the fallback."""
+        try: return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError: logger.warning(f"LCU data init: {description} timed out after {timeout}s. Continuing without it.")
+        except Exception as e: logger.error(f"LCU data init: Error loading {description}: {e}", exc_info=True)
+        return None
+
+    async def _fetch_summoner(self, connection):
+        while not self.shutting_down:
             summoner_response = await connection.request('get', '/lol-summoner/v1/current-summoner')
             if summoner_response and summoner_response.status == 200:
                 try:
-                    self.summoner_data = await summoner_response.json()
-                    if self.summoner_data and self.summoner_data.get('summonerId'):
-                        logger.info(f"Summoner data fetched: {self.summoner_data.get('displayName')}")
-                        summoner_data_fetched = True; break
+                    summoner_data = await summoner_response.json()
+                    if summoner_data and summoner_data.get('summonerId'):
+                        logger.info(f"Summoner data fetched: {summoner_data.get('displayName')}")
+                        return summoner_data
                     else: logger.warning("Summoner data incomplete. Retrying...")
                 except JSONDecodeError: logger.error("Failed to parse summoner data JSON. Retrying...")
             elif summoner_response and summoner_response.status == 404: logger.info("Summoner data not yet available (404). Retrying...")
             else: logger.warning(f"Failed to get summoner (Status: {summoner_response.status if summoner_response else 'N/A'}). Retrying...")
-            if not summoner_data_fetched: await asyncio.sleep(INITIAL_SUMMONER_FETCH_RETRY_DELAY)
-        if not summoner_data_fetched: logger.error("Could not fetch summoner data."); return False
+            await asyncio.sleep(INITIAL_SUMMONER_FETCH_RETRY_DELAY)
+        return None
 
-        region_response = await connection.request('get', '/riotclient/region-locale')
+    async def _load_locale_strings(self, connection, locale_strings):
+        locale = DEFAULT_LOCALE
+        region_response = await self._run_bootstrap_step("region/locale", connection.request('get', '/riotclient/region-locale'))
         if region_response and region_response.status == 200:
-            try: self.summoner_data['locale'] = (await region_response.json()).get('locale', DEFAULT_LOCALE).lower()
-            except JSONDecodeError: logger.error("Failed to parse region/locale JSON."); self.summoner_data['locale'] = DEFAULT_LOCALE
-        else: logger.warning(f"Failed to get region/locale. Using fallback."); self.summoner_data['locale'] = DEFAULT_LOCALE
-        logger.info(f"Locale set to: {self.summoner_data['locale']}")
+            try: locale = ((await region_response.json()).get('locale') or DEFAULT_LOCALE).lower()
+            except JSONDecodeError: logger.error("Failed to parse region/locale JSON.")
+        else: logger.warning("Failed to get region/locale. Using fallback.")
+        logger.info(f"Locale set to: {locale}")
+        skin_catalog.prepare(connection, locale) # Runs in the background
 
         async with aiohttp.ClientSession() as session:
             logger.debug(f"AIOHTTP session for locale strings created: {id(session)}")
-            discord_strings = await self._fetch_json_from_url(session, localeDiscordStrings(self.summoner_data['locale']), "Discord strings")
-            chat_strings = await self._fetch_json_from_url(session, localeChatStrings(self.summoner_data['locale']), "chat strings")
-            
-            if not discord_strings or not chat_strings:
-                logger.warning("Failed to load locale strings. Using fallbacks.")
-                
-                def show_locale_fallback_warning_dialog():
-                    try:
-                        if gui_module._persistent_tk_root and gui_module._persistent_tk_root.winfo_exists():
-                            messagebox.showwarning(
-                                "Localization Error",
-                                "Failed to fetch language files from the server.\n"
-                                "The application will use default English text.",
-                                parent=gui_module._persistent_tk_root 
-                            )
-                            logger.info("Locale fallback warning dialog shown.")
-                        else:
-                            logger.warning("Locale fallback warning dialog could not be shown: persistent Tk root no longer exists or not ready.")
-                    except tk.TclError as e_tk: 
-                        logger.error(f"TclError showing locale fallback warning: {e_tk}. App might be closing.")
-                    except Exception as e_dialog:
-                        logger.error(f"Error showing locale fallback warning dialog: {e_dialog}", exc_info=True)
-
-                if gui_module._persistent_tk_root and \
-                   hasattr(gui_module._persistent_tk_root, 'winfo_exists') and \
-                   gui_module._persistent_tk_root.winfo_exists() and \
-                   gui_module._tk_root_ready_event.is_set():
-                    try:
-                        gui_module._persistent_tk_root.after(0, show_locale_fallback_warning_dialog)
-                        logger.info("Scheduled locale fallback warning dialog on GUI thread.")
-                    except tk.TclError as e_schedule_tcl:
-                         logger.warning(f"Failed to schedule locale fallback warning (Tk root likely destroyed during .after call): {e_schedule_tcl}")
-                         logger.info("Proceeding with fallback strings without dialog (GUI thread/root issue).")
-                    except Exception as e_schedule:
-                         logger.error(f"Unexpected error scheduling locale fallback warning: {e_schedule}", exc_info=True)
-                         logger.info("Proceeding with fallback strings without dialog (scheduling issue).")
+            discord_strings, chat_strings = await asyncio.gather(
+                self._run_bootstrap_step("Discord strings", self._fetch_json_from_url(session, localeDiscordStrings(locale), "Discord strings"), LOCALE_STRINGS_FETCH_TIMEOUT),
+                self._run_bootstrap_step("chat strings", self._fetch_json_from_url(session, localeChatStrings(locale), "chat strings"), LOCALE_STRINGS_FETCH_TIMEOUT))
+        if not isinstance(discord_strings, dict) or not isinstance(chat_strings, dict) or not discord_strings or not chat_strings:
+            logger.warning("Failed to load locale strings. Using fallbacks.")
+            self._show_locale_fallback_warning()
+            return
+        locale_strings.update({"bot": discord_strings.get("Disc_Pres_QueueType_BOT", "Bot Game"), "champSelect": discord_strings.get("Disc_Pres_State_championSelect", "Champion Select"), "lobby": discord_strings.get("Disc_Pres_State_hosting", "In Lobby"), "inGame": discord_strings.get("Disc_Pres_State_inGame", "In Game"), "inQueue": discord_strings.get("Disc_Pres_State_inQueue", "In Queue"), "custom": discord_strings.get("Disc_Pres_QueueType_CUSTOM", "Custom Game"), "away": chat_strings.get("availability_away", "Away"), "chat": chat_strings.get("availability_chat", "Online"), "dnd": chat_strings.get("availability_dnd", "Do Not Disturb")})
+        logger.info(f"Locale strings loaded: {len(locale_strings)} entries.")
+        self.presence_state.update("locale strings")
+
+    def _show_locale_fallback_warning(self):
+        def show_locale_fallback_warning_dialog():
+            try:
+                if gui_module._persistent_tk_root and gui_module._persistent_tk_root.winfo_exists():
+                    messagebox.showwarning(
+                        "Localization Error",
+                        "Failed to fetch language files from the server.\n"
+                        "The application will use default English text.",
+                        parent=gui_module._persistent_tk_root 
+                    )
+                    logger.info("Locale fallback warning dialog shown.")
                 else:
-                    logger.warning("GUI thread/root not ready or available. Locale fallback warning dialog will not be shown. Proceeding with fallback strings.")
+                    logger.warning("Locale fallback warning dialog could not be shown: persistent Tk root no longer exists or not ready.")
+            except tk.TclError as e_tk: 
+                logger.error(f"TclError showing locale fallback warning: {e_tk}. App might be closing.")
+            except Exception as e_dialog:
+                logger.error(f"Error showing locale fallback warning dialog: {e_dialog}", exc_info=True)
+
+        if gui_module._persistent_tk_root and \
+           hasattr(gui_module._persistent_tk_root, 'winfo_exists') and \
+           gui_module._persistent_tk_root.winfo_exists() and \
+           gui_module._tk_root_ready_event.is_set():
+            try:
+                gui_module._persistent_tk_root.after(0, show_locale_fallback_warning_dialog)
+                logger.info("Scheduled locale fallback warning dialog on GUI thread.")
+            except tk.TclError as e_schedule_tcl:
+                 logger.warning(f"Failed to schedule locale fallback warning (Tk root likely destroyed during .after call): {e_schedule_tcl}")
+                 logger.info("Proceeding with fallback strings without dialog (GUI thread/root issue).")
+            except Exception as e_schedule:
+                 logger.error(f"Unexpected error scheduling locale fallback warning: {e_schedule}", exc_info=True)
+                 logger.info("Proceeding with fallback strings without dialog (scheduling issue).")
+        else:
+            logger.warning("GUI thread/root not ready or available. Locale fallback warning dialog will not be shown. Proceeding with fallback strings.")
+
+    async def _load_practice_tool_name(self, connection, locale_strings):
+        map_info_resp = await connection.request('get', '/lol-maps/v2/map/11/PRACTICETOOL')
+        if map_info_resp and map_info_resp.status == 200:
+            api_mode_name = (await map_info_resp.json()).get("gameModeName")
+            if api_mode_name and api_mode_name.strip():
+                locale_strings["practicetool"] = api_mode_name.strip()
+                self.presence_state.update("locale strings")
+            else: logger.warning("API returned empty gameModeName for Practice Tool.")
+        else: logger.warning(f"Could not fetch Practice Tool name (Status: {map_info_resp.status if map_info_resp else 'N/A'}).")
+
+    async def _prime_lcu_store(self, store, connection, cause):
+        if await store.prime(connection): self.presence_state.update(cause) # Later changes arrive over the websocket
+
+    async def _load_session_data(self, connection, locale_strings):
+        """The optional startup steps, run concurrently. Each fills in its part of the presence when it completes."""
+        started_at = time()
+        await asyncio.gather(
+            # Region-locale, then both string files; each request also has its own timeout
+            self._run_bootstrap_step("locale strings", self._load_locale_strings(connection, locale_strings), LCU_BOOTSTRAP_STEP_TIMEOUT + LOCALE_STRINGS_FETCH_TIMEOUT),
+            self._run_bootstrap_step("Practice Tool name", self._load_practice_tool_name(connection, locale_strings)),
+            self._run_bootstrap_step("ranked stats", self._prime_lcu_store(self.ranked_stats, connection, "ranked")),
+            self._run_bootstrap_step("lobby", self._prime_lcu_store(self.lobby_state, connection, "lobby")))
+        logger.info(f"LCU session data loaded in {time() - started_at:.2f}s (ranked stats: {self.ranked_stats.ready}, lobby: {self.lobby_state.ready}).")
 
-                self.locale_strings = {"bot": "Bot Game", "champSelect": "Champion Select", "lobby": "In Lobby", "inGame": "In Game", "inQueue": "In Queue", "custom": "Custom Game", "practicetool": "Practice Tool", "away": "Away", "chat": "Online", "dnd": "Do Not Disturb"}
-            else:
-                practicetool_name = "Practice Tool"
-                try:
-                    map_info_resp = await connection.request('get', '/lol-maps/v2/map/11/PRACTICETOOL')
-                    if map_info_resp and map_info_resp.status == 200:
-                        api_mode_name = (await map_info_resp.json()).get("gameModeName")
-                        if api_mode_name and api_mode_name.strip(): practicetool_name = api_mode_name.strip()
-                        else: logger.warning("API returned empty gameModeName for Practice Tool.")
-                except Exception as e: logger.warning(f"Could not fetch Practice Tool name: {e}.")
-                self.locale_strings = {"bot": discord_strings.get("Disc_Pres_QueueType_BOT", "Bot Game"), "champSelect": discord_strings.get("Disc_Pres_State_championSelect", "Champion Select"), "lobby": discord_strings.get("Disc_Pres_State_hosting", "In Lobby"), "inGame": discord_strings.get("Disc_Pres_State_inGame", "In Game"), "inQueue": discord_strings.get("Disc_Pres_State_inQueue", "In Queue"), "custom": discord_strings.get("Disc_Pres_QueueType_CUSTOM", "Custom Game"), "practicetool": practicetool_name, "away": chat_strings.get("availability_away", "Away"), "chat": chat_strings.get("availability_chat", "Online"), "dnd": chat_strings.get("availability_dnd", "Do Not Disturb")}
-        logger.info(f"Locale strings loaded: {len(self.locale_strings)} entries.")
+    async def _initialize_lcu_data(self, connection):
+        """
+        Fetches the summoner while the locale strings, Practice Tool name, ranked stats and lobby load concurrently
+        in the background. Returns as soon as the summoner is known, so the presence starts with the English fallback
+        strings and fills in as the other steps complete; only the summoner is required.
+        """
+        tray_module.updateStatus("Status: Initializing LCU Data...")
+        await self._cancel_lcu_bootstrap_task()
+        self.summoner_data = {}
+        champion_index.reset() # Rebuilt on first use, so a patched client's new champions and skins are picked up
+        self.locale_strings = {} # Handlers skip events until the summoner is known
+        locale_strings = dict(FALLBACK_LOCALE_STRINGS) # Filled in place by the background steps
+        self._lcu_bootstrap_task = asyncio.create_task(self._load_session_data(connection, locale_strings))
+
+        summoner_data = await self._run_bootstrap_step("summoner", self._fetch_summoner(connection), INITIAL_SUMMONER_FETCH_TIMEOUT)
+        if not summoner_data:
+            logger.error("Could not fetch summoner data.")
+            await self._cancel_lcu_bootstrap_task()
+            return False
+        self.summoner_data, self.locale_strings = summoner_data, locale_strings
         return True
 
-    async def _update_rpc_presence(self, clear=False, **kwargs):
-        async with self.rpc_lock:
-            if not self.rpc_connected:
-                logger.debug("RPC not connected. Skipping update/clear.")
-                return
-
-            is_muted = fetchConfig("isRpcMuted")
-
-            if clear:
-                await asyncio.to_thread(self.rpc.clear)
-                logger.info("RPC cleared.")
-                return
-
-            if is_muted:
-                logger.info("RPC is muted. Clearing presence instead of updating.")
-                await asyncio.to_thread(self.rpc.clear)
-                return
-            
-            try:
-                valid_kwargs = {k: v for k, v in kwargs.items() if v is not None}
-                if valid_kwargs:
-                    await asyncio.to_thread(self.rpc.update, **valid_kwargs)
-                    logger.debug(f"RPC updated: {valid_kwargs.get('details','')}, {valid_kwargs.get('state','')}")
-                else:
-                    logger.debug("RPC update called with no valid args and not clearing (and not muted).")
-            except PyPresenceExceptions.InvalidPipe:
-                logger.warning("Discord pipe closed. RPC disconnected.")
-                self.rpc_connected = False
-                asyncio.create_task(self.connect_discord_rpc(is_reconnect=True))
-            except RuntimeError as e:
-                logger.error(f"RuntimeError updating RPC: {e}", exc_info="read() called while another coroutine" not in str(e))
-            except Exception as e:
-                logger.error(f"Error updating RPC: {e}", exc_info=True)
+    def _on_presence_pipe_error(self):
+        if not self.rpc_connected: return
+        logger.warning("Discord pipe closed. RPC disconnected.")
+        self.rpc_connected = False
+        if not self.shutting_down: asyncio.create_task(self.connect_discord_rpc(is_reconnect=True))
 
 
     async def _cancel_task(self, task_attr_name: str, task_description: str):
@@ -368,85 +485,33 @@ class DetailedLoLRPC:
             except Exception as e: logger.error(f"Error during cancellation of {task_description} task: {e}", exc_info=True)
         setattr(self, task_attr_name, None)
 
-    async def _cancel_ingame_task(self): await self._cancel_task('ingame_rpc_task', 'in-game RPC')
+    async def _cancel_ingame_task(self):
+        await self._cancel_task('ingame_rpc_task', 'in-game RPC')
+        self.ingame_poll_scheduler = None
+        await close_live_client_session() # Leaving InProgress: drop the keep-alive connection to the game
     async def _cancel_delayed_idle_task(self): await self._cancel_task('_delayed_idle_handler_task', 'delayed idle handler')
     async def _cancel_lcu_disconnect_shutdown_task(self): await self._cancel_task('_lcu_disconnect_shutdown_task', 'LCU disconnect shutdown')
+    async def _cancel_lcu_bootstrap_task(self): await self._cancel_task('_lcu_bootstrap_task', 'LCU data bootstrap')
 
-    async def _handle_delayed_idle_state(self, original_phase_from_event, connection_at_event_time):
+    async def _confirm_idle_state(self, connection_at_event_time):
+        """Marks an idle phase as confirmed once it has lasted IDLE_STATE_CONFIRMATION_DELAY; the render loop then shows the idle presence."""
         try:
             await asyncio.sleep(IDLE_STATE_CONFIRMATION_DELAY)
             if self.shutting_down or not self.lcu_connected or connection_at_event_time != self.lcu_manager.current_connection: return
-            
-            if fetchConfig("isRpcMuted"): # Check mute status before proceeding
-                logger.info("Delayed idle: RPC is muted. Not setting idle presence.")
-                await self._update_rpc_presence(clear=True)
-                return
-
-            gameflow_phase_resp = await connection_at_event_time.request('get', '/lol-gameflow/v1/gameflow-phase')
-            live_phase_from_http = None
-            if gameflow_phase_resp and gameflow_phase_resp.status == 200:
-                try: live_phase_from_http = str(await gameflow_phase_resp.json()).strip('"')
-                except JSONDecodeError: logger.error("Delayed idle: Error parsing live gameflow phase."); await self._update_rpc_presence(clear=True); return
-            
-            logger.info(f"Delayed idle: Original '{original_phase_from_event}', Live '{live_phase_from_http}'.")
-            idle_or_post_game_trigger_phases = ("None", "TerminatedInError", "WaitingForStats", "PreEndOfGame", "EndOfGame")
-            if live_phase_from_http not in idle_or_post_game_trigger_phases: logger.info(f"Delayed idle: Phase changed to '{live_phase_from_http}'. Aborting."); return
-            if live_phase_from_http in ("PreEndOfGame", "EndOfGame"): logger.info(f"Delayed idle: Phase '{live_phase_from_http}' is post-game. Clearing RPC."); await self._update_rpc_presence(clear=True); return
-
-            idle_option = fetchConfig("idleStatus")
-            if idle_option == 0: logger.info(f"Delayed idle: Disabled for '{live_phase_from_http}'. Clearing RPC."); await self._update_rpc_presence(clear=True); return
-            
-            chat_me_response = await connection_at_event_time.request('get', '/lol-chat/v1/me')
-            if chat_me_response and chat_me_response.status == 200:
-                try:
-                    chat_data = await chat_me_response.json(); self.last_chat_event_data = chat_data
-                    availability = chat_data.get("availability", "chat").lower(); status_message = chat_data.get("statusMessage")
-                    rpc_payload_idle = {}
-                    if idle_option == 1:
-                        profile_display_config = fetchConfig("idleProfileInfoDisplay")
-                        large_text_parts = []
-                        if profile_display_config.get("showRiotId"):
-                            large_text_parts.append(self.summoner_data.get('gameName', 'Player'))
-                        if profile_display_config.get("showTagLine") and self.summoner_data.get('tagLine'):
-                            if not large_text_parts or not profile_display_config.get("showRiotId"): 
-                                large_text_parts.append(f"#{self.summoner_data.get('tagLine')}")
-                            else: 
-                                large_text_parts[-1] += f"#{self.summoner_data.get('tagLine')}"
-                        
-                        level_str = f"Lvl {self.summoner_data.get('summonerLevel', 'N/A')}"
-                        if profile_display_config.get("showSummonerLevel"):
-                            if large_text_parts and (profile_display_config.get("showRiotId") or profile_display_config.get("showTagLine")): 
-                                large_text_parts.append("|") 
-                            large_text_parts.append(level_str)
-                        
-                        final_large_text = " ".join(large_text_parts).replace(" | ", "|") 
-                        if not final_large_text.strip():
-                             final_large_text = "League of Legends"
-
-                        rpc_payload_idle = {
-                            "state": self.locale_strings.get(availability, chat_data.get("availability", "Online")), 
-                            "large_image": profileIcon(chat_data.get("icon")) if self.summoner_data else availabilityImg("leagueIcon"), 
-                            "large_text": final_large_text,
-                            "small_image": availabilityImg(availability), 
-                            "small_text": status_message if status_message else self.locale_strings.get(availability, chat_data.get("availability", "Online"))
-                        }
-                    elif idle_option == 2: 
-                        rpc_payload_idle = {
-                            "large_image": fetchConfig("idleCustomImageLink") or availabilityImg("leagueIcon"), 
-                            "large_text": fetchConfig("idleCustomText") or "Idle", 
-                            "details": fetchConfig("idleCustomText") or "Chilling...", 
-                            "state": None, 
-                            "small_image": availabilityImg(availability) if fetchConfig("idleCustomShowStatusCircle") else None, 
-                            "small_text": (status_message or self.locale_strings.get(availability, chat_data.get("availability", "Online"))) if fetchConfig("idleCustomShowStatusCircle") else None, 
-                            "start": int(time()) if fetchConfig("idleCustomShowTimeElapsed") else None
-                        }
-                    if rpc_payload_idle: await self._update_rpc_presence(**rpc_payload_idle)
-                    else: await self._update_rpc_presence(clear=True)
-                except JSONDecodeError: await self._update_rpc_presence(clear=True); logger.error("Delayed idle: Error parsing chat data.")
-                except Exception as e_chat: await self._update_rpc_presence(clear=True); logger.error(f"Delayed idle: Error setting idle: {e_chat}")
-            else: await self._update_rpc_presence(clear=True)
-        except asyncio.CancelledError: logger.info("Delayed idle handler task was cancelled.")
-        except Exception as e: logger.error(f"Error in _handle_delayed_idle_state: {e}", exc_info=True); await self._update_rpc_presence(clear=True)
+            if self.presence_state.phase not in IDLE_GAMEFLOW_PHASES: logger.info(f"Idle confirmation: Phase changed to '{self.presence_state.phase}'. Aborting."); return
+
+            chat_data = self.presence_state.chat
+            if chat_data is None: # No chat event seen yet in this session
+                chat_me_response = await connection_at_event_time.request('get', '/lol-chat/v1/me')
+                if chat_me_response and chat_me_response.status == 200:
+                    try: chat_data = await chat_me_response.json()
+                    except JSONDecodeError: logger.error("Idle confirmation: Error parsing chat data.")
+                if self.presence_state.phase not in IDLE_GAMEFLOW_PHASES: return
+            logger.info(f"Idle confirmation: Phase '{self.presence_state.phase}' confirmed.")
+            tray_module.updateStatus("Status: Ready (Idle)")
+            self.presence_state.update("idle confirmed", chat=chat_data, idle_confirmed=True, idle_since=int(time()))
+        except asyncio.CancelledError: logger.info("Idle confirmation task was cancelled.")
+        except Exception as e: logger.error(f"Error in _confirm_idle_state: {e}", exc_info=True)
         finally: self._delayed_idle_handler_task = None
 
     async def _delayed_shutdown_on_lcu_disconnect(self):
@@ -465,137 +530,55 @@ class DetailedLoLRPC:
         print("LCU Connected.")
         await self._cancel_lcu_disconnect_shutdown_task()
         tray_module.updateStatus("Status: LCU Connected. Initializing...")
-        self.lcu_connected = True; self.last_connection_obj_for_refresh = connection
+        self.lcu_connected = True
         if not await self._initialize_lcu_data(connection):
             tray_module.updateStatus("Status: Failed LCU data init."); logger.error("Failed LCU data init."); self.lcu_connected = False; return
         tray_module.updateStatus("Status: Ready"); logger.info("LCU Ready and Initialized.")
-        asyncio.create_task(self.refresh_current_presence())
+        self.presence_state.update("lcu connected", lcu_connected=True)
+        asyncio.create_task(self._resync_presence_state(connection))
 
     async def on_lcu_disconnect(self, connection):
         logger.info(f"LCU Disconnected.")
         print("LCU Disconnected.")
-        self.lcu_connected = False; self.last_connection_obj_for_refresh = None
-        self.last_gameflow_event_data = None; self.last_chat_event_data = None
-        await self._cancel_delayed_idle_task(); await self._cancel_ingame_task()
-        await self._update_rpc_presence(clear=True)
+        self.lcu_connected = False
+        self.ranked_stats.reset(); self.lobby_state.reset(); self.gameflow_phase.reset(); self.skin_prefetcher.reset()
+        await self.lcu_events.cancel_pending(); logger.info(f"LCU websocket events (received/processed): {self.lcu_events.stats()}")
+        await self._cancel_lcu_bootstrap_task(); await self._cancel_delayed_idle_task(); await self._cancel_ingame_task()
+        self.presence_state.update("lcu disconnected", lcu_connected=False, phase=None, session=None, chat=None) # Renders a clear
         tray_module.updateStatus("Status: LCU Disconnected. App may close soon.")
         await self._cancel_lcu_disconnect_shutdown_task()
         if not self.shutting_down: self._lcu_disconnect_shutdown_task = asyncio.create_task(self._delayed_shutdown_on_lcu_disconnect())
 
     async def on_gameflow_update(self, connection, event):
         if not self.lcu_connected or not self.locale_strings: logger.debug("Gameflow update skipped, LCU not ready."); return
-        
-        if fetchConfig("isRpcMuted"):
-            logger.info("Gameflow update: RPC is muted. Clearing presence.")
-            await self._update_rpc_presence(clear=True)
-            return
-
-        data = event.data; self.last_gameflow_event_data = data; self.last_connection_obj_for_refresh = connection
-        phase = data.get('phase'); logger.info(f"Gameflow update: Phase - {phase}")
-        await self._cancel_delayed_idle_task()
-        if phase not in ("InProgress", "PreEndOfGame", "EndOfGame", "WaitingForStats"): await self._cancel_ingame_task()
-
-        actively_managed = ("Lobby", "Matchmaking", "ChampSelect", "InProgress")
-        idle_post_game = ("None", "TerminatedInError", "WaitingForStats", "PreEndOfGame", "EndOfGame")
-
-        if phase in actively_managed:
-            game_data = data.get('gameData', {}); queue_data = game_data.get('queue', {}); map_data = data.get('map', {})
-            map_asset_data = map_data.get("assets")
-            map_icon_path = map_asset_data.get(self.current_map_icon_asset_key_name) if map_asset_data else None
-            if not map_icon_path and map_asset_data: map_icon_path = map_asset_data.get(DEFAULT_MAP_ICON_KEY)
-            if not map_icon_path and phase != "InProgress": logger.debug(f"No map icon for phase {phase}. Map: {map_data.get('name')}")
-            
-            lobby_members_count = 0
-            if phase != "InProgress":
-                lobby_resp = await connection.request('get', '/lol-lobby/v2/lobby/members')
-                if lobby_resp and lobby_resp.status == 200:
-                    try: lobby_members_count = len(await lobby_resp.json())
-                    except JSONDecodeError: logger.error("Error parsing lobby members JSON.")
-                elif lobby_resp and lobby_resp.status != 404: logger.warning(f"Failed to get lobby members (Status: {lobby_resp.status}).")
-
-            queue_desc = queue_data.get('description', "Unknown Mode")
-            if self.locale_strings:
-                if queue_data.get("type") == "BOT": queue_desc = f"{self.locale_strings.get('bot', 'Bot')} {queue_desc}"
-                if queue_data.get("category") == "Custom": queue_desc = self.locale_strings.get('custom', 'Custom Game')
-                if queue_data.get('gameMode') == "PRACTICETOOL": queue_desc = self.locale_strings.get('practicetool', 'Practice Tool')
-            
-            rank_emblem_url, small_text_str = None, None
-            if phase != "InProgress":
-                current_queue_type = queue_data.get("type")
-                show_ranks_config = fetchConfig("showRanks")
-                if current_queue_type and isinstance(show_ranks_config, dict) and show_ranks_config.get(current_queue_type, False):
-                    ranked_stats_resp = await connection.request('get', '/lol-ranked/v1/current-ranked-stats')
-                    if ranked_stats_resp and ranked_stats_resp.status == 200:
-                        try:
-                            ranked_stats = await ranked_stats_resp.json()
-                            queue_map = ranked_stats.get("queueMap", {})
-                            if isinstance(queue_map, dict):
-                                queue_rank_info = queue_map.get(current_queue_type)
-                                if isinstance(queue_rank_info, dict) and queue_rank_info.get("tier", "") not in ("", "NONE", "UNRANKED"):
-                                    tier = queue_rank_info['tier'].capitalize(); division = queue_rank_info['division']
-                                    small_text_parts_temp = [f"{tier} {division}"]
-                                    rank_emblem_url = rankedEmblem(queue_rank_info['tier'])
-                                    ranked_stats_config = fetchConfig("rankedStats")
-                                    if isinstance(ranked_stats_config, dict):
-                                        if ranked_stats_config.get("lp"): small_text_parts_temp.append(f"{queue_rank_info.get('leaguePoints', 0)} LP")
-                                        if ranked_stats_config.get("w"): small_text_parts_temp.append(f"{queue_rank_info.get('wins', 0)}W")
-                                        if ranked_stats_config.get("l"): small_text_parts_temp.append(f"{queue_rank_info.get('losses', 0)}L")
-                                    small_text_str = " • ".join(small_text_parts_temp)
-                        except JSONDecodeError: logger.error("Error parsing ranked stats JSON for gameflow update.")
-
-
-            rpc_base = {"details": f"{map_data.get('name', 'Unknown Map')} ({queue_desc})", "large_text": map_data.get('name'), "small_image": rank_emblem_url, "small_text": small_text_str, "large_image": mapIcon(map_icon_path) if map_icon_path else None}
-
-            if phase == "Lobby":
-                if queue_data.get("mapId") == 0 and not map_data.get('name'): await self._update_rpc_presence(clear=True); return
-                tray_module.updateStatus("Status: In Lobby"); rpc_base["state"] = self.locale_strings.get('lobby', 'In Lobby')
-                if fetchConfig("showPartyInfo") and queue_data.get("maximumParticipantListSize", 0) > 0: rpc_base["party_size"] = [lobby_members_count, queue_data["maximumParticipantListSize"]]
-                await self._update_rpc_presence(**rpc_base)
-            elif phase == "Matchmaking":
-                tray_module.updateStatus("Status: In Queue"); rpc_base["state"] = self.locale_strings.get('inQueue', 'In Queue'); rpc_base["start"] = int(time())
-                await self._update_rpc_presence(**rpc_base)
-            elif phase == "ChampSelect":
-                tray_module.updateStatus("Status: In Champ Select"); rpc_base["state"] = self.locale_strings.get('champSelect', 'Champion Select')
-                await self._update_rpc_presence(**rpc_base)
-            elif phase == "InProgress":
-                tray_module.updateStatus("Status: In Game"); await self._cancel_ingame_task()
-                self.ingame_rpc_task = asyncio.create_task(updateInProgressRPC(lambda: not self.lcu_connected or self.shutting_down, int(time()), self.current_champ_selection, map_data, map_icon_path, queue_data, game_data, self.summoner_data.get('internalName'), self.summoner_data.get('displayName'), connection, self.summoner_data.get('summonerId'), self.locale_strings, self.rpc, self.rpc_lock))
-        
-        elif phase in idle_post_game:
-            logger.info(f"Gameflow phase '{phase}' received. Scheduling delayed idle/clear handler.")
-            await self._cancel_ingame_task(); await self._cancel_delayed_idle_task()
-            self._delayed_idle_handler_task = asyncio.create_task(self._handle_delayed_idle_state(phase, connection))
-        else:
-            logger.info(f"Gameflow phase '{phase}' is unknown. No RPC update made.")
+        data = event.data or {}
+        phase = data.get('phase'); logger.debug(f"Gameflow session update: Phase - {phase}")
+        if phase: self.gameflow_phase.apply(phase)
+        self.presence_state.update("gameflow session", session=data)
+        if phase: await self._on_phase(connection, self.gameflow_phase.phase)
         
     async def on_chat_update(self, connection, event):
         if not self.lcu_connected or not self.locale_strings or not self.summoner_data: logger.debug("Chat update skipped, LCU not ready."); return
-        
-        if fetchConfig("isRpcMuted"):
-            logger.info("Chat update: RPC is muted. Clearing presence.")
-            await self._update_rpc_presence(clear=True)
-            return
-
-        chat_data = event.data; self.last_chat_event_data = chat_data; self.last_connection_obj_for_refresh = connection
-        gameflow_phase_resp = await connection.request('get', '/lol-gameflow/v1/gameflow-phase')
-        current_gameflow_phase = None
-        if gameflow_phase_resp and gameflow_phase_resp.status == 200:
-            try: current_gameflow_phase = str(await gameflow_phase_resp.json()).strip('"')
-            except JSONDecodeError: logger.error("Error parsing gameflow phase for chat update."); return
-        
-        active_phases = ("Lobby", "Matchmaking", "ChampSelect", "InProgress", "PreEndOfGame", "EndOfGame")
-        if current_gameflow_phase in active_phases: logger.debug(f"Chat update in active phase '{current_gameflow_phase}'. Gameflow handles RPC."); return
-        if self._delayed_idle_handler_task and not self._delayed_idle_handler_task.done(): logger.debug("Chat update for idle, but delayed handler pending."); return
-        if self.ingame_rpc_task and not self.ingame_rpc_task.done(): logger.debug("Chat update for idle, in-game task running, cancelling."); await self._cancel_ingame_task()
-
-        tray_module.updateStatus("Status: Ready (Idle)")
-        availability = chat_data.get("availability", "chat").lower(); status_message = chat_data.get("statusMessage")
-        idle_option = fetchConfig("idleStatus"); rpc_payload = {}
-        if idle_option == 0: await self._update_rpc_presence(clear=True); logger.info("Idle status: RPC cleared (Disabled)."); return
-        elif idle_option == 1: rpc_payload = {"state": self.locale_strings.get(availability, chat_data.get("availability", "Online")), "large_image": profileIcon(chat_data.get("icon")) if self.summoner_data else availabilityImg("leagueIcon"), "large_text": f"{self.summoner_data.get('displayName', 'Player')}#{self.summoner_data.get('tagLine','')} | Lvl {self.summoner_data.get('summonerLevel', 'N/A')}" if self.summoner_data else "League of Legends", "small_image": availabilityImg(availability), "small_text": status_message if status_message else self.locale_strings.get(availability, chat_data.get("availability", "Online"))}
-        elif idle_option == 2: rpc_payload = {"large_image": fetchConfig("idleCustomImageLink") or availabilityImg("leagueIcon"), "large_text": fetchConfig("idleCustomText") or "Idle", "details": fetchConfig("idleCustomText") or "Chilling...", "state": None, "small_image": availabilityImg(availability) if fetchConfig("idleCustomShowStatusCircle") else None, "small_text": (status_message or self.locale_strings.get(availability, chat_data.get("availability", "Online"))) if fetchConfig("idleCustomShowStatusCircle") else None, "start": int(time()) if fetchConfig("idleCustomShowTimeElapsed") else None}
-        if rpc_payload: await self._update_rpc_presence(**rpc_payload)
-        logger.info(f"Chat status updated to: {availability}, idle option: {idle_option}")
+        self.presence_state.update("chat", chat=event.data)
+        logger.debug(f"Chat status updated to: {(event.data or {}).get('availability')}")
+
+    async def on_ranked_stats_update(self, connection, event):
+        if event.type == "DELETE": self.ranked_stats.reset()
+        else: self.ranked_stats.apply(event.data)
+        logger.debug(f"Ranked stats updated from websocket: {self.ranked_stats.stats()}")
+        self.presence_state.update("ranked")
+
+    async def on_gameflow_phase_update(self, connection, event):
+        if self.gameflow_phase.apply(None if event.type == "DELETE" else event.data):
+            logger.debug(f"Gameflow phase from websocket: {self.gameflow_phase.stats()}")
+        if self.lcu_connected and self.locale_strings: await self._on_phase(connection, self.gameflow_phase.phase)
+
+    async def on_lobby_update(self, connection, event):
+        if not self.lcu_connected: return
+        # The party size is shown in the lobby presence; re-render now rather than on the next gameflow event
+        if self.lobby_state.apply(None if event.type == "DELETE" else event.data):
+            logger.debug(f"Lobby updated from websocket: {self.lobby_state.stats()}")
+            self.presence_state.update("lobby")
 
     async def on_champ_select_update(self, connection, event):
         if not self.lcu_connected or not self.summoner_data: return
@@ -604,6 +587,7 @@ class DetailedLoLRPC:
             if player.get("summonerId") == self.summoner_data.get("summonerId"):
                 self.current_champ_selection = (player.get("championId", 0), player.get("selectedSkinId", 0))
                 logger.info(f"Champ selection updated: ID {self.current_champ_selection[0]}, Skin {self.current_champ_selection[1]}")
+                self.skin_prefetcher.select(connection, self.summoner_data.get('summonerId'), *self.current_champ_selection)
                 break
 
     async def connect_discord_rpc(self, is_reconnect=False):
@@ -613,12 +597,10 @@ class DetailedLoLRPC:
             logger.info(status_msg); tray_module.updateStatus(f"Status: {status_msg}")
             try:
                 await asyncio.to_thread(self.rpc.connect); self.rpc_connected = True
+                self.presence_sink.invalidate() # A fresh connection starts with no presence on Discord's side
+                self.presence_renderer.invalidate()
                 logger.info("RPC Connected to Discord."); print("RPC Connected to Discord."); tray_module.updateStatus("Status: Connected to Discord.")
-                if fetchConfig("isRpcMuted"): # If muted on connect, clear presence
-                    logger.info("RPC connected but is muted. Clearing initial presence.")
-                    await self._update_rpc_presence(clear=True)
-                else: # Refresh presence if not muted
-                    asyncio.create_task(self.refresh_current_presence())
+                self.presence_state.update("discord connected") # Re-renders the current presence (or a clear, if muted)
 
             except PyPresenceExceptions.InvalidPipe: logger.warning("Discord pipe closed. Is Discord running?"); tray_module.updateStatus("Status: Discord not found."); self.rpc_connected = False
             except RuntimeError as e: logger.error(f"RuntimeError connecting RPC: {e}", exc_info="event loop is already running" not in str(e)); tray_module.updateStatus("Status: Discord connection error."); self.rpc_connected = False
@@ -684,6 +666,7 @@ class DetailedLoLRPC:
         try: tray_module.icon.run_detached(); logger.info("Tray icon started.")
         except Exception as e: logger.error(f"Failed to start tray icon: {e}", exc_info=True)
         self._config_watcher_task = asyncio.create_task(self._config_change_listener())
+        self.presence_renderer.start()
         logger.info("Attempting to disable native presence..."); Process(target=disableNativePresence, daemon=True).start()
         await self._launch_league_if_needed()
         await self.connect_discord_rpc()
@@ -749,6 +732,12 @@ class DetailedLoLRPC:
             else:
                 logger.info("lcu_driver connector session was already closed or not present.")
         
+        await self.lcu_events.cancel_pending()
+        await self._cancel_ingame_task() # Flushes the stats timeline and closes the keep-alive Live Client session
+        await self.presence_renderer.stop()
+        logger.info(f"Presence render loop stopped: {self.presence_renderer.stats()}")
+        await self.presence_dispatcher.stop()
+        logger.info(f"Presence dispatcher stopped: {self.presence_dispatcher.stats()}")
         if self.rpc_connected:
             logger.info("Closing Discord RPC connection...")
             try:
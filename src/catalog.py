@@ -0,0 +1,220 @@
+import asyncio
+import json
+import os
+from typing import Dict, Any, Optional, Tuple
+
+from .utilities import APPDATA_PATH, logger, addLog
+
+CATALOG_DIR = os.path.join(APPDATA_PATH, "catalog")
+CATALOG_FORMAT_VERSION = 1
+CATALOG_MAX_FILES = 4 # Catalogs of older patches/locales are deleted
+SKINS_ENDPOINT = "/lol-game-data/assets/v1/skins.json"
+GAME_VERSION_ENDPOINT = "/lol-patch/v1/game-version"
+CHAMPION_INVENTORY_ENDPOINT = "/lol-champions/v1/inventories/{summoner_id}/champions"
+# Only the fields the presence uses are persisted
+SKIN_RECORD_FIELDS = ("id", "name", "isBase", "tilePath", "uncenteredSplashPath", "collectionSplashVideoPath")
+
+
+def _slim_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: record[field] for field in SKIN_RECORD_FIELDS if field in record}
+
+
+def build_skin_index(skins_data: Any) -> Dict[int, list]:
+    """
+    Flattens game-data skins.json into {skinId: [championId, skin record, tier overrides or None]}.
+    Chroma IDs map to their parent skin; quest skin tier IDs map to the parent skin plus the tier's own fields.
+    """
+    records = skins_data.values() if isinstance(skins_data, dict) else skins_data
+    index = {}
+    for skin in records or []:
+        if not isinstance(skin, dict) or not isinstance(skin.get("id"), int):
+            continue
+        skin_id = skin["id"]
+        champion_id = skin_id // 1000 # Skin IDs are championId * 1000 + skin number
+        record = _slim_record(skin)
+        index[skin_id] = [champion_id, record, None]
+        for chroma in skin.get("chromas") or []:
+            if isinstance(chroma, dict) and isinstance(chroma.get("id"), int):
+                index.setdefault(chroma["id"], [champion_id, record, None])
+        for tier in (skin.get("questSkinInfo") or {}).get("tiers") or []:
+            if isinstance(tier, dict) and isinstance(tier.get("id"), int):
+                index[tier["id"]] = [champion_id, record, _slim_record(tier)]
+    return index
+
+
+class SkinCatalog:
+    """
+    Flat skinId -> (championId, skin record, tier overrides) index of every skin, chroma and quest skin tier.
+    Built once per client version and locale from the LCU's game-data skins.json and persisted under APPDATA_PATH.
+    prepare() loads or builds it in the background, off the event loop, so resolving a skin in game is a dict lookup
+    instead of an LCU request. Lookups before it is ready miss, and the caller falls back to the LCU.
+    """
+    def __init__(self):
+        self._index: Optional[Dict[int, list]] = None
+        self._path: Optional[str] = None # Catalog file for the current client version and locale
+        self._build_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    @staticmethod
+    def _load(path: str) -> Optional[Dict[int, list]]:
+        """Reads a saved catalog. Blocking; called in a thread. Returns None if it is unreadable or has an old format."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("formatVersion") != CATALOG_FORMAT_VERSION:
+                logger.info(f"Skin catalog {path} has an old format. Rebuilding it.")
+                return None
+            return {int(skin_id): entry for skin_id, entry in stored["skins"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Could not load skin catalog {path}: {e}. Rebuilding it.")
+            return None
+
+    def lookup(self, skin_id: Optional[int]) -> Optional[Tuple[int, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """Returns (championId, skin record, tier overrides or None) for a skin, chroma or tier ID, or None if unknown or not ready."""
+        entry = self._index.get(skin_id) if self._index is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0], entry[1], entry[2]
+
+    def prepare(self, connection: Any, locale: str) -> asyncio.Task:
+        """
+        Points the catalog at the current client version and locale, building and saving it in the background if needed.
+        Called once the LCU is ready; does not block the caller.
+        """
+        if self._build_task and not self._build_task.done():
+            self._build_task.cancel()
+        self._build_task = asyncio.create_task(self._prepare(connection, locale))
+        return self._build_task
+
+    async def _prepare(self, connection: Any, locale: str):
+        try:
+            version_response = await connection.request('get', GAME_VERSION_ENDPOINT)
+            if not version_response or version_response.status != 200:
+                logger.warning(f"Skin catalog: could not get client version (status {getattr(version_response, 'status', 'No Response')}).")
+                return
+            version = str(await version_response.json()).strip('"')
+            path = os.path.join(CATALOG_DIR, f"skins_{version}_{locale}.json".replace(os.sep, "_"))
+            if path == self._path and self._index is not None:
+                return
+            self._path, self._index = path, None
+            if os.path.exists(path):
+                index = await asyncio.to_thread(self._load, path)
+                if index is not None:
+                    self._index = index
+                    logger.info(f"Skin catalog loaded from {path}: {len(index)} entries.")
+                    return
+
+            skins_response = await connection.request('get', SKINS_ENDPOINT)
+            if not skins_response or skins_response.status != 200:
+                logger.warning(f"Skin catalog: could not fetch {SKINS_ENDPOINT} (status {getattr(skins_response, 'status', 'No Response')}).")
+                return
+            index = build_skin_index(await skins_response.json())
+            self._index = index
+            await asyncio.to_thread(self._save, path, version, locale, index)
+            logger.info(f"Skin catalog built for {version} ({locale}): {len(index)} entries.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error preparing skin catalog: {e}", exc_info=True)
+            addLog(f"Skin catalog error: {str(e)}", level="ERROR")
+
+    @staticmethod
+    def _save(path: str, version: str, locale: str, index: Dict[int, list]):
+        try:
+            os.makedirs(CATALOG_DIR, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"formatVersion": CATALOG_FORMAT_VERSION, "version": version, "locale": locale, "skins": index}, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+            _prune_old_catalogs()
+        except OSError as e:
+            logger.warning(f"Could not save skin catalog to {path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._index) if self._index is not None else None, "hits": self.hits, "misses": self.misses}
+
+
+def _prune_old_catalogs():
+    try:
+        catalog_files = [os.path.join(CATALOG_DIR, name) for name in os.listdir(CATALOG_DIR) if name.startswith("skins_") and name.endswith(".json")]
+        if len(catalog_files) <= CATALOG_MAX_FILES:
+            return
+        catalog_files.sort(key=os.path.getmtime)
+        for path in catalog_files[:-CATALOG_MAX_FILES]:
+            os.remove(path)
+    except OSError as e:
+        logger.warning(f"Could not prune old skin catalogs: {e}")
+
+
+class ChampionIndex:
+    """
+    Champion name -> ID and champion ID -> skins index of the summoner's champion inventory.
+    The inventory is the largest LCU response the app uses, so it is fetched at most once per LCU session
+    (a client patch or locale change restarts the client, which starts a new session) and only when first needed.
+    """
+    def __init__(self):
+        self._ids_by_name: Optional[Dict[str, int]] = None
+        self._skins_by_id: Optional[Dict[int, list]] = None
+        self._generation = 0 # Bumped by reset(), so a build started in an earlier session is discarded
+        self._build_lock = asyncio.Lock()
+        self.builds = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._ids_by_name is not None
+
+    def reset(self):
+        """Starts a new LCU session. The index is rebuilt on next use, so a patched client's new champions and skins are picked up."""
+        self._ids_by_name, self._skins_by_id = None, None
+        self._generation += 1
+
+    async def ensure(self, connection: Any, summoner_id: Any) -> bool:
+        """Builds the index from the LCU if it is not built yet. Returns whether it is available."""
+        if self._ids_by_name is not None:
+            return True
+        async with self._build_lock: # Concurrent callers share one request
+            if self._ids_by_name is not None:
+                return True
+            generation = self._generation
+            try:
+                response = await connection.request('get', CHAMPION_INVENTORY_ENDPOINT.format(summoner_id=summoner_id))
+                if not response or response.status != 200:
+                    logger.warning(f"Champion index: could not fetch champion inventory (status {getattr(response, 'status', 'No Response')}).")
+                    return False
+                champions = await response.json()
+            except Exception as e:
+                logger.error(f"Error fetching champion inventory for the champion index: {e}", exc_info=True)
+                addLog(f"Champion index error: {str(e)}", level="ERROR")
+                return False
+            if not isinstance(champions, list) or generation != self._generation:
+                return False
+            ids_by_name, skins_by_id = {}, {}
+            for champion in champions:
+                if isinstance(champion, dict) and isinstance(champion.get("id"), int):
+                    if champion.get("name"): ids_by_name[champion["name"]] = champion["id"]
+                    skins_by_id[champion["id"]] = champion.get("skins") or []
+            self._ids_by_name, self._skins_by_id = ids_by_name, skins_by_id
+            self.builds += 1
+            logger.info(f"Champion index built: {len(ids_by_name)} champions.")
+            return True
+
+    def champion_id(self, champion_name: Optional[str]) -> Optional[int]:
+        return self._ids_by_name.get(champion_name) if self._ids_by_name is not None else None
+
+    def skins(self, champion_id: Optional[int]) -> Optional[list]:
+        """The champion's skin list from the inventory, or None if the index is not built or the champion is unknown."""
+        return self._skins_by_id.get(champion_id) if self._skins_by_id is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"champions": len(self._ids_by_name) if self._ids_by_name is not None else None, "builds": self.builds}
+
+
+skin_catalog = SkinCatalog()
+champion_index = ChampionIndex()
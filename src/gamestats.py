@@ -1,57 +1,187 @@
 # --- This file is part of the League of Legends Live Client API integration.
 
-import requests
+import asyncio
+import hashlib
 import json
-import urllib3
-from typing import Dict, Optional, Any
+import ssl
+import aiohttp
+from time import time, monotonic
+from typing import Dict, List, Optional, Any
 
 from .utilities import addLog, logger # Import logger and addLog
 
 # --- Constants ---
 LIVE_CLIENT_API_BASE_URL = "https://127.0.0.1:2999/liveclientdata"
 REQUEST_TIMEOUT = 1.0 
+LIVE_CLIENT_POOL_SIZE = 4 # Enough for the endpoints fetched concurrently in one tick
+LIVE_CLIENT_KEEPALIVE_TIMEOUT = 30.0
+GAME_CLOCK_RESYNC_INTERVAL = 60.0 # Seconds between routine game time resyncs
+GAME_CLOCK_DRIFT_THRESHOLD = 2.0 # Seconds of drift (pause, reconnect) that force an early resync
+GAME_CLOCK_EVENT_LAG_ALLOWANCE = 6.0 # Events can be observed up to one poll interval after they happen
 
-# Suppress only the InsecureRequestWarning from urllib3 needed for verify=False
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Endpoints whose raw body is usually byte-identical between ticks; their decoded responses are reused on a fingerprint match
+FINGERPRINTED_ENDPOINTS = frozenset({"playerlist", "eventdata"})
 
 # Special marker to indicate API is not ready (e.g., loading screen 404 or connection error)
 API_NOT_READY_MARKER = {"status": "api_not_ready"}
 
-def _make_live_client_request(endpoint: str, description: str) -> Optional[Any]:
+
+def _build_live_client_ssl_context() -> ssl.SSLContext:
+    """
+    Builds the SSL context used for every Live Client API connection.
+    The game serves a self-signed certificate on 127.0.0.1, so verification is disabled.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+_LIVE_CLIENT_SSL_CONTEXT = _build_live_client_ssl_context()
+
+
+_live_client_session: Optional[aiohttp.ClientSession] = None
+_live_client_stats = {"requests": 0, "connections": 0}
+
+# Per endpoint (without query string): (endpoint with query, fingerprint of the raw body, decoded response)
+_response_fingerprints: Dict[str, tuple] = {}
+_response_cache_stats = {"hits": 0, "misses": 0, "stats_hits": 0}
+# (active player entry, stats) from the last getStats call; reused while playerlist is unchanged
+_last_derived_stats: Optional[tuple] = None
+
+
+async def _on_live_client_connection_created(session, trace_config_ctx, params):
+    _live_client_stats["connections"] += 1
+
+
+def _get_live_client_session() -> aiohttp.ClientSession:
+    """
+    Returns the keep-alive session shared by all Live Client API requests of the current match,
+    creating it on first use. Must be called from the main event loop.
+    """
+    global _live_client_session
+    if _live_client_session is None or _live_client_session.closed:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(_on_live_client_connection_created)
+        connector = aiohttp.TCPConnector(
+            ssl=_LIVE_CLIENT_SSL_CONTEXT,
+            limit=LIVE_CLIENT_POOL_SIZE,
+            keepalive_timeout=LIVE_CLIENT_KEEPALIVE_TIMEOUT
+        )
+        _live_client_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            trace_configs=[trace_config]
+        )
+        _live_client_stats["requests"] = 0
+        _live_client_stats["connections"] = 0
+        logger.debug("Live Client API session created.")
+    return _live_client_session
+
+
+def get_live_client_connection_stats() -> Dict[str, int]:
+    """
+    Returns request and connection counters for the current Live Client API session.
+    With keep-alive working, "connections" stays at the number of concurrent requests per tick while "requests" grows.
+    """
+    return dict(_live_client_stats)
+
+
+def get_response_cache_stats() -> Dict[str, int]:
+    """
+    Returns hit/miss counters for the raw-response fingerprint cache.
+    "stats_hits" counts getStats calls answered from the previous result because playerlist was unchanged.
+    """
+    return dict(_response_cache_stats)
+
+
+def _fingerprint_response(raw_body: bytes) -> bytes:
+    return hashlib.blake2b(raw_body, digest_size=16).digest()
+
+
+def _decode_response(endpoint: str, raw_body: bytes) -> Any:
+    """
+    Decodes a raw Live Client response, reusing the previous decoded object if the body is unchanged.
+    Callers must treat the returned object as read-only, since it can be shared between ticks.
+    """
+    base_endpoint = endpoint.partition("?")[0]
+    if base_endpoint not in FINGERPRINTED_ENDPOINTS:
+        return json.loads(raw_body)
+
+    fingerprint = _fingerprint_response(raw_body)
+    cached = _response_fingerprints.get(base_endpoint)
+    if cached is not None and cached[0] == endpoint and cached[1] == fingerprint:
+        _response_cache_stats["hits"] += 1
+        return cached[2]
+
+    _response_cache_stats["misses"] += 1
+    decoded = json.loads(raw_body)
+    _response_fingerprints[base_endpoint] = (endpoint, fingerprint, decoded)
+    return decoded
+
+
+def clear_response_cache():
+    global _last_derived_stats
+    _response_fingerprints.clear()
+    _last_derived_stats = None
+
+
+async def close_live_client_session():
+    """
+    Closes the shared Live Client API session and its pooled connections.
+    Called when the game leaves the InProgress phase; the next request opens a new session.
+    """
+    global _live_client_session
+    if _live_client_session is None:
+        return
+    session, _live_client_session = _live_client_session, None
+    logger.info(f"Closing Live Client API session: {_live_client_stats['requests']} requests over {_live_client_stats['connections']} connection(s). Response cache: {_response_cache_stats}")
+    clear_response_cache()
+    try:
+        await session.close()
+    except Exception as e:
+        logger.warning(f"Error closing Live Client API session: {e}")
+
+async def _make_live_client_request(endpoint: str, description: str) -> Optional[Any]:
     """
     Helper function to make requests to the Live Client API.
     Handles common errors and JSON parsing. Returns API_NOT_READY_MARKER on 404 or connection issues.
     """
     url = f"{LIVE_CLIENT_API_BASE_URL}/{endpoint}"
     try:
-        response = requests.get(url, verify=False, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-        
+        session = _get_live_client_session()
+        _live_client_stats["requests"] += 1
+        async with session.get(url) as response:
+            if response.status == 404:
+                await response.read() # Drain the body so the connection goes back to the pool instead of being closed
+                logger.debug(f"Live Client API endpoint {url} returned 404 (Not Found) for {description}. Likely loading screen.")
+                return API_NOT_READY_MARKER 
+            if response.status >= 400:
+                error_text = await response.text()
+                logger.error(f"HTTPError fetching {description} from {url}: {response.status} - {error_text[:100]}", exc_info=False)
+                addLog(f"Live Client API HTTPError: {description} {response.status}", level="ERROR")
+                return None # For other HTTP errors
+
+            raw_body = await response.read()
+
         if endpoint == "activeplayername": # This endpoint returns plain text
+            response_text = raw_body.decode("utf-8", errors="replace")
             try:
                 # Try to parse as JSON first, as it might be a quoted string
-                name_data = response.json() 
+                name_data = json.loads(response_text) 
                 if isinstance(name_data, str):
                     return name_data.strip('"') # Remove quotes if present
                 else: 
                     # If it's not a simple string after JSON parsing, log and fallback to raw text
                     logger.warning(f"Unexpected JSON structure for {description} from {url}: {name_data}. Expected string.")
-                    return response.text.strip() 
+                    return response_text.strip() 
             except json.JSONDecodeError:
                 # If not JSON, it's likely plain text
                 logger.debug(f"{description} from {url} is not JSON, treating as plain text.")
-                return response.text.strip() 
-
-        return response.json() # For other endpoints that return JSON objects/lists
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
-            logger.debug(f"Live Client API endpoint {url} returned 404 (Not Found) for {description}. Likely loading screen.")
-            return API_NOT_READY_MARKER 
-        logger.error(f"HTTPError fetching {description} from {url}: {e.response.status_code} - {e.response.text[:100]}", exc_info=False)
-        addLog(f"Live Client API HTTPError: {description} {e.response.status_code}", level="ERROR")
-        return None # For other HTTP errors
-    except requests.exceptions.RequestException as e: # Catches ConnectionError, Timeout, etc.
-        logger.warning(f"RequestException fetching {description} from {url}: {type(e).__name__}. Likely loading screen or client not in game.", exc_info=False)
+                return response_text.strip() 
+
+        return _decode_response(endpoint, raw_body) # For other endpoints that return JSON objects/lists
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e: # Catches connection errors, timeouts, etc.
+        logger.warning(f"Request error fetching {description} from {url}: {type(e).__name__}. Likely loading screen or client not in game.", exc_info=False)
         # Do not addLog here to avoid spamming if client is just not in game.
         return API_NOT_READY_MARKER # Treat connection errors also as API not ready
     except Exception as e: # Catch-all for other unexpected errors
@@ -60,13 +190,23 @@ def _make_live_client_request(endpoint: str, description: str) -> Optional[Any]:
         return None
 
 
-def get_active_player_summoner_name() -> Optional[Any]: # Can return string or API_NOT_READY_MARKER
+async def fetch_live_client_endpoints(endpoints: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Fetches several Live Client API endpoints concurrently over the shared session.
+    Takes {endpoint: description} and returns {endpoint: result}, each result following
+    the same API_NOT_READY_MARKER/None semantics as a single request.
+    """
+    results = await asyncio.gather(*(_make_live_client_request(endpoint, description) for endpoint, description in endpoints.items()))
+    return dict(zip(endpoints.keys(), results))
+
+
+async def get_active_player_summoner_name() -> Optional[Any]: # Can return string or API_NOT_READY_MARKER
     """
     Fetches the summoner name of the active player from the Live Client API.
     Returns API_NOT_READY_MARKER if the API is not ready (404/connection error).
     """
     logger.debug("Fetching active player summoner name...")
-    active_player_name_data = _make_live_client_request("activeplayername", "active player name")
+    active_player_name_data = await _make_live_client_request("activeplayername", "active player name")
     
     if active_player_name_data == API_NOT_READY_MARKER:
         return API_NOT_READY_MARKER # Propagate marker
@@ -79,111 +219,372 @@ def get_active_player_summoner_name() -> Optional[Any]: # Can return string or A
         logger.warning(f"Received non-string/non-marker data for active player name: {active_player_name_data}")
     return None
 
-def get_current_game_time() -> Optional[Any]: # Can return float, API_NOT_READY_MARKER, or None
+class LiveGameSnapshot:
+    """
+    A single tick's view of the Live Client API.
+    Built from /liveclientdata/allgamedata until the active player is resolved, then from playerlist and gamestats.
+    Holds the game time, the active player's identity, the full player list and the active player's scores.
+    """
+    __slots__ = ("game_time", "active_player_name", "active_player", "players", "game_data")
+
+    def __init__(self, game_time: Optional[float], active_player_name: Optional[str],
+                 active_player: Optional[Dict[str, Any]], players: List[Dict[str, Any]], game_data: Dict[str, Any]):
+        self.game_time = game_time
+        self.active_player_name = active_player_name
+        self.active_player = active_player # Entry of the active player in `players`, or None if not found
+        self.players = players
+        self.game_data = game_data
+
+    @property
+    def scores(self) -> Dict[str, Any]:
+        if not self.active_player:
+            return {}
+        return self.active_player.get("scores", {}) or {}
+
+    def __repr__(self):
+        return f"LiveGameSnapshot(game_time={self.game_time}, active_player_name={self.active_player_name!r}, players={len(self.players)})"
+
+
+class _MatchIdentity:
+    """
+    The active player's identity for the current match.
+    Resolved once from allgamedata and kept until the game ID changes or the API goes back to not-ready.
+    """
+    __slots__ = ("active_name", "name_key", "player_index")
+
+    def __init__(self, active_name: str, name_key: str, player_index: int):
+        self.active_name = active_name
+        self.name_key = name_key # "riotId" or "summonerName", whichever matched the active player's name
+        self.player_index = player_index
+
+
+_match_identity: Optional[_MatchIdentity] = None
+_current_game_id: Optional[Any] = None
+
+
+def begin_live_match(game_id: Optional[Any]):
+    """
+    Scopes the identity cache to a match. Called when an in-game loop starts with the LCU game ID.
+    """
+    global _current_game_id
+    if game_id != _current_game_id:
+        reset_match_identity(f"game ID changed to {game_id}")
+        _current_game_id = game_id
+
+
+def reset_match_identity(reason: str = "reset requested"):
+    global _match_identity
+    if _match_identity is not None:
+        logger.info(f"Live Client identity cache invalidated: {reason}.")
+    _match_identity = None
+
+
+def _find_active_player_index(players: List[Any], active_name: str) -> Optional[tuple]:
+    """
+    Finds the active player's entry in a player list and the key it matched on.
+    activeplayername returns the Riot ID, which some client versions only expose as `riotId`
+    and others also as `summonerName`, so both keys are checked.
+    Returns (index, name_key) or None.
+    """
+    for index, player in enumerate(players):
+        if not isinstance(player, dict):
+            continue
+        if player.get("riotId") == active_name:
+            return (index, "riotId")
+        if player.get("summonerName") == active_name:
+            return (index, "summonerName")
+    return None
+
+
+def _locate_cached_active_player(players: List[Any], identity: _MatchIdentity) -> Optional[Dict[str, Any]]:
+    """
+    Returns the active player's entry using the cached index, rescanning only if the list order changed.
+    """
+    index = identity.player_index
+    if index < len(players):
+        player = players[index]
+        if isinstance(player, dict) and player.get(identity.name_key) == identity.active_name:
+            return player
+
+    for index, player in enumerate(players):
+        if isinstance(player, dict) and player.get(identity.name_key) == identity.active_name:
+            logger.debug(f"Active player moved in player list to index {index}.")
+            identity.player_index = index
+            return player
+    return None
+
+
+def _parse_game_time(game_time: Any, source: str) -> Optional[float]:
+    if isinstance(game_time, (float, int)):
+        return float(game_time)
+    if game_time is not None:
+        logger.warning(f"{source} returned gameTime but it's not a number: {game_time}")
+    return None
+
+
+def _parse_all_game_data(all_game_data: Dict[str, Any]) -> Optional[Any]:
     """
-    Fetches the current game time from /liveclientdata/gamestats.
-    Returns the gameTime as float, API_NOT_READY_MARKER, or None if an error occurs.
+    Builds a LiveGameSnapshot from an allgamedata response and resolves the match identity from it.
+    Returns API_NOT_READY_MARKER while the game is still loading, or None if the payload is malformed.
     """
-    logger.debug("Fetching current game time from API...")
-    gamestats_data = _make_live_client_request("gamestats", "game time stats")
+    global _match_identity
+    game_data = all_game_data.get("gameData") or {}
+    active_player_data = all_game_data.get("activePlayer") or {}
+    players = all_game_data.get("allPlayers")
 
-    if gamestats_data == API_NOT_READY_MARKER:
+    if not isinstance(players, list) or not players:
+        logger.debug("allgamedata has no player list yet. Indicating API loading state.")
         return API_NOT_READY_MARKER
-    
-    if isinstance(gamestats_data, dict) and "gameTime" in gamestats_data:
-        game_time = gamestats_data["gameTime"]
-        if int(game_time) < 1: # If gameTime is less than 1 second, likely not started yet
-            return API_NOT_READY_MARKER
-        if isinstance(game_time, (float, int)):
-            return float(game_time)
+
+    active_name = active_player_data.get("riotId") or active_player_data.get("summonerName")
+    if isinstance(active_name, str):
+        active_name = active_name.strip('"')
+    else:
+        active_name = None
+        logger.warning(f"allgamedata did not contain an active player name. activePlayer: {str(active_player_data)[:100]}")
+
+    game_time = _parse_game_time(game_data.get("gameTime"), "allgamedata")
+
+    active_player = None
+    if active_name:
+        match = _find_active_player_index(players, active_name)
+        if match:
+            player_index, name_key = match
+            active_player = players[player_index]
+            _match_identity = _MatchIdentity(active_name, name_key, player_index)
+            logger.info(f"Live Client identity resolved: '{active_name}' at index {player_index} (matched on {name_key}).")
         else:
-            logger.warning(f"gamestats API returned gameTime but it's not a number: {game_time}")
-    elif gamestats_data is not None: # Data received but not in expected format
-        logger.warning(f"gamestats API response did not contain 'gameTime' or was not a dict. Data: {str(gamestats_data)[:100]}")
-    
-    return None # If error, or gameTime not found/invalid type
+            logger.warning(f"Active player '{active_name}' not found in allgamedata player list.")
+
+    return LiveGameSnapshot(game_time, active_name, active_player, players, game_data)
+
+
+async def _get_full_snapshot() -> Optional[Any]:
+    logger.debug("Fetching full live game snapshot...")
+    all_game_data = await _make_live_client_request("allgamedata", "all game data")
+
+    if all_game_data == API_NOT_READY_MARKER:
+        return API_NOT_READY_MARKER
+    if not isinstance(all_game_data, dict):
+        if all_game_data is not None:
+            logger.warning(f"allgamedata response was not a dict. Data: {str(all_game_data)[:100]}")
+        return None
+
+    return _parse_all_game_data(all_game_data)
+
+
+async def get_live_snapshot(include_game_time: bool = True) -> Optional[Any]: # Can return LiveGameSnapshot, API_NOT_READY_MARKER, or None
+    """
+    Returns a LiveGameSnapshot for this tick.
+    /liveclientdata/allgamedata is only fetched while the active player's identity is unresolved: at the start of
+    a match, after the API went back to not-ready, or when the player is missing from the player list.
+    Otherwise only playerlist is fetched, plus gamestats if include_game_time, and the player is located by cached index.
+    Without include_game_time the snapshot's game_time is None; use a GameClock for the time instead.
+    Returns API_NOT_READY_MARKER if the API is not ready (404/connection error/loading), or None if an error occurs.
+    """
+    identity = _match_identity
+    if identity is None:
+        return await _get_full_snapshot()
+
+    logger.debug("Fetching live game snapshot...")
+    if include_game_time:
+        results = await fetch_live_client_endpoints({"playerlist": "player list", "gamestats": "game time stats"})
+        player_list, game_stats = results["playerlist"], results["gamestats"]
+    else:
+        player_list, game_stats = await _make_live_client_request("playerlist", "player list"), {}
+
+    if player_list == API_NOT_READY_MARKER or game_stats == API_NOT_READY_MARKER:
+        reset_match_identity("Live Client API returned to not-ready")
+        return API_NOT_READY_MARKER
+    if not isinstance(player_list, list) or not isinstance(game_stats, dict):
+        logger.warning(f"Could not retrieve or parse player list/game stats. Data: {str(player_list)[:100]} / {str(game_stats)[:100]}")
+        return None
+
+    active_player = _locate_cached_active_player(player_list, identity)
+    if active_player is None:
+        reset_match_identity(f"active player '{identity.active_name}' no longer in player list")
+        return await _get_full_snapshot()
+
+    game_time = _parse_game_time(game_stats.get("gameTime"), "gamestats")
+    return LiveGameSnapshot(game_time, identity.active_name, active_player, player_list, game_stats)
+
 
-def getStats() -> Dict[str, Any]: # Return type can include the marker
+class GameClock:
     """
-    Fetches KDA, CS, and level for the active player from the Live Client API.
+    Local model of the in-game clock for one match.
+    Anchors the monotonic clock to a Live Client gameTime and extrapolates from there, so gamestats only
+    needs to be fetched on a resync. The Discord start timestamp is computed once per sync and does not jitter.
+    """
+    def __init__(self):
+        self._anchor_game_time: Optional[float] = None
+        self._anchor_monotonic: Optional[float] = None
+        self.start_timestamp: Optional[int] = None
+        self.syncs = 0
+
+    @property
+    def synced(self) -> bool:
+        return self._anchor_game_time is not None
+
+    def now(self) -> Optional[float]:
+        if not self.synced:
+            return None
+        return self._anchor_game_time + (monotonic() - self._anchor_monotonic)
+
+    def needs_resync(self) -> bool:
+        return not self.synced or monotonic() - self._anchor_monotonic >= GAME_CLOCK_RESYNC_INTERVAL
+
+    def sync(self, game_time: float):
+        if self.synced:
+            drift = game_time - self.now()
+            if abs(drift) > GAME_CLOCK_DRIFT_THRESHOLD:
+                logger.info(f"Game clock drifted by {drift:+.1f}s (pause or reconnect). Re-anchoring.")
+        self._anchor_game_time = game_time
+        self._anchor_monotonic = monotonic()
+        self.start_timestamp = int(time() - game_time)
+        self.syncs += 1
+
+    def observe_events(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Checks the EventTime of new Live Client events against the extrapolated clock.
+        Invalidates the clock and returns True if it drifted past the threshold, so the next tick resyncs.
+        """
+        estimated_game_time = self.now()
+        if estimated_game_time is None:
+            return False
+        for event in events:
+            event_time = event.get("EventTime")
+            if not isinstance(event_time, (float, int)):
+                continue
+            drift = event_time - estimated_game_time
+            if drift > GAME_CLOCK_DRIFT_THRESHOLD or drift < -(GAME_CLOCK_DRIFT_THRESHOLD + GAME_CLOCK_EVENT_LAG_ALLOWANCE):
+                logger.debug(f"Event {event.get('EventName')} at {event_time:.1f}s disagrees with game clock ({estimated_game_time:.1f}s).")
+                self.reset()
+                return True
+        return False
+
+    def reset(self):
+        self._anchor_game_time = None
+        self._anchor_monotonic = None
+
+
+# Events that can change what the in-game presence shows (KDA, game state)
+PRESENCE_RELEVANT_EVENTS = frozenset({"ChampionKill", "Multikill", "Ace", "FirstBlood", "GameEnd"})
+
+class LiveEventFeed:
+    """
+    Incremental consumer of /liveclientdata/eventdata for one match.
+    Remembers the last seen EventID and only asks the API for newer events.
+    """
+    def __init__(self):
+        self.last_event_id = -1
+        self.polls = 0
+        self.events_received = 0
+
+    def reset(self):
+        self.last_event_id = -1
+
+    async def poll(self) -> Optional[Any]: # Can return a list of new events, API_NOT_READY_MARKER, or None
+        self.polls += 1
+        event_data = await _make_live_client_request(f"eventdata?eventID={self.last_event_id + 1}", "event data")
+
+        if event_data == API_NOT_READY_MARKER:
+            return API_NOT_READY_MARKER
+        events = event_data.get("Events") if isinstance(event_data, dict) else None
+        if not isinstance(events, list):
+            if event_data is not None:
+                logger.warning(f"eventdata response did not contain an event list. Data: {str(event_data)[:100]}")
+            return None
+
+        new_events = [event for event in events if isinstance(event, dict) and isinstance(event.get("EventID"), int) and event["EventID"] > self.last_event_id]
+        if new_events:
+            self.last_event_id = max(event["EventID"] for event in new_events)
+            self.events_received += len(new_events)
+            logger.debug(f"Live Client events received: {[event.get('EventName') for event in new_events]}")
+        return new_events
+
+    @staticmethod
+    def affects_presence(events: List[Dict[str, Any]]) -> bool:
+        return any(event.get("EventName") in PRESENCE_RELEVANT_EVENTS for event in events)
+
+    def stats(self) -> Dict[str, int]:
+        return {"polls": self.polls, "events_received": self.events_received, "last_event_id": self.last_event_id}
+
+
+def get_current_game_time(snapshot: Optional[Any]) -> Optional[Any]: # Can return float, API_NOT_READY_MARKER, or None
+    """
+    Returns the current game time as float, API_NOT_READY_MARKER, or None if an error occurs.
+    View over a snapshot returned by get_live_snapshot(); makes no request itself.
+    """
+    if snapshot == API_NOT_READY_MARKER:
+        return API_NOT_READY_MARKER
+    if not isinstance(snapshot, LiveGameSnapshot) or snapshot.game_time is None:
+        return None # If error, or gameTime not found/invalid type
+
+    if snapshot.game_time < 1: # If gameTime is less than 1 second, likely not started yet
+        return API_NOT_READY_MARKER
+    return snapshot.game_time
+
+def getStats(snapshot: Optional[Any]) -> Dict[str, Any]: # Return type can include the marker
+    """
+    Returns KDA, CS, and level for the active player.
     Returns a dictionary with "kda", "cs", "level" as keys, or API_NOT_READY_MARKER.
+    View over a snapshot returned by get_live_snapshot(); makes no request itself.
     """
-    logger.debug("Attempting to fetch live game stats...")
+    global _last_derived_stats
     default_stats = {"kda": None, "cs": None, "level": None}
 
-    active_summoner_name_result = get_active_player_summoner_name()
-    if active_summoner_name_result == API_NOT_READY_MARKER:
-        logger.debug("Active player name endpoint not ready (getStats). Indicating API loading state.")
+    if snapshot == API_NOT_READY_MARKER:
+        logger.debug("Live Client API not ready (getStats). Indicating API loading state.")
         return API_NOT_READY_MARKER
-    if not active_summoner_name_result: 
-        logger.warning("Could not determine active player's summoner name (not a 404/conn error). Cannot fetch stats.")
+    if not isinstance(snapshot, LiveGameSnapshot):
+        logger.warning("Could not retrieve live game snapshot. Cannot fetch stats.")
+        return default_stats
+    if not snapshot.active_player:
+        logger.warning(f"Active player '{snapshot.active_player_name}' not found in player list or stats missing.")
         return default_stats
-    active_summoner_name = active_summoner_name_result 
 
-    player_list_data = _make_live_client_request("playerlist", "player list")
-    if player_list_data == API_NOT_READY_MARKER:
-        logger.debug("Player list endpoint not ready (getStats). Indicating API loading state.")
-        return API_NOT_READY_MARKER
-    
-    if not player_list_data or not isinstance(player_list_data, list):
-        logger.warning(f"Could not retrieve or parse player list. Data: {str(player_list_data)[:100]}")
+    # An unchanged playerlist is returned as the same decoded object, so the entry itself identifies the stats
+    if _last_derived_stats is not None and _last_derived_stats[0] is snapshot.active_player:
+        _response_cache_stats["stats_hits"] += 1
+        return dict(_last_derived_stats[1])
+
+    try:
+        scores = snapshot.scores
+        kda_str = f"{scores.get('kills', 0)}/{scores.get('deaths', 0)}/{scores.get('assists', 0)}"
+        cs_str = str(scores.get('creepScore', 0))
+        level_str = str(snapshot.active_player.get('level', 0))
+
+        logger.debug(f"Stats found for {snapshot.active_player_name}: KDA {kda_str}, CS {cs_str}, Lvl {level_str}")
+        stats = {"kda": kda_str, "cs": cs_str, "level": level_str}
+        _last_derived_stats = (snapshot.active_player, stats)
+        return dict(stats)
+    except Exception as e:
+        logger.error(f"Error processing player data for {snapshot.active_player_name}: {e}", exc_info=True)
         return default_stats
 
-    for player_data in player_list_data:
-        if isinstance(player_data, dict) and player_data.get("summonerName") == active_summoner_name:
-            try:
-                scores = player_data.get("scores", {})
-                kda_str = f"{scores.get('kills', 0)}/{scores.get('deaths', 0)}/{scores.get('assists', 0)}"
-                cs_str = str(scores.get('creepScore', 0))
-                level_str = str(player_data.get('level', 0)) 
-
-                logger.debug(f"Stats found for {active_summoner_name}: KDA {kda_str}, CS {cs_str}, Lvl {level_str}")
-                return {"kda": kda_str, "cs": cs_str, "level": level_str}
-            except KeyError as e:
-                logger.error(f"Missing expected key in player data for {active_summoner_name}: {e}", exc_info=True)
-                return default_stats 
-            except Exception as e: 
-                logger.error(f"Error processing player data for {active_summoner_name}: {e}", exc_info=True)
-                return default_stats
-
-    logger.warning(f"Active player '{active_summoner_name}' not found in player list or stats missing.")
-    return default_stats
-
-def get_active_player_champion_data() -> Optional[Any]:
-    """
-    Fetches champion data for the active player from the Live Client API.
+def get_active_player_champion_data(snapshot: Optional[Any]) -> Optional[Any]:
+    """
+    Returns champion data for the active player.
     Returns API_NOT_READY_MARKER if the API is not ready, or a tuple (championName, skinId), or (None, None) on error.
+    View over a snapshot returned by get_live_snapshot(); makes no request itself.
     """
-    logger.debug("Fetching active player champion data...")
-    active_name = get_active_player_summoner_name()
-    if active_name == API_NOT_READY_MARKER:
+    if snapshot == API_NOT_READY_MARKER:
         return API_NOT_READY_MARKER
-    if not active_name:
-        logger.warning("Could not determine active player's summoner name. Cannot fetch champion data.")
+    if not isinstance(snapshot, LiveGameSnapshot):
+        logger.warning("Could not retrieve live game snapshot for champion data.")
         return (None, None)
-
-    player_list = _make_live_client_request("playerlist", "player list")
-    if player_list == API_NOT_READY_MARKER:
-        logger.debug("Player list endpoint not ready (champion data). Indicating API loading state.")
-        return API_NOT_READY_MARKER
-    if not player_list or not isinstance(player_list, list):
-        logger.warning(f"Could not retrieve or parse player list for champion data. Data: {player_list}")
+    if not snapshot.active_player:
+        logger.warning(f"Active player '{snapshot.active_player_name}' not found in player list for champion data.")
         return (None, None)
 
-    for player in player_list:
-        if isinstance(player, dict) and player.get("riotId") == active_name:
-            champion = player.get("championName")
-            skin_id = player.get("skinID")
-            logger.debug(f"Champion data for {active_name}: {champion}, skin ID: {skin_id}")
-            return (champion, skin_id)
-
-    logger.warning(f"Active player '{active_name}' not found in player list for champion data.")
-    return (None, None)
+    champion = snapshot.active_player.get("championName")
+    skin_id = snapshot.active_player.get("skinID")
+    logger.debug(f"Champion data for {snapshot.active_player_name}: {champion}, skin ID: {skin_id}")
+    return (champion, skin_id)
 
-if __name__ == '__main__':
-    logger.info("Running gamestats.py directly for testing...")
-    
-    current_time = get_current_game_time()
+async def _run_live_client_self_test():
+    snapshot = await get_live_snapshot()
+    current_time = get_current_game_time(snapshot)
     if current_time == API_NOT_READY_MARKER:
         logger.info("Test Game Time: API not ready.")
     elif isinstance(current_time, float):
@@ -191,7 +592,7 @@ if __name__ == '__main__':
     else:
         logger.warning("Test Game Time: Could not retrieve game time.")
 
-    stats = getStats()
+    stats = getStats(snapshot)
     if stats == API_NOT_READY_MARKER:
         logger.info("Test Stats: API not ready.")
     elif stats.get("kda"): 
@@ -199,3 +600,13 @@ if __name__ == '__main__':
     else:
         logger.warning("Test Stats: Could not retrieve player stats.")
 
+    endpoint_results = await fetch_live_client_endpoints({"activeplayername": "active player name", "gamestats": "game time stats"})
+    logger.info(f"Test Concurrent Fetch: {endpoint_results}")
+
+    logger.info(f"Test Connection Stats: {get_live_client_connection_stats()}")
+    logger.info(f"Test Response Cache Stats: {get_response_cache_stats()}")
+    await close_live_client_session()
+
+if __name__ == '__main__':
+    logger.info("Running gamestats.py directly for testing...")
+    asyncio.run(_run_live_client_self_test())
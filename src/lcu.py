@@ -1,10 +1,79 @@
 import asyncio
 import os
+from typing import Any, Callable, Dict
 from lcu_driver.connection import Connection
 from lcu_driver.utils import _return_ux_process # For finding LCU process
 
 from .utilities import logger, addLog, procPath, LEAGUE_CLIENT_EXECUTABLE
 
+LCU_EVENT_COALESCE_WINDOW = 0.25 # Seconds an UPDATE waits for newer ones on the same URI
+
+
+class LcuEventCoalescer:
+    """
+    Ingest stage between connector.ws.register and the websocket handlers.
+    UPDATE events are held for `window` seconds and only the newest one per URI is handled, so a burst of
+    session updates in champ select runs its handler once. CREATE/DELETE events, and events for which the
+    URI's `urgent_key` changes (e.g. a gameflow phase transition), are handled immediately and supersede any held one.
+    """
+    def __init__(self, window: float = LCU_EVENT_COALESCE_WINDOW):
+        self.window = window
+        self._pending: Dict[str, tuple] = {} # uri -> (handler, connection, event) waiting for the window to pass
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        self._urgent_keys: Dict[str, Any] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def wrap(self, uri: str, handler: Callable, urgent_key: Callable[[Any], Any] | None = None) -> Callable:
+        """Returns a websocket handler for `uri` that feeds `handler` through this stage."""
+        counters = self._counters.setdefault(uri, {"received": 0, "processed": 0})
+
+        async def ingest(connection, event):
+            counters["received"] += 1
+            is_urgent = event.type != "UPDATE"
+            if urgent_key is not None:
+                try: key = urgent_key(event)
+                except Exception: key = None
+                if key != self._urgent_keys.get(uri):
+                    self._urgent_keys[uri] = key
+                    is_urgent = True
+            if is_urgent:
+                self._pending.pop(uri, None) # This event is newer than anything held
+                counters["processed"] += 1
+                await handler(connection, event)
+                return
+            self._pending[uri] = (handler, connection, event) # Latest wins
+            if uri not in self._flush_tasks or self._flush_tasks[uri].done():
+                self._flush_tasks[uri] = asyncio.create_task(self._flush_after_window(uri))
+        return ingest
+
+    async def _flush_after_window(self, uri: str):
+        # Updates that arrive while the handler runs find this task still running, so they are flushed here after another window
+        while uri in self._pending:
+            await asyncio.sleep(self.window)
+            pending = self._pending.pop(uri, None)
+            if pending is None:
+                return
+            handler, connection, event = pending
+            self._counters[uri]["processed"] += 1
+            try:
+                await handler(connection, event)
+            except Exception as e:
+                logger.error(f"Error handling coalesced LCU event for {uri}: {e}", exc_info=True)
+
+    async def cancel_pending(self):
+        """Drops held events, e.g. when the LCU disconnects."""
+        self._pending.clear()
+        self._urgent_keys.clear()
+        for task in list(self._flush_tasks.values()):
+            if not task.done():
+                task.cancel()
+                try: await task
+                except asyncio.CancelledError: pass
+        self._flush_tasks.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {uri: dict(counters) for uri, counters in self._counters.items()}
+
 class LcuManager:
     """
     Manages the connection to the League of Legends LCU.
@@ -0,0 +1,172 @@
+from json import JSONDecodeError
+from typing import Dict, Any, Optional
+
+from .utilities import logger
+
+RANKED_STATS_ENDPOINT = "/lol-ranked/v1/current-ranked-stats"
+LOBBY_ENDPOINT = "/lol-lobby/v2/lobby"
+GAMEFLOW_PHASE_ENDPOINT = "/lol-gameflow/v1/gameflow-phase"
+
+
+class RankedStatsStore:
+    """
+    In-memory copy of the summoner's ranked stats, kept current by the LCU websocket.
+    Primed with one request when the LCU is ready; after that, the lobby presence reads tier, division, LP and W/L
+    from memory instead of requesting them on every session event.
+    """
+    def __init__(self):
+        self._queue_map: Optional[Dict[str, Any]] = None # None until primed or the first websocket event
+        self.primes = 0
+        self.updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._queue_map is not None
+
+    def apply(self, ranked_stats: Any):
+        """Replaces the stored stats with a current-ranked-stats payload (websocket event data or response body)."""
+        queue_map = ranked_stats.get("queueMap") if isinstance(ranked_stats, dict) else None
+        self._queue_map = queue_map if isinstance(queue_map, dict) else {}
+        self.updates += 1
+
+    def reset(self):
+        """Forgets the stats, e.g. when the LCU disconnects."""
+        self._queue_map = None
+
+    async def prime(self, connection: Any) -> bool:
+        """Loads the current stats with a single request. Returns whether the store is ready."""
+        try:
+            response = await connection.request('get', RANKED_STATS_ENDPOINT)
+            if response and response.status == 200:
+                self.apply(await response.json())
+                self.primes += 1
+                logger.debug(f"Ranked stats store primed: {len(self._queue_map)} queues.")
+                return True
+            logger.warning(f"Could not prime ranked stats (Status: {response.status if response else 'No Response'}).")
+        except JSONDecodeError:
+            logger.error("Error parsing ranked stats JSON while priming the store.")
+        except Exception as e:
+            logger.error(f"Error priming ranked stats store: {e}", exc_info=True)
+        return False
+
+    def get(self, queue_type: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Rank info of one queue (tier, division, leaguePoints, wins, losses), or None if unknown."""
+        queue_rank_info = self._queue_map.get(queue_type) if self._queue_map is not None else None
+        return queue_rank_info if isinstance(queue_rank_info, dict) else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queues": len(self._queue_map) if self._queue_map is not None else None, "primes": self.primes, "updates": self.updates}
+
+
+class LobbyState:
+    """
+    Party membership of the current lobby, kept current by the lobby websocket.
+    The lobby presence reads the member count from memory instead of requesting the member list on every event.
+    """
+    def __init__(self):
+        self.member_count = 0
+        self.party_id: Optional[str] = None
+        self.party_type: Optional[str] = None # "open" or "closed"
+        self._known = False # False until primed or the first websocket event
+        self.updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._known
+
+    def apply(self, lobby: Any) -> bool:
+        """Updates from a lobby payload, or None when the lobby was deleted. Returns whether the member count changed."""
+        previous_count = self.member_count
+        if isinstance(lobby, dict):
+            members = lobby.get("members")
+            self.member_count = len(members) if isinstance(members, list) else 0
+            self.party_id = lobby.get("partyId")
+            self.party_type = lobby.get("partyType")
+        else:
+            self.member_count, self.party_id, self.party_type = 0, None, None
+        self._known = True
+        self.updates += 1
+        return self.member_count != previous_count
+
+    def reset(self):
+        """Forgets the lobby, e.g. when the LCU disconnects."""
+        self.member_count, self.party_id, self.party_type = 0, None, None
+        self._known = False
+
+    async def prime(self, connection: Any) -> bool:
+        """Loads the current lobby with a single request; a 404 means there is no lobby. Returns whether the state is known."""
+        try:
+            response = await connection.request('get', LOBBY_ENDPOINT)
+            if response and response.status == 200:
+                self.apply(await response.json())
+                return True
+            if response and response.status == 404:
+                self.apply(None)
+                return True
+            logger.warning(f"Could not prime lobby state (Status: {response.status if response else 'No Response'}).")
+        except JSONDecodeError:
+            logger.error("Error parsing lobby JSON while priming the lobby state.")
+        except Exception as e:
+            logger.error(f"Error priming lobby state: {e}", exc_info=True)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"members": self.member_count, "party_type": self.party_type, "known": self._known, "updates": self.updates}
+
+
+class GameflowPhaseState:
+    """
+    Authoritative gameflow phase, kept current by the gameflow-phase and gameflow session websocket events.
+    Every event bumps a sequence number. A phase read over HTTP is only stored if no event arrived while the
+    request was in flight, so a slow response can never overwrite a newer event.
+    """
+    def __init__(self):
+        self.phase: Optional[str] = None # None until primed or the first event
+        self.sequence = 0
+        self.http_reads = 0
+        self.stale_http_reads = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.phase is not None
+
+    def apply(self, phase: Any) -> bool:
+        """Records the phase from a websocket event. Returns whether it changed."""
+        phase = str(phase).strip('"') if phase is not None else "None"
+        self.sequence += 1
+        changed = phase != self.phase
+        self.phase = phase
+        return changed
+
+    def reset(self):
+        """Forgets the phase, e.g. when the LCU disconnects."""
+        self.phase = None
+        self.sequence += 1 # Invalidates reads started before the reset
+
+    async def current(self, connection: Any) -> Optional[str]:
+        """The current phase; read once over HTTP if no event has been seen yet. None if it cannot be determined."""
+        if self.phase is not None:
+            return self.phase
+        sequence_at_request = self.sequence
+        try:
+            self.http_reads += 1
+            response = await connection.request('get', GAMEFLOW_PHASE_ENDPOINT)
+            if not response or response.status != 200:
+                logger.warning(f"Could not get gameflow phase (Status: {response.status if response else 'No Response'}).")
+                return self.phase
+            phase_raw = await response.json()
+        except JSONDecodeError:
+            logger.error("Error parsing gameflow phase JSON.")
+            return self.phase
+        except Exception as e:
+            logger.error(f"Error fetching gameflow phase: {e}", exc_info=True)
+            return self.phase
+        if self.sequence != sequence_at_request:
+            self.stale_http_reads += 1
+            logger.debug(f"Gameflow phase from HTTP ignored; an event arrived meanwhile (phase '{self.phase}').")
+            return self.phase
+        self.phase = str(phase_raw).strip('"') if isinstance(phase_raw, (str, int, float, bool)) else "Unknown"
+        return self.phase
+
+    def stats(self) -> Dict[str, Any]:
+        return {"phase": self.phase, "sequence": self.sequence, "http_reads": self.http_reads, "stale_http_reads": self.stale_http_reads}
@@ -1,20 +1,26 @@
 import asyncio
 import json # For JSONDecodeError
 from typing import Dict, Any, Tuple, Callable
-from time import time # Import time for actual_game_start_time
-
-from pypresence import exceptions as PyPresenceExceptions # Import for specific exception handling
+from time import monotonic
 
 try:
     from .utilities import (
-        fetchConfig, ANIMATEDSPLASHESIDS,
+        fetchConfigSnapshot, ConfigSnapshot, ANIMATEDSPLASHESIDS,
         addLog, logger 
     )
     from .cdngen import (
         rankedEmblem, assetsLink, defaultTileLink,
         tftImg, mapIcon, animatedSplashUrl
     )
-    from .gamestats import getStats, API_NOT_READY_MARKER, get_current_game_time, get_active_player_champion_data
+    from .polling import AdaptivePollScheduler, EVENT_FALLBACK_REFRESH_INTERVAL
+    from .gamestats import (
+        getStats, API_NOT_READY_MARKER, get_current_game_time,
+        get_active_player_champion_data, get_live_snapshot, begin_live_match,
+        LiveEventFeed, GameClock, LiveGameSnapshot
+    )
+    from .timeline import StatsTimeline
+    from .catalog import skin_catalog, champion_index
+    from .presence import PresenceState, presence_changed
 except ImportError as e:
     print(f"Critical Error: Failed to import modules in modes.py: {e}")
     raise 
@@ -40,6 +46,367 @@ async def _fetch_lcu_data(connection: Any, endpoint: str, description: str) -> D
         return None
 
 
+class MatchLookupMemo:
+    """
+    Match-scoped memo of LCU lookups whose answer cannot change during a match (TFT companion, champion details).
+    Only successful responses are kept, so a failed request is retried next tick. Cleared when the match ends.
+    """
+    def __init__(self):
+        self._responses: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def fetch(self, connection: Any, endpoint: str, description: str) -> Dict[str, Any] | None:
+        if endpoint in self._responses:
+            self.hits += 1
+            return self._responses[endpoint]
+        self.misses += 1
+        data = await _fetch_lcu_data(connection, endpoint, description)
+        if data is not None:
+            self._responses[endpoint] = data
+        return data
+
+    def clear(self):
+        self._responses.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class SkinPresentation:
+    """Skin name and art shown while in game. Static for a match, so it is built once and reused every tick."""
+    __slots__ = ("skin_name", "tile_image", "splash_url", "animated_splash_available")
+
+    def __init__(self, skin_name: str, tile_image: str, splash_url: str | None, animated_splash_available: bool = False):
+        self.skin_name = skin_name
+        self.tile_image = tile_image
+        self.splash_url = splash_url
+        self.animated_splash_available = animated_splash_available
+
+
+def _find_skin_info(champ_skins_list: list, target_skin_id: int | None) -> Tuple[Dict[str, Any] | None, int | None]:
+    """Finds the skin, chroma or quest skin tier matching target_skin_id, falling back to the base skin."""
+    found_skin_info = None
+    for skin_info_iter in champ_skins_list:
+        if not isinstance(skin_info_iter, dict): continue
+        if skin_info_iter.get("id") == target_skin_id: found_skin_info = skin_info_iter; break
+        for chroma_info in skin_info_iter.get("chromas", []):
+            if isinstance(chroma_info, dict) and chroma_info.get("id") == target_skin_id: found_skin_info = skin_info_iter; break
+        if found_skin_info: break
+        for tier_info in skin_info_iter.get("questSkinInfo", {}).get("tiers", []):
+            if isinstance(tier_info, dict) and tier_info.get("id") == target_skin_id: found_skin_info = {**skin_info_iter, **tier_info}; break
+        if found_skin_info: break
+    if not found_skin_info:
+        for skin_info_iter in champ_skins_list:
+            if isinstance(skin_info_iter, dict) and skin_info_iter.get("isBase"): found_skin_info = skin_info_iter; break
+    if not found_skin_info and champ_skins_list: found_skin_info = champ_skins_list[0] if isinstance(champ_skins_list[0], dict) else None
+    if found_skin_info: target_skin_id = found_skin_info.get("id")
+    return found_skin_info, target_skin_id
+
+
+def _find_catalog_skin_info(champ_id: int, target_skin_id: int | None) -> Tuple[Dict[str, Any] | None, int | None]:
+    """Looks the skin up in the persistent skin catalog. Returns (None, target_skin_id) if it is unknown there."""
+    entry = skin_catalog.lookup(target_skin_id)
+    if entry is None or entry[0] != champ_id:
+        return None, target_skin_id
+    _, skin_record, tier_overrides = entry
+    found_skin_info = {**skin_record, **tier_overrides} if tier_overrides else skin_record
+    return found_skin_info, found_skin_info.get("id")
+
+
+class MatchSkinPresentation:
+    """
+    Resolves the in-game skin presentation once per match.
+    For Bravery, the rolled champion is resolved once, when the Live Client first reports it, through the session's champion index.
+    The skin is then looked up in the persistent skin catalog, then in the champion index if it is built, and only
+    as a last resort fetched from the LCU. The presentation is rebuilt only if the skin art settings change.
+    """
+    def __init__(self, champ_id: int, selected_skin_id: int):
+        self.champ_id = champ_id
+        self.selected_skin_id = selected_skin_id
+        self._actual_champ_id = champ_id
+        self._actual_skin_id = selected_skin_id
+        self._champ_skins_list = None
+        self._bravery_resolved = champ_id != -3
+        self._presentation = None
+        self._settings_key = None
+        self.lcu_fetches = 0
+
+    async def _resolve_bravery_champion(self, connection: Any, summoner_id: int, live_snapshot: Any) -> bool:
+        """Bravery: the champion is only known from the Live Client. Resolved once per match."""
+        actual_champ_data = get_active_player_champion_data(live_snapshot)
+        if actual_champ_data == API_NOT_READY_MARKER or actual_champ_data == (None, None):
+            logger.error("Bravery: Failed to fetch active player champion data.")
+            return False
+        actual_champ_name, actual_champ_skin_id = actual_champ_data
+        if not champion_index.ready: self.lcu_fetches += 1
+        if not await champion_index.ensure(connection, summoner_id):
+            return False
+        actual_champ_id = champion_index.champion_id(actual_champ_name)
+        if actual_champ_id is None:
+            logger.error(f"Bravery: Champion '{actual_champ_name}' not found in champion list.")
+            return False
+        self._actual_champ_id = actual_champ_id
+        self._actual_skin_id = (actual_champ_id * 1000 + actual_champ_skin_id) if actual_champ_skin_id else actual_champ_id * 1000
+        self._bravery_resolved = True
+        return True
+
+    async def _load_skins(self, connection: Any, summoner_id: int) -> bool:
+        champ_skins_list = champion_index.skins(self._actual_champ_id)
+        if champ_skins_list is None:
+            self.lcu_fetches += 1
+            champ_skins_list = await _fetch_lcu_data(connection, f'/lol-champions/v1/inventories/{summoner_id}/champions/{self._actual_champ_id}/skins', "champion skins")
+            if not isinstance(champ_skins_list, list):
+                return False
+        self._champ_skins_list = champ_skins_list
+        return True
+
+    async def resolve(self, connection: Any, summoner_id: int, live_snapshot: Any, config: ConfigSnapshot) -> SkinPresentation:
+        use_skin_splash = config.useSkinSplash
+        animated_splash = config.animatedSplash
+        settings_key = (use_skin_splash, animated_splash)
+        if self._presentation is not None and self._settings_key == settings_key:
+            return self._presentation
+
+        if not self._bravery_resolved and not await self._resolve_bravery_champion(connection, summoner_id, live_snapshot):
+            return SkinPresentation("Champion", defaultTileLink(self._actual_champ_id), None) # Not cached; retried next tick
+
+        found_skin_info = None
+        if self._champ_skins_list is None: # The persistent catalog avoids the LCU request entirely
+            found_skin_info, target_skin_id_to_use = _find_catalog_skin_info(self._actual_champ_id, self._actual_skin_id if use_skin_splash else (self._actual_champ_id * 1000))
+        if found_skin_info is None:
+            if self._champ_skins_list is None and not await self._load_skins(connection, summoner_id):
+                return SkinPresentation("Champion", defaultTileLink(self._actual_champ_id), None) # Not cached; retried next tick
+            target_skin_id_to_use = self._actual_skin_id if use_skin_splash else (self._actual_champ_id * 1000)
+            found_skin_info, target_skin_id_to_use = _find_skin_info(self._champ_skins_list, target_skin_id_to_use)
+
+        actual_champ_id = self._actual_champ_id
+        skin_name_str = "Champion"; tile_image_key = defaultTileLink(actual_champ_id); splash_art_url = None; animated_splash_available = False
+        if found_skin_info and isinstance(found_skin_info, dict):
+            skin_name_str = found_skin_info.get("name", "Champion")
+            if found_skin_info.get("isBase"): tile_image_key = defaultTileLink(actual_champ_id)
+            elif found_skin_info.get("tilePath"): tile_image_key = assetsLink(found_skin_info["tilePath"])
+            if found_skin_info.get("uncenteredSplashPath"): splash_art_url = assetsLink(found_skin_info["uncenteredSplashPath"])
+            animated_video_path = found_skin_info.get("collectionSplashVideoPath")
+            current_skin_id_for_anim_check = target_skin_id_to_use if target_skin_id_to_use is not None else actual_champ_id * 1000
+            animated_splash_available = bool(animated_video_path) and current_skin_id_for_anim_check in ANIMATEDSPLASHESIDS
+            if animated_splash_available and animated_splash:
+                tile_image_key = animatedSplashUrl(current_skin_id_for_anim_check)
+                if not splash_art_url and animated_video_path: splash_art_url = assetsLink(animated_video_path)
+
+        self._presentation = SkinPresentation(skin_name_str, tile_image_key, splash_art_url, animated_splash_available)
+        self._settings_key = settings_key
+        logger.debug(f"Skin presentation resolved for champion {actual_champ_id}: {skin_name_str}")
+        return self._presentation
+
+
+class SkinPresentationPrefetcher:
+    """
+    Warms the in-game skin presentation during champ select, so the first in-game frame renders from memory.
+    Each new champion/skin selection cancels the previous warm-up and starts resolving a fresh MatchSkinPresentation
+    in the background; updateInProgressRPC takes it over if the selection still matches when the match starts.
+    Bravery champions are only known in game, so for them only the champion index is warmed.
+    """
+    def __init__(self):
+        self._selection = None
+        self._presentation: MatchSkinPresentation | None = None
+        self._task: asyncio.Task | None = None
+
+    def select(self, connection: Any, summoner_id: int, champ_id: int, selected_skin_id: int):
+        selection = (champ_id, selected_skin_id)
+        if selection == self._selection:
+            return
+        self._cancel_task()
+        self._selection = selection
+        self._presentation = None
+        if champ_id == -3:
+            self._task = asyncio.create_task(champion_index.ensure(connection, summoner_id))
+        elif champ_id and champ_id > 0:
+            self._presentation = MatchSkinPresentation(champ_id, selected_skin_id)
+            self._task = asyncio.create_task(self._warm(self._presentation, connection, summoner_id))
+
+    async def _warm(self, presentation: MatchSkinPresentation, connection: Any, summoner_id: int):
+        try:
+            skin_presentation = await presentation.resolve(connection, summoner_id, None, fetchConfigSnapshot())
+            logger.debug(f"Skin presentation prefetched in champ select: {skin_presentation.skin_name}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Could not prefetch skin presentation: {e}")
+
+    def take(self, champ_id: int, selected_skin_id: int) -> MatchSkinPresentation | None:
+        """
+        Hands over the warmed presentation if it is for this selection and finished warming.
+        A warm-up still in flight is cancelled rather than raced; the in-game loop then resolves the skin itself.
+        """
+        presentation = None
+        if self._selection == (champ_id, selected_skin_id) and self._task is not None and self._task.done():
+            presentation = self._presentation
+        self.reset()
+        return presentation
+
+    def _cancel_task(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def reset(self):
+        self._cancel_task()
+        self._selection, self._presentation = None, None
+
+
+SWARM_CHAMPION_IDS = {3147: 92, 3151: 222, 3152: 89, 3153: 147, 3156: 233, 3157: 157, 3159: 893, 3678: 420, 3947: 498}
+
+
+class InGameRenderPlan:
+    """
+    Presence layout for one match. Everything that cannot change during the match (details line,
+    map art, localized strings) is computed once here; render() only fills in the per-tick state and timestamp.
+    The localized text is rebuilt if the locale strings are filled in after the match started.
+    Subclasses pick the stats shown and resolve the large image in resolve_art().
+    """
+    STAT_FIELDS = (("kda", "{}"), ("cs", "{} CS"), ("level", "Lvl {}"))
+    LOCALIZED_KEYS = ("inGame", "practicetool", "bot", "custom")
+
+    def __init__(self, map_data: Dict[str, Any], map_icon_asset_path: str | None, queue_data: Dict[str, Any], locale_strings: Dict[str, str]):
+        self.map_name = map_data.get('name', "Unknown Map")
+        self.queue_data = queue_data
+        self.locale_strings = locale_strings # Shared with the app, which fills it in place as the strings load
+        self.map_image = mapIcon(map_icon_asset_path) if map_icon_asset_path else "lol_icon"
+
+        self.large_image = self.map_image
+        self.large_text = self.map_name
+        self.buttons = None
+        self._localized_key = None
+        self._localize()
+
+    def _queue_description(self) -> str:
+        queue_desc_str = self.queue_data.get('description', "Unknown Mode")
+        if self.queue_data.get('gameMode') == "PRACTICETOOL":
+            queue_desc_str = self.locale_strings.get('practicetool', 'Practice Tool')
+        elif self.queue_data.get("type") == "BOT":
+            queue_desc_str = f"{self.locale_strings.get('bot', 'Bot')} {queue_desc_str}"
+        elif self.queue_data.get("category") == "Custom":
+            queue_desc_str = self.locale_strings.get('custom', 'Custom Game')
+        return queue_desc_str
+
+    def _localize(self):
+        """Builds the details line and in-game state text; only does work when the locale strings changed."""
+        localized_key = tuple(self.locale_strings.get(key) for key in self.LOCALIZED_KEYS)
+        if localized_key == self._localized_key:
+            return
+        self._localized_key = localized_key
+        self.details = f"{self.map_name} ({self._queue_description()})"
+        self.in_game_state = self.locale_strings.get("inGame", "In Game")
+        self._state_key, self._state = None, self.in_game_state
+
+    async def resolve_art(self, connection: Any, summoner_id: int, live_snapshot: Any, config: ConfigSnapshot):
+        """Updates large_image, large_text and buttons. The map art is the default."""
+
+    def _format_state(self, stats: Any, stat_fields: tuple, config: ConfigSnapshot) -> str:
+        if not stat_fields or not stats or stats == API_NOT_READY_MARKER or stats.get("kda") is None:
+            return self.in_game_state
+        stats_display_config = config.stats
+        state_key = (stats.get("kda"), stats.get("cs"), stats.get("level"), tuple(stats_display_config.get(key) for key, _ in stat_fields))
+        if state_key != self._state_key: # The joined string is only rebuilt when a shown value changes
+            parts = [self.in_game_state]
+            for key, template in stat_fields:
+                if stats_display_config.get(key) and stats.get(key):
+                    parts.append(template.format(stats[key]))
+            self._state_key, self._state = state_key, " • ".join(parts)
+        return self._state
+
+    def render(self, stats: Any, start: int, config: ConfigSnapshot) -> Dict[str, Any]:
+        self._localize()
+        payload = {"details": self.details, "large_image": self.large_image, "large_text": self.large_text,
+                   "state": self._format_state(stats, self.STAT_FIELDS, config), "start": start}
+        if self.buttons: payload["buttons"] = self.buttons
+        return payload
+
+    def render_loading(self, start: int) -> Dict[str, Any]:
+        self._localize()
+        return {"details": self.details, "state": "Loading Match...", "large_image": self.map_image, "large_text": self.map_name, "start": start}
+
+    def render_without_clock(self, stats: Any, start: int, config: ConfigSnapshot) -> Dict[str, Any]:
+        """Loaded, but no game time yet: map art, every available stat and the loop's own start time."""
+        self._localize()
+        return {"details": self.details, "state": self._format_state(stats, InGameRenderPlan.STAT_FIELDS, config),
+                "large_image": self.map_image, "large_text": self.map_name, "start": start}
+
+
+class StandardRenderPlan(InGameRenderPlan):
+    def __init__(self, map_data, map_icon_asset_path, queue_data, locale_strings, skin_presentation_source: MatchSkinPresentation):
+        super().__init__(map_data, map_icon_asset_path, queue_data, locale_strings)
+        self.skin_presentation_source = skin_presentation_source
+        self._buttons_key = None
+
+    async def resolve_art(self, connection, summoner_id, live_snapshot, config):
+        skin_presentation = await self.skin_presentation_source.resolve(connection, summoner_id, live_snapshot, config)
+        self.large_image = skin_presentation.tile_image
+        self.large_text = skin_presentation.skin_name
+        buttons_key = (skin_presentation.splash_url, config.showViewArtButton)
+        if buttons_key != self._buttons_key:
+            self._buttons_key = buttons_key
+            self.buttons = [{"label": "View Splash Art", "url": skin_presentation.splash_url}] if buttons_key[1] and buttons_key[0] else None
+
+
+class ArenaRenderPlan(StandardRenderPlan):
+    STAT_FIELDS = (("kda", "{}"), ("level", "Lvl {}")) # No CS in Arena
+
+
+class TftRenderPlan(InGameRenderPlan):
+    STAT_FIELDS = ()
+
+    def __init__(self, map_data, map_icon_asset_path, queue_data, locale_strings, lookup_memo: MatchLookupMemo):
+        super().__init__(map_data, map_icon_asset_path, queue_data, locale_strings)
+        self.lookup_memo = lookup_memo
+
+    async def resolve_art(self, connection, summoner_id, live_snapshot, config):
+        self.large_image, self.large_text, self.buttons = self.map_image, self.map_name, None
+        if not config.useSkinSplash:
+            return
+        cosmetics_data = await self.lookup_memo.fetch(connection, '/lol-cosmetics/v1/inventories/tft/companions', "TFT companion cosmetics")
+        comp_data = cosmetics_data.get("selectedLoadoutItem") if cosmetics_data else None
+        if comp_data and isinstance(comp_data, dict):
+            self.large_image = tftImg(comp_data.get("loadoutsIcon"))
+            self.large_text = comp_data.get('name', self.map_name)
+            if config.showViewArtButton and comp_data.get("loadoutsIcon"):
+                self.buttons = [{"label": "View Companion Art", "url": tftImg(comp_data.get("loadoutsIcon"))}]
+
+
+class SwarmRenderPlan(InGameRenderPlan):
+    STAT_FIELDS = ()
+
+    def __init__(self, map_data, map_icon_asset_path, queue_data, locale_strings, champ_id: int, lookup_memo: MatchLookupMemo):
+        super().__init__(map_data, map_icon_asset_path, queue_data, locale_strings)
+        self.lookup_memo = lookup_memo
+        self.champion_id = SWARM_CHAMPION_IDS.get(champ_id, champ_id) if champ_id else 0
+        self.large_image = defaultTileLink(self.champion_id or champ_id)
+        self.large_text = "Champion" if champ_id else "Swarm Survivor"
+
+    def _queue_description(self):
+        return "PvE"
+
+    async def resolve_art(self, connection, summoner_id, live_snapshot, config):
+        if not self.champion_id:
+            return
+        champ_details = await self.lookup_memo.fetch(connection, f'/lol-champions/v1/inventories/{summoner_id}/champions/{self.champion_id}', "Swarm champion details")
+        self.large_text = champ_details.get("name", "Champion") if champ_details else "Champion"
+
+
+def make_render_plan(map_data: Dict[str, Any], map_icon_asset_path: str | None, queue_data: Dict[str, Any],
+                     locale_strings: Dict[str, str], champ_id: int, selected_skin_id: int, lookup_memo: MatchLookupMemo,
+                     skin_presentation_source: MatchSkinPresentation | None = None) -> InGameRenderPlan:
+    if map_data.get("mapStringId") == "TFT":
+        return TftRenderPlan(map_data, map_icon_asset_path, queue_data, locale_strings, lookup_memo)
+    if map_data.get("id") == 33:
+        return SwarmRenderPlan(map_data, map_icon_asset_path, queue_data, locale_strings, champ_id, lookup_memo)
+    if skin_presentation_source is None: skin_presentation_source = MatchSkinPresentation(champ_id, selected_skin_id)
+    if map_data.get("gameMode") == "CHERRY":
+        return ArenaRenderPlan(map_data, map_icon_asset_path, queue_data, locale_strings, skin_presentation_source)
+    return StandardRenderPlan(map_data, map_icon_asset_path, queue_data, locale_strings, skin_presentation_source)
+
+
 async def updateInProgressRPC(
     stop_condition_callable: Callable[[], bool],
     start_time: float, 
@@ -53,8 +420,9 @@ async def updateInProgressRPC(
     connection: Any, 
     summoner_id: int,
     locale_strings: Dict[str, str],
-    rpc_presence_object: Any, 
-    rpc_lock: asyncio.Lock 
+    presence_state: PresenceState,
+    poll_scheduler: AdaptivePollScheduler | None = None,
+    prefetched_skin_presentation: MatchSkinPresentation | None = None
 ):
     logger.info(f"In-progress RPC update loop started for {display_name} at {start_time}.")
     addLog(f"In-progress RPC loop started for {display_name}.", level="DEBUG")
@@ -66,244 +434,89 @@ async def updateInProgressRPC(
         addLog("Error: In-progress RPC: No champion ID for non-TFT mode.", level="ERROR")
         return
 
-    while not stop_condition_callable():
-        if fetchConfig("isRpcMuted"):
-            logger.info(f"In-progress RPC: Muted. Clearing presence for {display_name}.")
-            async with rpc_lock:
-                try:
-                    await asyncio.to_thread(rpc_presence_object.clear)
-                except PyPresenceExceptions.InvalidPipe:
-                    logger.warning("In-progress RPC (Muted): InvalidPipe during clear. Main app should handle reconnect.")
-                    # The main DetailedLoLRPC._update_rpc_presence will handle setting rpc_connected to False
-                except Exception as e_clear_mute:
-                    logger.error(f"In-progress RPC (Muted): Error during clear: {e_clear_mute}")
-            await asyncio.sleep(1.0) 
-            continue
-
-        rpc_payload = {}
-        
-        map_name_str = map_data.get('name', "Unknown Map")
-        queue_desc_str = queue_data.get('description', "Unknown Mode")
-        if queue_data.get('gameMode') == "PRACTICETOOL":
-            queue_desc_str = locale_strings.get('practicetool', 'Practice Tool')
-        elif queue_data.get("type") == "BOT":
-            queue_desc_str = f"{locale_strings.get('bot', 'Bot')} {queue_desc_str}"
-        elif queue_data.get("category") == "Custom" and queue_data.get('gameMode') != "PRACTICETOOL":
-            queue_desc_str = locale_strings.get('custom', 'Custom Game')
-        
-        details_for_rpc = f"{map_name_str} ({queue_desc_str})"
-        large_image_for_rpc = mapIcon(map_icon_asset_path) if map_icon_asset_path else "lol_icon"
-        large_text_for_rpc = map_name_str
-        
-        live_game_stats_data = await asyncio.to_thread(getStats)
-        current_game_time_from_api = await asyncio.to_thread(get_current_game_time)
-
-        rpc_start_timestamp_to_use = int(start_time) 
-
-        # Loading RPC
-        if current_game_time_from_api == API_NOT_READY_MARKER or live_game_stats_data == API_NOT_READY_MARKER:
-            rpc_payload = {
-                "details": details_for_rpc, 
-                "state": "Loading Match...", 
-                "large_image": large_image_for_rpc,
-                "large_text": large_text_for_rpc,
-                "start": int(start_time), 
-            }
-        elif isinstance(current_game_time_from_api, float):
-            rpc_start_timestamp_to_use = int(time() - current_game_time_from_api)
-            logger.debug(f"Game time from API: {current_game_time_from_api:.2f}s. Calculated RPC start: {rpc_start_timestamp_to_use}")
-            
-            state_str = locale_strings.get("inGame", "In Game")
-            game_stats_parts = [state_str] 
-            
-            # TFT
-            if map_data.get("mapStringId") == "TFT":
-                large_image_key_tft = large_image_for_rpc 
-                large_text_tft = large_text_for_rpc
-                buttons_list_tft = None
-                if fetchConfig("useSkinSplash"):
-                    cosmetics_data = await _fetch_lcu_data(connection, '/lol-cosmetics/v1/inventories/tft/companions', "TFT companion cosmetics")
-                    if cosmetics_data:
-                        comp_data = cosmetics_data.get("selectedLoadoutItem")
-                        if comp_data and isinstance(comp_data, dict):
-                            large_image_key_tft = tftImg(comp_data.get("loadoutsIcon")) 
-                            large_text_tft = comp_data.get('name', map_name_str)
-                            if fetchConfig("showViewArtButton") and comp_data.get("loadoutsIcon"):
-                                buttons_list_tft = [{"label": "View Companion Art", "url": tftImg(comp_data.get("loadoutsIcon"))}]
-                rpc_payload = {"details": details_for_rpc, "large_image": large_image_key_tft, "large_text": large_text_tft, "state": " • ".join(game_stats_parts), "start": rpc_start_timestamp_to_use, "buttons": buttons_list_tft}
-            
-            # Swarm
-            elif map_data.get("id") == 33: 
-                if not champ_id: actual_champ_id_for_name = 0; champ_name_for_display = "Swarm Survivor"
-                else:
-                    swarm_champ_map = {3147: 92, 3151: 222, 3152: 89, 3153: 147, 3156: 233, 3157: 157, 3159: 893, 3678: 420, 3947: 498}
-                    actual_champ_id_for_name = swarm_champ_map.get(champ_id, champ_id) 
-                    champ_name_for_display = "Champion" 
-                    if actual_champ_id_for_name:
-                        champ_details = await _fetch_lcu_data(connection, f'/lol-champions/v1/inventories/{summoner_id}/champions/{actual_champ_id_for_name}', "Swarm champion details")
-                        if champ_details: champ_name_for_display = champ_details.get("name", "Champion")
-                rpc_payload = {"details": f"{map_name_str} (PvE)", "large_image": defaultTileLink(actual_champ_id_for_name or champ_id), "large_text": champ_name_for_display, "state": " • ".join(game_stats_parts), "start": rpc_start_timestamp_to_use}
-            
-            # Arena
-            elif map_data.get("gameMode") == "CHERRY":
-                if live_game_stats_data and live_game_stats_data.get("kda") is not None: 
-                    stats_display_config = fetchConfig("stats")
-                    if isinstance(stats_display_config, dict):
-                        if stats_display_config.get("kda") and live_game_stats_data.get("kda"):
-                            game_stats_parts.append(live_game_stats_data['kda'])
-                        if stats_display_config.get("level") and live_game_stats_data.get("level"):
-                            game_stats_parts.append(f"Lvl {live_game_stats_data['level']}")
-
-                if not champ_id: rpc_payload = { "details": details_for_rpc, "state": "In Game", "large_image": large_image_for_rpc, "start": rpc_start_timestamp_to_use }; logger.error("Standard game mode but champ_id is 0.")
-                else:
-                    skin_name_str = "Champion"; tile_image_key = defaultTileLink(champ_id); splash_art_url = None
-                    actual_champ_id, actual_champ_skin_id = champ_id, selected_skin_id
-                    
-                    # Bravery
-                    if champ_id == -3: 
-                        actual_champ_data = await asyncio.to_thread(get_active_player_champion_data)
-                        if actual_champ_data == API_NOT_READY_MARKER or actual_champ_data == (None, None):
-                            logger.error("Bravery: Failed to fetch active player champion data.")                   
-                        else:
-                            actual_champ_name, actual_champ_skin_id = actual_champ_data
-
-                            champ_list = await _fetch_lcu_data(connection, f'/lol-champions/v1/inventories/{summoner_id}/champions', "Bravery champion list")
-                            if champ_list and isinstance(champ_list, list):
-                                for champ_data in champ_list:
-                                    if isinstance(champ_data, dict) and champ_data.get("name") == actual_champ_name:
-                                        actual_champ_id = champ_data.get("id")
-                                        actual_champ_skin_id = (actual_champ_id * 1000 + actual_champ_skin_id) if actual_champ_skin_id else actual_champ_id * 1000
-                                        champ_skins_list = champ_data.get("skins", [])
-                                        break                                                               
-                    else:
-                        champ_skins_list = await _fetch_lcu_data(connection, f'/lol-champions/v1/inventories/{summoner_id}/champions/{champ_id}/skins', "champion skins")
-
-                    target_skin_id_to_use = actual_champ_skin_id if fetchConfig("useSkinSplash") else (actual_champ_id * 1000); found_skin_info = None
-                    if champ_skins_list and isinstance(champ_skins_list, list):
-                        for skin_info_iter in champ_skins_list:
-                            if not isinstance(skin_info_iter, dict): continue
-                            if skin_info_iter.get("id") == target_skin_id_to_use: found_skin_info = skin_info_iter; break
-                            for chroma_info in skin_info_iter.get("chromas", []):
-                                if isinstance(chroma_info, dict) and chroma_info.get("id") == target_skin_id_to_use: found_skin_info = skin_info_iter; break
-                            if found_skin_info: break
-                            for tier_info in skin_info_iter.get("questSkinInfo", {}).get("tiers", []):
-                                if isinstance(tier_info, dict) and tier_info.get("id") == target_skin_id_to_use: found_skin_info = {**skin_info_iter, **tier_info}; break
-                            if found_skin_info: break
-                        if not found_skin_info:
-                            for skin_info_iter in champ_skins_list: 
-                                if isinstance(skin_info_iter, dict) and skin_info_iter.get("isBase"): found_skin_info = skin_info_iter; target_skin_id_to_use = skin_info_iter.get("id"); break
-                        if not found_skin_info and champ_skins_list: found_skin_info = champ_skins_list[0] if isinstance(champ_skins_list[0], dict) else None; 
-                        if found_skin_info: target_skin_id_to_use = found_skin_info.get("id")
-                        
-                        if found_skin_info and isinstance(found_skin_info, dict):
-                            skin_name_str = found_skin_info.get("name", "Champion")
-                            if found_skin_info.get("isBase"): tile_image_key = defaultTileLink(actual_champ_id)
-                            elif found_skin_info.get("tilePath"): tile_image_key = assetsLink(found_skin_info["tilePath"])
-                            if found_skin_info.get("uncenteredSplashPath"): splash_art_url = assetsLink(found_skin_info["uncenteredSplashPath"])
-                            animated_video_path = found_skin_info.get("collectionSplashVideoPath")
-                            current_skin_id_for_anim_check = target_skin_id_to_use if target_skin_id_to_use is not None else actual_champ_id * 1000
-                            if animated_video_path and current_skin_id_for_anim_check in ANIMATEDSPLASHESIDS and fetchConfig("animatedSplash"):
-                                tile_image_key = animatedSplashUrl(current_skin_id_for_anim_check)
-                                if not splash_art_url and animated_video_path: splash_art_url = assetsLink(animated_video_path)
-                    buttons_list = [{"label": "View Splash Art", "url": splash_art_url}] if fetchConfig("showViewArtButton") and splash_art_url else None
-                    rpc_payload = {"details": details_for_rpc, "large_image": tile_image_key, "large_text": skin_name_str, "state": " • ".join(game_stats_parts), "start": rpc_start_timestamp_to_use, "buttons": buttons_list}
-
-            # Standard game modes
+    begin_live_match(game_data.get("gameId")) # Scope the Live Client identity cache to this match
+    if poll_scheduler is None: poll_scheduler = AdaptivePollScheduler()
+    last_tick_payload = None
+    last_tick_in_game = False
+    event_feed = LiveEventFeed()
+    game_clock = GameClock()
+    last_full_refresh_at = 0.0
+    last_shown_stats = {}
+    lookup_memo = MatchLookupMemo()
+    render_plan = make_render_plan(map_data, map_icon_asset_path, queue_data, locale_strings, champ_id, selected_skin_id, lookup_memo, prefetched_skin_presentation)
+    stats_timeline = StatsTimeline(game_data.get("gameId") or int(start_time))
+    try:
+        while not stop_condition_callable():
+            config = fetchConfigSnapshot() # One consistent view of the settings for the whole tick
+            if config.isRpcMuted:
+                logger.info(f"In-progress RPC: Muted. Clearing presence for {display_name}.")
+                presence_state.submit(clear=True)
+                last_tick_payload = None
+                last_tick_in_game = False
+                poll_scheduler.on_muted()
+                await poll_scheduler.sleep()
+                continue
+
+            # Stats and Bravery champion data are views over one snapshot; game time is only fetched when the clock needs a resync.
+            # Once in game, a tick polls the event feed and the player list, which is fingerprinted and carries CS and level
+            # (these have no events). The presence is only re-rendered on presence-relevant events, when a displayed stat
+            # changed, when the API stops answering, on wake() or every EVENT_FALLBACK_REFRESH_INTERVAL.
+            checking_for_changes = last_tick_in_game and not poll_scheduler.woken_early
+            new_events = None
+            if checking_for_changes:
+                new_events, live_snapshot = await asyncio.gather(event_feed.poll(), get_live_snapshot(include_game_time=game_clock.needs_resync()))
+                if isinstance(new_events, list) and game_clock.observe_events(new_events) and isinstance(live_snapshot, LiveGameSnapshot) and live_snapshot.game_time is None:
+                    live_snapshot = await get_live_snapshot() # The clock drifted; resync it this tick
             else:
-                if live_game_stats_data and live_game_stats_data.get("kda") is not None: 
-                    stats_display_config = fetchConfig("stats")
-                    if isinstance(stats_display_config, dict):
-                        if stats_display_config.get("kda") and live_game_stats_data.get("kda"):
-                            game_stats_parts.append(live_game_stats_data['kda'])
-                        if stats_display_config.get("cs") and live_game_stats_data.get("cs"):
-                            game_stats_parts.append(f"{live_game_stats_data['cs']} CS")
-                        if stats_display_config.get("level") and live_game_stats_data.get("level"):
-                            game_stats_parts.append(f"Lvl {live_game_stats_data['level']}")
-                            
-                if not champ_id: rpc_payload = { "details": details_for_rpc, "state": "In Game", "large_image": large_image_for_rpc, "start": rpc_start_timestamp_to_use }; logger.error("Standard game mode but champ_id is 0.")
-                else:
-                    skin_name_str = "Champion"; tile_image_key = defaultTileLink(champ_id); splash_art_url = None
-                    champ_skins_list = await _fetch_lcu_data(connection, f'/lol-champions/v1/inventories/{summoner_id}/champions/{champ_id}/skins', "champion skins")
-                    target_skin_id_to_use = selected_skin_id if fetchConfig("useSkinSplash") else (champ_id * 1000); found_skin_info = None
-                    if champ_skins_list and isinstance(champ_skins_list, list):
-                        for skin_info_iter in champ_skins_list:
-                            if not isinstance(skin_info_iter, dict): continue
-                            if skin_info_iter.get("id") == target_skin_id_to_use: found_skin_info = skin_info_iter; break
-                            for chroma_info in skin_info_iter.get("chromas", []):
-                                if isinstance(chroma_info, dict) and chroma_info.get("id") == target_skin_id_to_use: found_skin_info = skin_info_iter; break
-                            if found_skin_info: break
-                            for tier_info in skin_info_iter.get("questSkinInfo", {}).get("tiers", []):
-                                if isinstance(tier_info, dict) and tier_info.get("id") == target_skin_id_to_use: found_skin_info = {**skin_info_iter, **tier_info}; break
-                            if found_skin_info: break
-                        if not found_skin_info:
-                            for skin_info_iter in champ_skins_list: 
-                                if isinstance(skin_info_iter, dict) and skin_info_iter.get("isBase"): found_skin_info = skin_info_iter; target_skin_id_to_use = skin_info_iter.get("id"); break
-                        if not found_skin_info and champ_skins_list: found_skin_info = champ_skins_list[0] if isinstance(champ_skins_list[0], dict) else None; 
-                        if found_skin_info: target_skin_id_to_use = found_skin_info.get("id")
-                        
-                        if found_skin_info and isinstance(found_skin_info, dict):
-                            skin_name_str = found_skin_info.get("name", "Champion")
-                            if found_skin_info.get("isBase"): tile_image_key = defaultTileLink(champ_id)
-                            elif found_skin_info.get("tilePath"): tile_image_key = assetsLink(found_skin_info["tilePath"])
-                            if found_skin_info.get("uncenteredSplashPath"): splash_art_url = assetsLink(found_skin_info["uncenteredSplashPath"])
-                            animated_video_path = found_skin_info.get("collectionSplashVideoPath")
-                            current_skin_id_for_anim_check = target_skin_id_to_use if target_skin_id_to_use is not None else champ_id * 1000
-                            if animated_video_path and current_skin_id_for_anim_check in ANIMATEDSPLASHESIDS and fetchConfig("animatedSplash"):
-                                tile_image_key = animatedSplashUrl(current_skin_id_for_anim_check)
-                                if not splash_art_url and animated_video_path: splash_art_url = assetsLink(animated_video_path)
-                    buttons_list = [{"label": "View Splash Art", "url": splash_art_url}] if fetchConfig("showViewArtButton") and splash_art_url else None
-                    rpc_payload = {"details": details_for_rpc, "large_image": tile_image_key, "large_text": skin_name_str, "state": " • ".join(game_stats_parts), "start": rpc_start_timestamp_to_use, "buttons": buttons_list}
-        else:
-            logger.warning(f"Game loaded for {display_name}, but current game time from API is unavailable ({current_game_time_from_api}). Using initial start time for timer.")
-            rpc_start_timestamp_to_use = int(start_time) 
-            state_str = locale_strings.get("inGame", "In Game")
-            game_stats_parts = [state_str] 
-            if live_game_stats_data and live_game_stats_data != API_NOT_READY_MARKER and live_game_stats_data.get("kda") is not None:
-                stats_display_config = fetchConfig("stats")
-                if isinstance(stats_display_config, dict):
-                    if stats_display_config.get("kda") and live_game_stats_data.get("kda"): game_stats_parts.append(live_game_stats_data['kda'])
-                    if stats_display_config.get("cs") and live_game_stats_data.get("cs"): game_stats_parts.append(f"{live_game_stats_data['cs']} CS")
-                    if stats_display_config.get("level") and live_game_stats_data.get("level"): game_stats_parts.append(f"Lvl {live_game_stats_data['level']}")
-            
-            rpc_payload = {
-                "details": details_for_rpc,
-                "state": " • ".join(game_stats_parts),
-                "large_image": large_image_for_rpc, 
-                "large_text": large_text_for_rpc,   
-                "start": rpc_start_timestamp_to_use,
-            }
-        
-        final_rpc_payload = {k: v for k, v in rpc_payload.items() if v is not None}
-        
-        if final_rpc_payload:
-            async with rpc_lock:
-                try:
-                    # Removed the "if rpc_presence_object.pipe:" check here
-                    result = await asyncio.to_thread(rpc_presence_object.update, **final_rpc_payload)
-                    if result is not None:
-                        logger.debug(f"In-Game RPC updated (payload sent): {final_rpc_payload.get('details')}, {final_rpc_payload.get('state')}")
-                    else:
-                        logger.warning(f"In-Game RPC update: pypresence.update returned None. This might indicate a problem with the send operation even if pipe was thought to be active.")
-                        # DetailedLoLRPC._update_rpc_presence will handle setting rpc_connected to False if pipe is truly dead
-                except PyPresenceExceptions.InvalidPipe:
-                    logger.error("In-Game RPC update: InvalidPipe exception during rpc.update call. Main app should handle reconnect.")
-                    # DetailedLoLRPC._update_rpc_presence will handle setting rpc_connected to False
-                except Exception as e_update:
-                    logger.error(f"In-Game RPC update: Exception during rpc.update: {e_update}", exc_info=True)
-        elif rpc_payload: 
-            logger.debug("In-Game RPC: Payload was empty after filtering Nones. Clearing RPC.")
-            async with rpc_lock:
-                try:
-                    await asyncio.to_thread(rpc_presence_object.clear)
-                except PyPresenceExceptions.InvalidPipe:
-                     logger.warning("In-Game RPC (Clear): InvalidPipe during clear. Main app should handle reconnect.")
-                except Exception as e_clear:
-                    logger.error(f"In-Game RPC (Clear): Error during clear: {e_clear}")
-        else: 
-            logger.warning("In-Game RPC: Payload was not constructed. No update/clear attempted.")
-
-        await asyncio.sleep(1.0) 
-
-    logger.info(f"In-progress RPC update loop stopped for {display_name}.")
-    addLog(f"In-progress RPC loop stopped for {display_name}.", level="INFO")
+                live_snapshot = await get_live_snapshot(include_game_time=game_clock.needs_resync())
+            live_game_stats_data = getStats(live_snapshot)
+            current_game_time_from_api = get_current_game_time(live_snapshot)
+            if isinstance(current_game_time_from_api, float):
+                game_clock.sync(current_game_time_from_api)
+            elif current_game_time_from_api == API_NOT_READY_MARKER or live_game_stats_data == API_NOT_READY_MARKER:
+                game_clock.reset()
+            if game_clock.synced and isinstance(live_snapshot, LiveGameSnapshot) and live_snapshot.active_player:
+                stats_timeline.record_scores(game_clock.now(), live_snapshot.scores, live_snapshot.active_player.get("level"))
+                if stats_timeline.flush_due:
+                    await asyncio.to_thread(stats_timeline.flush) # The disk write stays off the event loop
+
+            if checking_for_changes:
+                refresh_due = (monotonic() - last_full_refresh_at >= EVENT_FALLBACK_REFRESH_INTERVAL
+                               or not isinstance(new_events, list) or not isinstance(live_snapshot, LiveGameSnapshot)
+                               or isinstance(current_game_time_from_api, float) or LiveEventFeed.affects_presence(new_events)
+                               or any(live_game_stats_data.get(key) != last_shown_stats.get(key) for key, _ in render_plan.STAT_FIELDS if config.stats.get(key)))
+                if not refresh_due:
+                    await poll_scheduler.sleep()
+                    continue
+            last_full_refresh_at = monotonic()
+            last_shown_stats = live_game_stats_data if isinstance(live_game_stats_data, dict) and live_game_stats_data != API_NOT_READY_MARKER else {}
+
+            is_loading_tick = False
+            if current_game_time_from_api == API_NOT_READY_MARKER or live_game_stats_data == API_NOT_READY_MARKER:
+                is_loading_tick = True
+                rpc_payload = render_plan.render_loading(int(start_time))
+            elif game_clock.synced:
+                logger.debug(f"Game time from clock: {game_clock.now():.2f}s. RPC start: {game_clock.start_timestamp}")
+                await render_plan.resolve_art(connection, summoner_id, live_snapshot, config)
+                rpc_payload = render_plan.render(live_game_stats_data, game_clock.start_timestamp, config)
+            else:
+                logger.warning(f"Game loaded for {display_name}, but current game time from API is unavailable ({current_game_time_from_api}). Using initial start time for timer.")
+                rpc_payload = render_plan.render_without_clock(live_game_stats_data, int(start_time), config)
+
+            presence_state.submit(rpc_payload) # Rendered by the presence render loop, unless unchanged
+
+            if is_loading_tick:
+                poll_scheduler.on_loading()
+            else:
+                poll_scheduler.on_update(changed=presence_changed(last_tick_payload, rpc_payload))
+            last_tick_payload = rpc_payload
+            last_tick_in_game = not is_loading_tick and game_clock.synced
+            await poll_scheduler.sleep()
+
+        logger.info(f"In-progress RPC update loop stopped for {display_name}. Polling: {poll_scheduler.stats()}, events: {event_feed.stats()}, clock syncs: {game_clock.syncs}, render plan: {type(render_plan).__name__}, LCU lookups: {lookup_memo.stats()}")
+        addLog(f"In-progress RPC loop stopped for {display_name}.", level="INFO")
+    finally:
+        lookup_memo.clear()
+        # Runs on cancellation too, so the last samples are always written out; the disk write stays off the event loop
+        await asyncio.to_thread(stats_timeline.close)
 
@@ -0,0 +1,104 @@
+import asyncio
+from time import monotonic
+from typing import Dict, Any
+
+from .utilities import logger
+
+BASE_POLL_INTERVAL = 1.0
+STEADY_MAX_POLL_INTERVAL = 4.0 # Upper bound while nothing displayed changes
+STEADY_INTERVAL_GROWTH = 1.5
+UNCHANGED_TICKS_BEFORE_BACKOFF = 3
+LOADING_MAX_POLL_INTERVAL = 5.0 # Upper bound while the Live Client API is still loading
+MUTED_POLL_INTERVAL = 5.0
+EVENT_FALLBACK_REFRESH_INTERVAL = 5.0 # Full refresh between Live Client events, in case a change was missed
+
+
+class AdaptivePollScheduler:
+    """
+    Decides how long the in-game presence loop sleeps between ticks.
+    Backs off exponentially while the Live Client API is loading, stretches the interval while
+    the displayed presence is unchanged, and returns to the base rate as soon as something changes.
+    wake() ends the current sleep immediately, e.g. on a config change.
+    """
+    def __init__(self,
+                 base_interval: float = BASE_POLL_INTERVAL,
+                 steady_max_interval: float = STEADY_MAX_POLL_INTERVAL,
+                 loading_max_interval: float = LOADING_MAX_POLL_INTERVAL,
+                 muted_interval: float = MUTED_POLL_INTERVAL):
+        self.base_interval = base_interval
+        self.steady_max_interval = steady_max_interval
+        self.loading_max_interval = loading_max_interval
+        self.muted_interval = muted_interval
+
+        self.next_interval = base_interval
+        self._loading_interval = base_interval
+        self._unchanged_ticks = 0
+        self._in_backoff = False # Loading or muted; the first regular tick resets to the base interval
+        self._wake_event = asyncio.Event()
+        self._wake_reason = None
+        self.woken_early = False # Whether the last sleep was cut short by wake()
+
+        self._started_at = monotonic()
+        self.ticks = 0
+        self.early_wakeups = 0
+        self.loading_ticks = 0
+        self.slept_seconds = 0.0
+
+    def on_loading(self):
+        """The Live Client API is not ready yet: back off exponentially up to the loading cap."""
+        self.loading_ticks += 1
+        self._in_backoff = True
+        self._unchanged_ticks = 0
+        self.next_interval = self._loading_interval
+        self._loading_interval = min(self._loading_interval * 2, self.loading_max_interval)
+
+    def on_muted(self):
+        self._in_backoff = True
+        self._loading_interval = self.base_interval
+        self._unchanged_ticks = 0
+        self.next_interval = self.muted_interval
+
+    def on_update(self, changed: bool):
+        """Records whether this tick changed anything displayed and picks the next interval."""
+        leaving_backoff, self._in_backoff = self._in_backoff, False
+        self._loading_interval = self.base_interval
+        if changed or leaving_backoff:
+            self._unchanged_ticks = 0
+            self.next_interval = self.base_interval
+            return
+        self._unchanged_ticks += 1
+        if self._unchanged_ticks >= UNCHANGED_TICKS_BEFORE_BACKOFF:
+            self.next_interval = min(self.next_interval * STEADY_INTERVAL_GROWTH, self.steady_max_interval)
+
+    def wake(self, reason: str = "change detected"):
+        """Ends the current sleep so the next tick runs immediately. Must be called on the event loop."""
+        self._wake_reason = reason
+        self._wake_event.set()
+
+    async def sleep(self):
+        self.ticks += 1
+        sleep_started_at = monotonic()
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout=self.next_interval)
+            self.early_wakeups += 1
+            self.woken_early = True
+            logger.debug(f"Poll scheduler woken early: {self._wake_reason}.")
+            self._unchanged_ticks = 0
+            self._loading_interval = self.base_interval
+            self.next_interval = self.base_interval
+        except asyncio.TimeoutError:
+            self.woken_early = False
+        finally:
+            self._wake_event.clear()
+            self.slept_seconds += monotonic() - sleep_started_at
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(monotonic() - self._started_at, 1e-9)
+        return {
+            "ticks": self.ticks,
+            "early_wakeups": self.early_wakeups,
+            "loading_ticks": self.loading_ticks,
+            "current_interval": round(self.next_interval, 2),
+            "average_interval": round(self.slept_seconds / self.ticks, 2) if self.ticks else 0.0,
+            "effective_poll_rate_hz": round(self.ticks / elapsed, 3),
+        }
@@ -0,0 +1,304 @@
+import asyncio
+from time import monotonic, time
+from typing import Dict, Any, Callable
+
+from pypresence import exceptions as PyPresenceExceptions
+
+from .utilities import logger
+
+PRESENCE_START_TOLERANCE = 2 # Seconds; the in-game start timestamp jitters between ticks
+PRESENCE_TIMESTAMP_KEYS = ("start", "end")
+PRESENCE_RATE_LIMIT_UPDATES = 5 # Discord accepts about 5 presence updates...
+PRESENCE_RATE_LIMIT_WINDOW = 20.0 # ...per 20 seconds
+
+PRESENCE_CLEAR = object() # Payload marker for clearing the presence
+
+
+def presence_changed(previous: Dict[str, Any] | None, current: Dict[str, Any] | None) -> bool:
+    """
+    Compares two presence payloads structurally.
+    Start/end timestamps that moved by no more than PRESENCE_START_TOLERANCE seconds count as unchanged.
+    """
+    if previous is None or current is None:
+        return previous is not current
+    if previous.keys() != current.keys():
+        return True
+    for key, value in current.items():
+        if key in PRESENCE_TIMESTAMP_KEYS and isinstance(value, (int, float)) and isinstance(previous[key], (int, float)):
+            if abs(value - previous[key]) > PRESENCE_START_TOLERANCE: return True
+        elif previous[key] != value:
+            return True
+    return False
+
+
+class PresenceSink:
+    """
+    The single path from the app to Discord. Remembers the last payload actually sent and skips updates
+    that would not change what Discord shows, and clears of an already cleared presence.
+    Callers hold the RPC lock; errors from pypresence propagate to them unchanged.
+    """
+    def __init__(self, rpc: Any):
+        self.rpc = rpc
+        self._last_sent = None # Last payload sent, PRESENCE_CLEAR, or None if Discord's state is unknown
+        self.sent = 0
+        self.skipped = 0
+
+    def invalidate(self):
+        """Forgets the last payload, e.g. after a (re)connect, so the next update is always sent."""
+        self._last_sent = None
+
+    def is_unchanged(self, payload: Any) -> bool:
+        """Whether sending the payload (or PRESENCE_CLEAR) would leave Discord showing the same thing."""
+        if self._last_sent is None:
+            return False
+        if payload is PRESENCE_CLEAR or self._last_sent is PRESENCE_CLEAR:
+            return payload is self._last_sent
+        return not presence_changed(self._last_sent, payload)
+
+    async def update(self, **payload) -> bool:
+        """Sends the payload (None values dropped) unless it matches the last one sent. Returns whether it was sent."""
+        payload = {k: v for k, v in payload.items() if v is not None}
+        if self.is_unchanged(payload):
+            self.skipped += 1
+            return False
+        self._last_sent = None # Unknown until the send succeeds
+        await asyncio.to_thread(self.rpc.update, **payload)
+        self._last_sent = payload
+        self.sent += 1
+        return True
+
+    async def clear(self) -> bool:
+        if self.is_unchanged(PRESENCE_CLEAR):
+            self.skipped += 1
+            return False
+        self._last_sent = None
+        await asyncio.to_thread(self.rpc.clear)
+        self._last_sent = PRESENCE_CLEAR
+        self.sent += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"sent": self.sent, "skipped": self.skipped}
+
+
+class PresenceDispatcher:
+    """
+    Serializes every presence write through one task, within Discord's rate limit.
+    Producers submit() without waiting; a single pending slot keeps only the newest payload, so a burst of
+    phase changes collapses into one update with the final presence. Sends are paced by a token bucket
+    of PRESENCE_RATE_LIMIT_UPDATES per PRESENCE_RATE_LIMIT_WINDOW, and payloads the sink would skip use no token.
+    """
+    def __init__(self, sink: PresenceSink, rpc_lock: asyncio.Lock,
+                 is_connected: Callable[[], bool] = lambda: True,
+                 on_pipe_error: Callable[[], None] | None = None,
+                 capacity: int = PRESENCE_RATE_LIMIT_UPDATES,
+                 window: float = PRESENCE_RATE_LIMIT_WINDOW):
+        self.sink = sink
+        self.rpc_lock = rpc_lock
+        self.is_connected = is_connected
+        self.on_pipe_error = on_pipe_error
+        self.capacity = capacity
+        self.refill_rate = capacity / window
+        self._tokens = float(capacity)
+        self._tokens_updated_at = monotonic()
+        self._pending = None # Newest unsent payload, PRESENCE_CLEAR, or None
+        self._pending_event = asyncio.Event()
+        self._task = None
+
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0 # Replaced in the slot by a newer payload before being sent
+        self.dropped = 0 # Discarded because Discord was disconnected or the send failed
+
+    def submit(self, payload: Dict[str, Any] | None = None, clear: bool = False):
+        """Queues a presence update (or a clear) in place of any pending one. Must be called on the event loop."""
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = PRESENCE_CLEAR if clear else {k: v for k, v in (payload or {}).items() if v is not None}
+        self.submitted += 1
+        self._pending_event.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _refill_tokens(self):
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._tokens_updated_at) * self.refill_rate)
+        self._tokens_updated_at = now
+
+    async def _run(self):
+        while True:
+            await self._pending_event.wait()
+            payload = self._pending
+            if payload is None:
+                self._pending_event.clear()
+                continue
+            if not self.is_connected():
+                self._take_pending()
+                self.dropped += 1
+                logger.debug("Presence dispatcher: Discord not connected. Dropped pending update.")
+                continue
+            if self.sink.is_unchanged(payload):
+                self._take_pending()
+                self.sink.skipped += 1
+                continue
+
+            self._refill_tokens()
+            if self._tokens < 1:
+                # Wait for a token, then look at the slot again: a newer payload may have replaced this one
+                await asyncio.sleep((1 - self._tokens) / self.refill_rate)
+                continue
+            self._tokens -= 1
+            await self._send(self._take_pending())
+
+    def _take_pending(self) -> Any:
+        payload, self._pending = self._pending, None
+        self._pending_event.clear()
+        return payload
+
+    async def _send(self, payload: Any):
+        async with self.rpc_lock:
+            try:
+                if payload is PRESENCE_CLEAR:
+                    sent = await self.sink.clear()
+                else:
+                    sent = await self.sink.update(**payload)
+                if sent:
+                    self.sent += 1
+                    logger.debug(f"Presence sent: {'cleared' if payload is PRESENCE_CLEAR else (payload.get('details'), payload.get('state'))}")
+            except PyPresenceExceptions.InvalidPipe:
+                self.dropped += 1
+                logger.warning("Discord pipe closed while sending presence.")
+                if self.on_pipe_error: self.on_pipe_error()
+            except RuntimeError as e:
+                self.dropped += 1
+                logger.error(f"RuntimeError sending presence: {e}", exc_info="read() called while another coroutine" not in str(e))
+            except Exception as e:
+                self.dropped += 1
+                logger.error(f"Error sending presence: {e}", exc_info=True)
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
+        self._task = None
+        if self._pending is not None:
+            self._pending = None
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"submitted": self.submitted, "sent": self.sent, "coalesced": self.coalesced, "dropped": self.dropped, "skipped_unchanged": self.sink.skipped}
+
+
+class PresenceState:
+    """
+    The single store the presence is derived from. LCU event handlers, the idle confirmation timer and the in-game loop
+    only update fields here; PresenceRenderLoop derives the presence from it. Every update records its cause and time,
+    so the latency from a state change to the presence being submitted is measured in one place.
+    """
+    def __init__(self):
+        self.lcu_connected = False
+        self.phase: str | None = None
+        self.phase_started_at: int | None = None # Unix time the current phase was entered
+        self.session: Dict[str, Any] | None = None # Latest gameflow session
+        self.chat: Dict[str, Any] | None = None # Latest /lol-chat/v1/me
+        self.idle_confirmed = False # Set once an idle phase has lasted the confirmation delay
+        self.idle_since: int | None = None
+        self.in_game: Any = None # Latest in-game payload or PRESENCE_CLEAR from the in-game loop, None before its first frame
+
+        self.version = 0
+        self.changed = asyncio.Event()
+        self._pending_causes: list = []
+        self._pending_since: float | None = None # Monotonic time of the oldest change not yet rendered
+
+    def update(self, cause: str, **fields):
+        """Sets fields and wakes the render loop. Entering a new phase resets the idle confirmation and in-game payload."""
+        if "phase" in fields and fields["phase"] != self.phase:
+            self.phase_started_at = int(time())
+            self.idle_confirmed, self.idle_since, self.in_game = False, None, None
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+        if self._pending_since is None:
+            self._pending_since = monotonic()
+        if cause not in self._pending_causes:
+            self._pending_causes.append(cause)
+        self.changed.set()
+
+    def take_changes(self) -> tuple:
+        """Returns (causes, monotonic time of the oldest change) of everything since the last call."""
+        causes, since = self._pending_causes, self._pending_since
+        self._pending_causes, self._pending_since = [], None
+        self.changed.clear()
+        return causes, since
+
+    def submit(self, payload: Dict[str, Any] | None = None, clear: bool = False):
+        """Publishing interface of the in-game loop, same as PresenceDispatcher.submit()."""
+        self.update("in-game", in_game=PRESENCE_CLEAR if clear else {k: v for k, v in (payload or {}).items() if v is not None})
+
+
+class PresenceRenderLoop:
+    """
+    Single render loop: waits for PresenceState changes, derives the presence with `derive` and submits it to the
+    dispatcher only if it differs from the last one submitted. `derive` returns a payload, PRESENCE_CLEAR, or None
+    to keep whatever is shown. Records per-cause state-change-to-submit latency.
+    """
+    def __init__(self, state: PresenceState, derive: Callable[[], Any], dispatcher: PresenceDispatcher):
+        self.state = state
+        self.derive = derive
+        self.dispatcher = dispatcher
+        self._last_emitted = None
+        self._task = None
+        self.renders = 0
+        self.emits = 0
+        self._latency_by_cause: Dict[str, list] = {} # cause -> [count, total seconds, max seconds]
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def invalidate(self):
+        """Forgets the last submitted presence, e.g. after a Discord reconnect, so the next render is submitted."""
+        self._last_emitted = None
+
+    async def _run(self):
+        while True:
+            await self.state.changed.wait()
+            causes, changed_since = self.state.take_changes()
+            self.renders += 1
+            try:
+                presence = self.derive()
+            except Exception as e:
+                logger.error(f"Error deriving presence: {e}", exc_info=True)
+                continue
+            if presence is None or not self._differs(presence):
+                continue
+            if presence is PRESENCE_CLEAR: self.dispatcher.submit(clear=True)
+            else: self.dispatcher.submit(presence)
+            self._last_emitted = presence
+            self.emits += 1
+            if changed_since is not None:
+                latency = monotonic() - changed_since
+                for cause in causes:
+                    entry = self._latency_by_cause.setdefault(cause, [0, 0.0, 0.0])
+                    entry[0] += 1; entry[1] += latency; entry[2] = max(entry[2], latency)
+                logger.debug(f"Presence rendered for {causes} in {latency * 1000:.1f} ms: {'cleared' if presence is PRESENCE_CLEAR else (presence.get('details'), presence.get('state'))}")
+
+    def _differs(self, presence: Any) -> bool:
+        if self._last_emitted is None:
+            return True
+        if presence is PRESENCE_CLEAR or self._last_emitted is PRESENCE_CLEAR:
+            return presence is not self._last_emitted
+        return presence_changed(self._last_emitted, presence)
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        latency = {cause: {"count": count, "mean_ms": round(total / count * 1000, 1), "max_ms": round(worst * 1000, 1)}
+                   for cause, (count, total, worst) in self._latency_by_cause.items()}
+        return {"renders": self.renders, "emits": self.emits, "latency": latency}
@@ -0,0 +1,147 @@
+import os
+import struct
+from array import array
+from typing import List, Optional, Tuple, Any
+
+from .utilities import APPDATA_PATH, logger
+
+TIMELINE_DIR = os.path.join(APPDATA_PATH, "timelines")
+TIMELINE_FILE_EXTENSION = ".dlt"
+TIMELINE_MAGIC = b"DLRT"
+TIMELINE_FORMAT_VERSION = 1
+TIMELINE_HEADER = struct.Struct("<4sB") # magic, version
+TIMELINE_RECORD = struct.Struct("<fHHHHB") # game time, kills, deaths, assists, creep score, level (17 bytes)
+TIMELINE_CAPACITY = 256 # Samples held in memory; a full buffer is packed and written out by the next flush
+TIMELINE_MAX_FILES = 50 # Timelines of older matches are deleted
+
+
+class StatsTimeline:
+    """
+    Fixed-size ring buffer of the active player's stats for one match.
+    Samples are stored column-wise in arrays, so memory stays constant however long the match runs.
+    record() never touches the disk: a full buffer is packed into memory and flush_due becomes True, and the caller
+    then runs flush() (off the event loop) to append it to a binary file under APPDATA_PATH. close() flushes the rest;
+    read_timeline() loads the file back for post-game summaries.
+    """
+    def __init__(self, match_key: Any, capacity: int = TIMELINE_CAPACITY):
+        self.capacity = capacity
+        self.path = os.path.join(TIMELINE_DIR, f"{match_key}{TIMELINE_FILE_EXTENSION}")
+        self._game_times = array("f", bytes(4 * capacity))
+        self._kills = array("H", bytes(2 * capacity))
+        self._deaths = array("H", bytes(2 * capacity))
+        self._assists = array("H", bytes(2 * capacity))
+        self._creep_scores = array("H", bytes(2 * capacity))
+        self._levels = array("B", bytes(capacity))
+        self._next_index = 0 # Slot the next sample is written to
+        self._unflushed = 0 # Samples in the buffer not yet packed, ending at _next_index
+        self._packed_blocks: List[bytes] = [] # Packed samples of full buffers, waiting for flush()
+        self._last_sample: Optional[Tuple[int, int, int, int, int]] = None
+        self.samples = 0
+        self.flushes = 0
+        self._write_failed = False
+
+    def record(self, game_time: float, kills: int, deaths: int, assists: int, creep_score: int, level: int) -> bool:
+        """Records a sample if the stats changed since the last one. Returns whether it was recorded."""
+        sample = (kills, deaths, assists, creep_score, level)
+        if sample == self._last_sample:
+            return False
+        if self._unflushed == self.capacity:
+            self._packed_blocks.append(self._pack_unflushed())
+
+        index = self._next_index
+        self._game_times[index] = game_time
+        self._kills[index] = min(kills, 0xFFFF)
+        self._deaths[index] = min(deaths, 0xFFFF)
+        self._assists[index] = min(assists, 0xFFFF)
+        self._creep_scores[index] = min(creep_score, 0xFFFF)
+        self._levels[index] = min(level, 0xFF)
+        self._next_index = (index + 1) % self.capacity
+        self._unflushed = min(self._unflushed + 1, self.capacity)
+        self._last_sample = sample
+        self.samples += 1
+        return True
+
+    def record_scores(self, game_time: float, scores: dict, level: Any) -> bool:
+        """Records a sample from a Live Client `scores` dict and player level, ignoring malformed values."""
+        try:
+            return self.record(game_time, int(scores.get("kills", 0)), int(scores.get("deaths", 0)), int(scores.get("assists", 0)),
+                               int(scores.get("creepScore", 0)), int(level or 0))
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Stats timeline: skipping malformed sample: {e}")
+            return False
+
+    @property
+    def flush_due(self) -> bool:
+        """Whether samples of a full buffer are waiting to be written by flush()."""
+        return bool(self._packed_blocks)
+
+    def _pack_unflushed(self) -> bytes:
+        start = (self._next_index - self._unflushed) % self.capacity
+        records = bytearray()
+        for offset in range(self._unflushed):
+            i = (start + offset) % self.capacity
+            records += TIMELINE_RECORD.pack(self._game_times[i], self._kills[i], self._deaths[i], self._assists[i], self._creep_scores[i], self._levels[i])
+        self._unflushed = 0
+        return bytes(records)
+
+    def flush(self):
+        """Appends the samples not yet written to the match's timeline file. Blocking; async callers run it in a thread."""
+        blocks, self._packed_blocks = self._packed_blocks, [] # Dropped even if the write fails, so a read-only disk cannot grow anything
+        if self._unflushed:
+            blocks.append(self._pack_unflushed())
+        if not blocks or self._write_failed:
+            return
+        records = b"".join(blocks)
+
+        try:
+            os.makedirs(TIMELINE_DIR, exist_ok=True)
+            is_new_file = not os.path.exists(self.path)
+            with open(self.path, "ab") as f:
+                if is_new_file:
+                    f.write(TIMELINE_HEADER.pack(TIMELINE_MAGIC, TIMELINE_FORMAT_VERSION))
+                f.write(records)
+            self.flushes += 1
+            if is_new_file:
+                _prune_old_timelines()
+        except OSError as e:
+            self._write_failed = True
+            logger.warning(f"Could not write stats timeline to {self.path}: {e}. Timeline recording disabled for this match.")
+
+    def close(self):
+        self.flush()
+        logger.debug(f"Stats timeline closed: {self.samples} samples, {self.flushes} flushes, file {self.path}.")
+
+
+def _prune_old_timelines():
+    try:
+        timeline_files = [os.path.join(TIMELINE_DIR, name) for name in os.listdir(TIMELINE_DIR) if name.endswith(TIMELINE_FILE_EXTENSION)]
+        if len(timeline_files) <= TIMELINE_MAX_FILES:
+            return
+        timeline_files.sort(key=os.path.getmtime)
+        for path in timeline_files[:-TIMELINE_MAX_FILES]:
+            os.remove(path)
+    except OSError as e:
+        logger.warning(f"Could not prune old stats timelines: {e}")
+
+
+def read_timeline(path: str) -> List[Tuple[float, int, int, int, int, int]]:
+    """
+    Reads a timeline file written by StatsTimeline.
+    Returns a list of (game_time, kills, deaths, assists, creep_score, level) tuples, or an empty list if unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        logger.warning(f"Could not read stats timeline {path}: {e}")
+        return []
+
+    if len(data) < TIMELINE_HEADER.size:
+        return []
+    magic, version = TIMELINE_HEADER.unpack_from(data)
+    if magic != TIMELINE_MAGIC or version != TIMELINE_FORMAT_VERSION:
+        logger.warning(f"Stats timeline {path} has an unknown format ({magic!r}, version {version}).")
+        return []
+    body = memoryview(data)[TIMELINE_HEADER.size:]
+    usable_length = len(body) - len(body) % TIMELINE_RECORD.size # Ignore a record torn by a crash mid-write
+    return list(TIMELINE_RECORD.iter_unpack(body[:usable_length]))
@@ -8,7 +8,7 @@ from PIL import Image, UnidentifiedImageError
 from pystray import Icon, Menu, MenuItem
 
 from .utilities import (
-    editConfig, fetchConfig, resourcePath, resetConfig,
+    editConfig, fetchConfig, fetchConfigSnapshot, resourcePath, resetConfig,
     ISSUESURL, LOG_FILE_PATH,
     VERSION, addLog, logger
 )
@@ -241,41 +241,41 @@ def get_menu():
             MenuItem(lambda item_text: _current_status_text, None, enabled=False), 
             Menu.SEPARATOR,
             MenuItem("Use Skin's splash and name", on_skin_splash_clicked,
-                        checked=lambda item: fetchConfig("useSkinSplash"), enabled=interactive_enabled),
+                        checked=lambda item: fetchConfigSnapshot().useSkinSplash, enabled=interactive_enabled),
             MenuItem("Use animated splash if available", on_animated_splash_clicked,
-                        checked=lambda item: fetchConfig("animatedSplash"), enabled=interactive_enabled),
+                        checked=lambda item: fetchConfigSnapshot().animatedSplash, enabled=interactive_enabled),
             MenuItem('Show "View splash art" button', on_view_splash_art_clicked,
-                        checked=lambda item: fetchConfig("showViewArtButton"), enabled=interactive_enabled),
+                        checked=lambda item: fetchConfigSnapshot().showViewArtButton, enabled=interactive_enabled),
             MenuItem('Show party info', on_show_party_info_clicked,
-                        checked=lambda item: fetchConfig("showPartyInfo"), enabled=interactive_enabled),
+                        checked=lambda item: fetchConfigSnapshot().showPartyInfo, enabled=interactive_enabled),
             Menu.SEPARATOR,
             MenuItem("Ingame stats", Menu(
-                MenuItem("KDA", on_kda_clicked, checked=lambda item: fetchConfig("stats").get("kda", False)),
-                MenuItem("CS", on_cs_clicked, checked=lambda item: fetchConfig("stats").get("cs", False)),
-                MenuItem("Level", on_level_clicked, checked=lambda item: fetchConfig("stats").get("level", False))
+                MenuItem("KDA", on_kda_clicked, checked=lambda item: fetchConfigSnapshot().stats.get("kda", False)),
+                MenuItem("CS", on_cs_clicked, checked=lambda item: fetchConfigSnapshot().stats.get("cs", False)),
+                MenuItem("Level", on_level_clicked, checked=lambda item: fetchConfigSnapshot().stats.get("level", False))
             ), enabled=interactive_enabled),
             MenuItem("Show ranks", Menu(
-                MenuItem("Solo", on_rank_solo_clicked, checked=lambda item: fetchConfig("showRanks").get("RANKED_SOLO_5x5", False)),
-                MenuItem("Flex", on_rank_flex_clicked, checked=lambda item: fetchConfig("showRanks").get("RANKED_FLEX_SR", False)),
-                MenuItem("TFT", on_rank_tft_clicked, checked=lambda item: fetchConfig("showRanks").get("RANKED_TFT", False)),
-                MenuItem("TFT Double up", on_rank_double_up_clicked, checked=lambda item: fetchConfig("showRanks").get("RANKED_TFT_DOUBLE_UP", False))
+                MenuItem("Solo", on_rank_solo_clicked, checked=lambda item: fetchConfigSnapshot().showRanks.get("RANKED_SOLO_5x5", False)),
+                MenuItem("Flex", on_rank_flex_clicked, checked=lambda item: fetchConfigSnapshot().showRanks.get("RANKED_FLEX_SR", False)),
+                MenuItem("TFT", on_rank_tft_clicked, checked=lambda item: fetchConfigSnapshot().showRanks.get("RANKED_TFT", False)),
+                MenuItem("TFT Double up", on_rank_double_up_clicked, checked=lambda item: fetchConfigSnapshot().showRanks.get("RANKED_TFT_DOUBLE_UP", False))
             ), enabled=interactive_enabled),
             MenuItem("Ranked stats", Menu(
-                MenuItem("LP", on_rank_stats_lp_clicked, checked=lambda item: fetchConfig("rankedStats").get("lp", False)),
-                MenuItem("Wins", on_rank_stats_w_clicked, checked=lambda item: fetchConfig("rankedStats").get("w", False)),
-                MenuItem("Losses", on_rank_stats_l_clicked, checked=lambda item: fetchConfig("rankedStats").get("l", False))
+                MenuItem("LP", on_rank_stats_lp_clicked, checked=lambda item: fetchConfigSnapshot().rankedStats.get("lp", False)),
+                MenuItem("Wins", on_rank_stats_w_clicked, checked=lambda item: fetchConfigSnapshot().rankedStats.get("w", False)),
+                MenuItem("Losses", on_rank_stats_l_clicked, checked=lambda item: fetchConfigSnapshot().rankedStats.get("l", False))
             ), enabled=interactive_enabled),
             MenuItem("Idle status", Menu(
                 MenuItem("Disabled", lambda: on_idle_status_selected(None, "Disabled"),
-                            radio=True, checked=lambda item: fetchConfig("idleStatus") == 0),
+                            radio=True, checked=lambda item: fetchConfigSnapshot().idleStatus == 0),
                 MenuItem("Profile Info", lambda: on_idle_status_selected(None, "Profile Info"), 
-                            radio=True, checked=lambda item: fetchConfig("idleStatus") == 1),
+                            radio=True, checked=lambda item: fetchConfigSnapshot().idleStatus == 1),
                 MenuItem("Custom", lambda: on_idle_status_selected(None, "Custom"),
-                            radio=True, checked=lambda item: fetchConfig("idleStatus") == 2)
+                            radio=True, checked=lambda item: fetchConfigSnapshot().idleStatus == 2)
             ), enabled=interactive_enabled),
             Menu.SEPARATOR,
             MenuItem("Mute RPC", on_mute_rpc_clicked, 
-                        checked=lambda item: fetchConfig("isRpcMuted"), enabled=interactive_enabled),
+                        checked=lambda item: fetchConfigSnapshot().isRpcMuted, enabled=interactive_enabled),
             Menu.SEPARATOR,
             MenuItem("Reset preferences", on_reset_config_clicked, enabled=interactive_enabled), 
             MenuItem("Report bug / Open logs", on_report_bug_clicked, enabled=interactive_enabled), 
@@ -2,6 +2,8 @@ import sys
 import os
 import json
 import pickle 
+import copy
+from types import MappingProxyType
 import tkinter as tk
 from tkinter import messagebox, ttk, simpledialog
 import logging 
@@ -112,6 +114,72 @@ except Exception as e:
 
 _config_cache = None
 _on_config_changed_callbacks = [] 
+_config_snapshot = None
+_config_version = 0
+
+
+class ConfigSnapshot:
+    """
+    Read-only view of the configuration at one version, published by fetchConfigSnapshot().
+    Rebuilt only by editConfig/resetConfig, so hot paths hold one snapshot per tick and read attributes
+    directly (config.useSkinSplash, config.stats["kda"]) instead of calling fetchConfig for every key.
+    Values are already merged with DEFAULT_CONFIG; nested sections are read-only mappings.
+    """
+    __slots__ = ("version", "_values")
+
+    def __init__(self, version, values):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "_values", MappingProxyType(values))
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Unknown config key '{name}'") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is read-only. Use editConfig().")
+
+    def get(self, entry_key, default=None):
+        """Same lookup as fetchConfig, including "section.key" for nested values."""
+        main_key, _, sub_key = entry_key.partition('.')
+        value = self._values.get(main_key, default)
+        if sub_key:
+            return value.get(sub_key, default) if isinstance(value, MappingProxyType) else default
+        return value
+
+
+def _publish_config_snapshot():
+    global _config_snapshot, _config_version
+    values = copy.deepcopy(DEFAULT_CONFIG)
+    for key, value in copy.deepcopy(_load_config()).items():
+        default = values.get(key)
+        if default is not None and not isinstance(value, type(default)):
+            # Readers rely on the default's type (e.g. config.stats.get); a hand-edited or old value would break them
+            logger.warning(f"Config value for '{key}' has type {type(value).__name__}, expected {type(default).__name__}. Using the default.")
+            continue
+        if isinstance(default, dict):
+            for sub_key, sub_value in value.items():
+                sub_default = default.get(sub_key)
+                if sub_default is not None and not isinstance(sub_value, type(sub_default)):
+                    logger.warning(f"Config value for '{key}.{sub_key}' has type {type(sub_value).__name__}, expected {type(sub_default).__name__}. Using the default.")
+                    continue
+                default[sub_key] = sub_value
+        else:
+            values[key] = value
+    for key, value in values.items():
+        if isinstance(value, dict):
+            values[key] = MappingProxyType(value)
+    _config_version += 1
+    _config_snapshot = ConfigSnapshot(_config_version, values) # Swapped in one assignment; safe to read from the tray thread
+    logger.debug(f"Config snapshot version {_config_version} published.")
+
+
+def fetchConfigSnapshot():
+    """Returns the current immutable ConfigSnapshot. Cheap; no lookups until a value is read."""
+    if _config_snapshot is None:
+        _publish_config_snapshot()
+    return _config_snapshot
 
 def _ensure_appdata_dir():
     os.makedirs(APPDATA_PATH, exist_ok=True)
@@ -383,6 +451,7 @@ def editConfig(entry_key, value):
             changed = True
 
     if changed:
+        _publish_config_snapshot()
         if _save_config_to_file(): 
             _execute_config_changed_callbacks() 
     else:
@@ -394,6 +463,7 @@ def resetConfig():
     _ensure_appdata_dir()
     _config_cache = DEFAULT_CONFIG.copy()
     _config_cache["riotPath"] = getRiotPath() 
+    _publish_config_snapshot()
     if _save_config_to_file():
         _execute_config_changed_callbacks() 
     logger.info("Configuration has been reset to defaults.")
@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# src.utilities reads these at import time; keep the tests away from the user's real config and logs
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="detailedlolrpc-tests-")
+os.environ.setdefault("CLIENTID", "MTIzNDU2Nzg5MA==")
+
+# A config pointing at a plausible Riot Games folder, so loading it never prompts for the path
+RIOT_GAMES_PATH = os.path.join(os.environ["APPDATA"], "Riot Games")
+for folder in ("League of Legends", "Riot Client"):
+    os.makedirs(os.path.join(RIOT_GAMES_PATH, folder))
+os.makedirs(os.path.join(os.environ["APPDATA"], "DetailedLoLRPC"))
+with open(os.path.join(os.environ["APPDATA"], "DetailedLoLRPC", "config.json"), "w", encoding="utf-8") as f:
+    json.dump({"riotPath": RIOT_GAMES_PATH}, f)
+
+from src import gamestats
+from src.gamestats import API_NOT_READY_MARKER
+
+
+class FakeLiveClient:
+    """Answers Live Client requests from canned payloads, through the real response decoding, and records what was requested."""
+    def __init__(self):
+        self.payloads = {} # Endpoint without query string -> payload, or a callable taking the full endpoint
+        self.requested = []
+
+    async def request(self, endpoint, description):
+        self.requested.append(endpoint)
+        payload = self.payloads.get(endpoint.partition("?")[0], API_NOT_READY_MARKER)
+        if callable(payload):
+            payload = payload(endpoint)
+        if payload is API_NOT_READY_MARKER:
+            return API_NOT_READY_MARKER
+        return gamestats._decode_response(endpoint, json.dumps(payload).encode())
+
+
+@pytest.fixture
+def live_client(monkeypatch):
+    fake = FakeLiveClient()
+    monkeypatch.setattr(gamestats, "_make_live_client_request", fake.request)
+    monkeypatch.setattr(gamestats, "_match_identity", None)
+    monkeypatch.setattr(gamestats, "_current_game_id", None)
+    monkeypatch.setattr(gamestats, "_last_derived_stats", None)
+    monkeypatch.setattr(gamestats, "_response_fingerprints", {})
+    monkeypatch.setattr(gamestats, "_response_cache_stats", {"hits": 0, "misses": 0, "stats_hits": 0})
+    return fake
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+
+class FakeLcuConnection:
+    """Answers LCU requests from canned {endpoint: payload}, with 404 for anything else, and records the endpoints requested."""
+    def __init__(self):
+        self.responses = {}
+        self.requested = []
+
+    async def request(self, method, endpoint):
+        self.requested.append(endpoint)
+        if endpoint in self.responses:
+            return FakeResponse(200, self.responses[endpoint])
+        return FakeResponse(404, {})
+
+
+@pytest.fixture
+def lcu_connection():
+    return FakeLcuConnection()
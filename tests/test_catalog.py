@@ -0,0 +1,134 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from src import catalog
+from src.catalog import build_skin_index, SkinCatalog, ChampionIndex, SKINS_ENDPOINT, GAME_VERSION_ENDPOINT, CHAMPION_INVENTORY_ENDPOINT
+
+SKINS_JSON = {
+    "103000": {"id": 103000, "isBase": True, "name": "Ahri", "tilePath": "/base.png", "loadScreenPath": "/not-kept.png"},
+    "103002": {"id": 103002, "isBase": False, "name": "Dynasty Ahri", "tilePath": "/dynasty.png", "chromas": [{"id": 103003}, {"name": "no id"}]},
+    "103085": {"id": 103085, "isBase": False, "name": "Arcana Ahri", "questSkinInfo": {"tiers": [{"id": 103086, "name": "Ascended", "tilePath": "/ascended.png"}]}},
+    "broken": {"name": "no id"},
+}
+
+
+@pytest.fixture(autouse=True)
+def catalog_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "CATALOG_DIR", str(tmp_path))
+    return tmp_path
+
+
+def prepare(skin_catalog, connection, locale="en_US"):
+    """Runs prepare() to completion; it schedules its work as a task on the running loop."""
+    async def run():
+        await skin_catalog.prepare(connection, locale)
+    asyncio.run(run())
+
+
+@pytest.fixture
+def skins_lcu(lcu_connection):
+    lcu_connection.responses.update({GAME_VERSION_ENDPOINT: "14.20.1", SKINS_ENDPOINT: SKINS_JSON})
+    return lcu_connection
+
+
+def test_build_skin_index_flattens_skins_chromas_and_tiers():
+    index = build_skin_index(SKINS_JSON)
+    assert sorted(index) == [103000, 103002, 103003, 103085, 103086]
+    assert index[103000] == [103, {"id": 103000, "isBase": True, "name": "Ahri", "tilePath": "/base.png"}, None]
+    assert index[103003][1] is index[103002][1] # Chromas share their parent's record
+    assert index[103086] == [103, index[103085][1], {"id": 103086, "name": "Ascended", "tilePath": "/ascended.png"}]
+    assert build_skin_index(list(SKINS_JSON.values())) == index and build_skin_index(None) == {}
+
+
+def test_catalog_is_built_once_per_version_and_locale(skins_lcu, catalog_dir):
+    skin_catalog = SkinCatalog()
+    assert skin_catalog.lookup(103002) is None # Not ready yet: a miss, not a disk read
+
+    prepare(skin_catalog, skins_lcu)
+    assert skin_catalog.ready and skin_catalog.lookup(103003)[1]["name"] == "Dynasty Ahri"
+    assert skins_lcu.requested == [GAME_VERSION_ENDPOINT, SKINS_ENDPOINT]
+    assert (catalog_dir / "skins_14.20.1_en_US.json").exists()
+
+    prepare(skin_catalog, skins_lcu) # Same version and locale: nothing to do
+    assert skins_lcu.requested == [GAME_VERSION_ENDPOINT, SKINS_ENDPOINT, GAME_VERSION_ENDPOINT]
+    assert skin_catalog.stats() == {"entries": 5, "hits": 1, "misses": 1}
+
+
+def test_saved_catalog_is_loaded_off_the_event_loop(skins_lcu, monkeypatch):
+    prepare(SkinCatalog(), skins_lcu)
+    skins_lcu.requested.clear()
+    loaded_on_event_loop = []
+    load = SkinCatalog._load
+
+    def recording_load(path):
+        loaded_on_event_loop.append(threading.current_thread() is threading.main_thread())
+        return load(path)
+
+    monkeypatch.setattr(SkinCatalog, "_load", staticmethod(recording_load))
+    skin_catalog = SkinCatalog() # A new app session
+    prepare(skin_catalog, skins_lcu)
+    assert loaded_on_event_loop == [False]
+    assert skins_lcu.requested == [GAME_VERSION_ENDPOINT] # skins.json is not fetched again
+    assert skin_catalog.lookup(103086)[2]["name"] == "Ascended"
+
+
+def test_unreadable_or_old_catalog_is_rebuilt(skins_lcu, catalog_dir):
+    path = catalog_dir / "skins_14.20.1_en_US.json"
+    for stored in ("{not json", json.dumps({"formatVersion": 0, "skins": {}})):
+        path.write_text(stored, encoding="utf-8")
+        skin_catalog = SkinCatalog()
+        prepare(skin_catalog, skins_lcu)
+        assert skin_catalog.lookup(103000) is not None
+        assert json.loads(path.read_text(encoding="utf-8"))["formatVersion"] == catalog.CATALOG_FORMAT_VERSION
+
+
+INVENTORY_ENDPOINT = CHAMPION_INVENTORY_ENDPOINT.format(summoner_id=1)
+INVENTORY = [{"id": 103, "name": "Ahri", "skins": [{"id": 103000}]}, {"id": 22, "name": "Ashe"}, {"name": "no id"}]
+
+
+def test_champion_index_is_built_once_for_concurrent_callers(lcu_connection):
+    lcu_connection.responses[INVENTORY_ENDPOINT] = INVENTORY
+    champion_index = ChampionIndex()
+    assert champion_index.champion_id("Ahri") is None and champion_index.skins(103) is None # Not built: no request
+
+    async def scenario():
+        return await asyncio.gather(*(champion_index.ensure(lcu_connection, 1) for _ in range(3)))
+
+    assert asyncio.run(scenario()) == [True, True, True]
+    assert lcu_connection.requested == [INVENTORY_ENDPOINT]
+    assert (champion_index.champion_id("Ahri"), champion_index.skins(103), champion_index.skins(22)) == (103, [{"id": 103000}], [])
+    assert champion_index.stats() == {"champions": 2, "builds": 1}
+
+    champion_index.reset() # New LCU session
+    assert not champion_index.ready and asyncio.run(champion_index.ensure(lcu_connection, 1))
+    assert lcu_connection.requested == [INVENTORY_ENDPOINT, INVENTORY_ENDPOINT]
+
+
+def test_champion_index_discards_a_build_from_before_reset(lcu_connection):
+    lcu_connection.responses[INVENTORY_ENDPOINT] = INVENTORY
+    champion_index = ChampionIndex()
+    request = lcu_connection.request
+
+    async def scenario():
+        released = asyncio.Event()
+
+        async def slow_request(method, endpoint):
+            await released.wait()
+            return await request(method, endpoint)
+
+        lcu_connection.request = slow_request
+        build = asyncio.create_task(champion_index.ensure(lcu_connection, 1))
+        await asyncio.sleep(0)
+        champion_index.reset() # The client restarted while the inventory was being fetched
+        released.set()
+        return await build
+
+    assert asyncio.run(scenario()) is False and not champion_index.ready
+    lcu_connection.request = request
+    del lcu_connection.responses[INVENTORY_ENDPOINT]
+    assert asyncio.run(champion_index.ensure(lcu_connection, 1)) is False
+    lcu_connection.responses[INVENTORY_ENDPOINT] = INVENTORY # Failed builds are retried on next use
+    assert asyncio.run(champion_index.ensure(lcu_connection, 1)) and champion_index.stats()["builds"] == 1
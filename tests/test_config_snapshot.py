@@ -0,0 +1,46 @@
+import pytest
+
+from src import utilities
+from src.utilities import DEFAULT_CONFIG, fetchConfigSnapshot
+
+
+@pytest.fixture
+def config(monkeypatch):
+    """Publishes a snapshot of the given user config without touching the config file; the app's snapshot is restored afterwards."""
+    monkeypatch.setattr(utilities, "_config_snapshot", utilities._config_snapshot)
+    def publish(user_config):
+        monkeypatch.setattr(utilities, "_config_cache", user_config)
+        utilities._publish_config_snapshot()
+        return fetchConfigSnapshot()
+    return publish
+
+
+def test_user_values_are_merged_over_defaults(config):
+    snapshot = config({"useSkinSplash": False, "stats": {"cs": False}, "customKey": 7})
+    assert snapshot.useSkinSplash is False
+    assert dict(snapshot.stats) == {**DEFAULT_CONFIG["stats"], "cs": False} # Missing sub-keys keep their defaults
+    assert snapshot.showRanks["RANKED_SOLO_5x5"] is True
+    assert snapshot.customKey == 7
+    assert snapshot.get("stats.cs") is False and snapshot.get("stats.missing", "x") == "x"
+    assert DEFAULT_CONFIG["stats"]["cs"] is True # Defaults are not modified
+
+
+def test_values_of_the_wrong_type_keep_the_default(config):
+    snapshot = config({"stats": True, "showRanks": "yes", "rankedStats": {"lp": "x", "w": False}, "idleStatus": 2})
+    assert dict(snapshot.stats) == DEFAULT_CONFIG["stats"]
+    assert dict(snapshot.showRanks) == DEFAULT_CONFIG["showRanks"]
+    assert dict(snapshot.rankedStats) == {**DEFAULT_CONFIG["rankedStats"], "w": False}
+    assert snapshot.idleStatus == 2
+
+
+def test_snapshot_is_read_only_and_versioned(config):
+    first = config({})
+    second = config({"isRpcMuted": True})
+    assert second.version > first.version
+    assert first.isRpcMuted is False and second.isRpcMuted is True # Older snapshots are unaffected
+    with pytest.raises(AttributeError):
+        second.isRpcMuted = False
+    with pytest.raises(TypeError):
+        second.stats["kda"] = False
+    with pytest.raises(AttributeError):
+        second.noSuchKey
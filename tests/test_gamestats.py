@@ -0,0 +1,199 @@
+import asyncio
+
+import pytest
+
+from src import gamestats
+from src.gamestats import (get_live_snapshot, getStats, get_current_game_time, get_active_player_champion_data,
+                           LiveGameSnapshot, API_NOT_READY_MARKER, GameClock, GAME_CLOCK_DRIFT_THRESHOLD,
+                           GAME_CLOCK_EVENT_LAG_ALLOWANCE, GAME_CLOCK_RESYNC_INTERVAL)
+
+
+def player(name, kills=0, creep_score=0, level=1, champion="Ahri", skin_id=0):
+    return {"riotId": name, "summonerName": name, "championName": champion, "skinID": skin_id, "level": level,
+            "scores": {"kills": kills, "deaths": 1, "assists": 2, "creepScore": creep_score}}
+
+
+def all_game_data(players, active_name="Me#EUW", game_time=95.5):
+    return {"activePlayer": {"riotId": active_name}, "allPlayers": players, "gameData": {"gameTime": game_time}}
+
+
+def test_snapshot_serves_time_stats_and_champion_from_one_response(live_client):
+    live_client.payloads["allgamedata"] = all_game_data([player("Other#EUW"), player("Me#EUW", kills=3, creep_score=42, level=7, champion="Lux", skin_id=4)])
+    snapshot = asyncio.run(get_live_snapshot())
+
+    assert live_client.requested == ["allgamedata"]
+    assert isinstance(snapshot, LiveGameSnapshot) and snapshot.active_player_name == "Me#EUW"
+    assert get_current_game_time(snapshot) == 95.5
+    assert getStats(snapshot) == {"kda": "3/1/2", "cs": "42", "level": "7"}
+    assert get_active_player_champion_data(snapshot) == ("Lux", 4)
+    assert live_client.requested == ["allgamedata"] # The views make no requests
+
+
+def test_loading_and_malformed_snapshots(live_client):
+    snapshot = asyncio.run(get_live_snapshot()) # 404 or connection error
+    assert snapshot is API_NOT_READY_MARKER
+    assert getStats(snapshot) is API_NOT_READY_MARKER and get_current_game_time(snapshot) is API_NOT_READY_MARKER
+
+    live_client.payloads["allgamedata"] = all_game_data([]) # Loading screen: no players yet
+    assert asyncio.run(get_live_snapshot()) is API_NOT_READY_MARKER
+
+    live_client.payloads["allgamedata"] = ["not", "a", "dict"]
+    assert asyncio.run(get_live_snapshot()) is None
+    assert getStats(None) == {"kda": None, "cs": None, "level": None}
+    assert get_active_player_champion_data(None) == (None, None)
+
+    live_client.payloads["allgamedata"] = all_game_data([player("Me#EUW")], game_time=0.2) # Not started
+    assert get_current_game_time(asyncio.run(get_live_snapshot())) is API_NOT_READY_MARKER
+
+
+def test_active_player_missing_from_player_list(live_client):
+    live_client.payloads["allgamedata"] = all_game_data([player("Other#EUW")])
+    snapshot = asyncio.run(get_live_snapshot())
+    assert snapshot.active_player is None and snapshot.scores == {}
+    assert getStats(snapshot) == {"kda": None, "cs": None, "level": None}
+    assert get_active_player_champion_data(snapshot) == (None, None)
+
+
+def test_identity_is_resolved_once_per_match(live_client):
+    players = [player("Other#EUW"), player("Me#EUW", kills=1)]
+    live_client.payloads.update({"allgamedata": all_game_data(players), "playerlist": players, "gamestats": {"gameTime": 120.0}})
+    gamestats.begin_live_match(1)
+    first = asyncio.run(get_live_snapshot())
+    second = asyncio.run(get_live_snapshot())
+    third = asyncio.run(get_live_snapshot(include_game_time=False))
+
+    assert live_client.requested == ["allgamedata", "playerlist", "gamestats", "playerlist"]
+    assert first.active_player["scores"]["kills"] == second.active_player["scores"]["kills"] == 1
+    assert second.game_time == 120.0 and third.game_time is None and third.active_player_name == "Me#EUW"
+
+    gamestats.begin_live_match(1) # Same match: the identity is kept
+    asyncio.run(get_live_snapshot(include_game_time=False))
+    gamestats.begin_live_match(2)
+    asyncio.run(get_live_snapshot(include_game_time=False))
+    assert live_client.requested[4:] == ["playerlist", "allgamedata"]
+
+
+def test_identity_matches_summoner_name_when_there_is_no_riot_id(live_client):
+    players = [{"summonerName": "Me#EUW", "level": 3, "scores": {}}]
+    live_client.payloads.update({"allgamedata": all_game_data(players), "playerlist": players})
+    asyncio.run(get_live_snapshot())
+    assert gamestats._match_identity.name_key == "summonerName"
+    assert asyncio.run(get_live_snapshot(include_game_time=False)).active_player["level"] == 3
+
+
+def test_cached_index_follows_the_player_and_is_dropped_when_lost(live_client):
+    players = [player("Other#EUW"), player("Me#EUW", level=2)]
+    live_client.payloads.update({"allgamedata": all_game_data(players), "playerlist": list(reversed(players))})
+    asyncio.run(get_live_snapshot())
+    assert gamestats._match_identity.player_index == 1
+
+    snapshot = asyncio.run(get_live_snapshot(include_game_time=False)) # List order changed: found by rescanning
+    assert snapshot.active_player["level"] == 2 and gamestats._match_identity.player_index == 0
+
+    live_client.payloads["playerlist"] = [player("Other#EUW")] # Player gone: resolved again from allgamedata
+    snapshot = asyncio.run(get_live_snapshot(include_game_time=False))
+    assert live_client.requested[-2:] == ["playerlist", "allgamedata"] and snapshot.active_player["level"] == 2
+
+    live_client.payloads["playerlist"] = API_NOT_READY_MARKER # API back to not-ready: the identity is dropped
+    assert asyncio.run(get_live_snapshot(include_game_time=False)) is API_NOT_READY_MARKER
+    assert gamestats._match_identity is None
+
+
+def test_event_feed_only_asks_for_newer_events(live_client):
+    events = [{"EventID": 0, "EventName": "GameStart", "EventTime": 0.1},
+              {"EventID": 1, "EventName": "MinionsSpawning", "EventTime": 65.0}]
+    live_client.payloads["eventdata"] = lambda endpoint: {"Events": [event for event in events if event["EventID"] >= int(endpoint.rpartition("=")[2])]}
+    event_feed = gamestats.LiveEventFeed()
+
+    first = asyncio.run(event_feed.poll())
+    assert [event["EventID"] for event in first] == [0, 1] and not gamestats.LiveEventFeed.affects_presence(first)
+    assert asyncio.run(event_feed.poll()) == []
+    events.append({"EventID": 2, "EventName": "ChampionKill", "EventTime": 80.0})
+    third = asyncio.run(event_feed.poll())
+    assert [event["EventID"] for event in third] == [2] and gamestats.LiveEventFeed.affects_presence(third)
+    assert live_client.requested == ["eventdata?eventID=0", "eventdata?eventID=2", "eventdata?eventID=2"]
+    assert event_feed.stats() == {"polls": 3, "events_received": 3, "last_event_id": 2}
+
+
+def test_event_feed_filters_old_events_and_bad_responses(live_client):
+    event_feed = gamestats.LiveEventFeed()
+    event_feed.last_event_id = 4
+    live_client.payloads["eventdata"] = {"Events": [{"EventID": 3}, {"EventID": 5, "EventName": "Ace"}, {"EventName": "NoId"}]} # Query ignored
+    assert [event["EventID"] for event in asyncio.run(event_feed.poll())] == [5]
+
+    live_client.payloads["eventdata"] = {"unexpected": True}
+    assert asyncio.run(event_feed.poll()) is None
+    live_client.payloads["eventdata"] = API_NOT_READY_MARKER
+    assert asyncio.run(event_feed.poll()) is API_NOT_READY_MARKER
+    event_feed.reset()
+    assert event_feed.last_event_id == -1
+
+
+
+def test_unchanged_body_reuses_the_decoded_response(live_client):
+    body = b'[{"riotId": "Me#EUW", "level": 1}]'
+    first = gamestats._decode_response("playerlist", body)
+    assert gamestats._decode_response("playerlist", bytes(body)) is first
+    changed = gamestats._decode_response("playerlist", body.replace(b"1", b"2"))
+    assert changed is not first and changed[0]["level"] == 2
+
+    events = b'{"Events": []}'
+    gamestats._decode_response("eventdata?eventID=1", events)
+    assert gamestats._decode_response("eventdata?eventID=2", events) is not gamestats._decode_response("eventdata?eventID=1", events)
+    assert gamestats._decode_response("gamestats", b"{}") is not gamestats._decode_response("gamestats", b"{}") # Not fingerprinted
+    assert gamestats.get_response_cache_stats() == {"hits": 1, "misses": 5, "stats_hits": 0}
+
+
+def test_stats_are_reused_while_the_player_list_is_unchanged(live_client):
+    me = player("Me#EUW", kills=1, creep_score=20, level=4)
+    live_client.payloads.update({"allgamedata": all_game_data([me]), "playerlist": lambda endpoint: [me]})
+    asyncio.run(get_live_snapshot())
+    first = getStats(asyncio.run(get_live_snapshot(include_game_time=False)))
+    second = getStats(asyncio.run(get_live_snapshot(include_game_time=False)))
+    assert first == second == {"kda": "1/1/2", "cs": "20", "level": "4"}
+    second["cs"] = "edited" # Callers get copies
+    assert getStats(asyncio.run(get_live_snapshot(include_game_time=False)))["cs"] == "20"
+    assert gamestats.get_response_cache_stats()["stats_hits"] == 2
+
+    me["scores"]["creepScore"] = 21
+    assert getStats(asyncio.run(get_live_snapshot(include_game_time=False)))["cs"] == "21"
+    assert gamestats.get_response_cache_stats()["stats_hits"] == 2
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Current monotonic time for the game clock, advanced by the test."""
+    now = [1000.0]
+    monkeypatch.setattr(gamestats, "monotonic", lambda: now[0])
+    return now
+
+
+def test_extrapolates_from_last_sync(clock):
+    game_clock = GameClock()
+    assert not game_clock.synced and game_clock.needs_resync()
+    game_clock.sync(120.0)
+    clock[0] += 30
+    assert game_clock.now() == 150.0
+    assert not game_clock.needs_resync()
+    clock[0] += GAME_CLOCK_RESYNC_INTERVAL
+    assert game_clock.needs_resync()
+
+
+def test_events_within_tolerance_keep_the_clock(clock):
+    game_clock = GameClock()
+    game_clock.sync(100.0)
+    clock[0] += 10 # Clock says 110 s
+    assert not game_clock.observe_events([{"EventName": "ChampionKill", "EventTime": 110.0 + GAME_CLOCK_DRIFT_THRESHOLD}])
+    # Events arrive up to one poll interval late
+    assert not game_clock.observe_events([{"EventName": "ChampionKill", "EventTime": 110.0 - GAME_CLOCK_EVENT_LAG_ALLOWANCE}])
+    assert game_clock.synced
+
+
+def test_drifted_event_forces_resync(clock):
+    game_clock = GameClock()
+    game_clock.sync(100.0)
+    clock[0] += 10
+    # The game was paused: the event is far behind the extrapolated clock
+    assert game_clock.observe_events([{"EventName": "Ace", "EventTime": 80.0}])
+    assert not game_clock.synced and game_clock.needs_resync()
+    game_clock.sync(81.0)
+    assert game_clock.now() == 81.0 and game_clock.syncs == 2
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.lcu import LcuEventCoalescer
+
+URI = "/lol-gameflow/v1/session"
+
+
+def event(event_type, data):
+    return SimpleNamespace(type=event_type, uri=URI, data=data)
+
+
+def make_stage(urgent_key=None):
+    handled = []
+    async def handler(connection, lcu_event):
+        handled.append(lcu_event.data)
+    coalescer = LcuEventCoalescer(window=0.05)
+    return coalescer, coalescer.wrap(URI, handler, urgent_key=urgent_key), handled
+
+
+def test_burst_of_updates_is_handled_once_with_newest():
+    async def scenario():
+        coalescer, ingest, handled = make_stage()
+        for i in range(5):
+            await ingest(None, event("UPDATE", i))
+        assert handled == []
+        await asyncio.sleep(0.1)
+        return coalescer, handled
+
+    coalescer, handled = asyncio.run(scenario())
+    assert handled == [4]
+    assert coalescer.stats()[URI] == {"received": 5, "processed": 1}
+
+
+def test_create_and_delete_are_handled_immediately_and_supersede_held_update():
+    async def scenario():
+        _, ingest, handled = make_stage()
+        await ingest(None, event("UPDATE", "held"))
+        await ingest(None, event("DELETE", None))
+        immediate = list(handled)
+        await asyncio.sleep(0.1)
+        return immediate, handled
+
+    immediate, handled = asyncio.run(scenario())
+    assert immediate == [None]
+    assert handled == [None] # The older held UPDATE is dropped
+
+
+def test_urgent_key_change_is_handled_immediately():
+    async def scenario():
+        _, ingest, handled = make_stage(urgent_key=lambda lcu_event: lcu_event.data["phase"])
+        await ingest(None, event("UPDATE", {"phase": "Lobby", "n": 1})) # First key seen counts as a change
+        await ingest(None, event("UPDATE", {"phase": "Lobby", "n": 2}))
+        await ingest(None, event("UPDATE", {"phase": "Matchmaking", "n": 3}))
+        immediate = [data["n"] for data in handled]
+        await asyncio.sleep(0.1)
+        return immediate, [data["n"] for data in handled]
+
+    immediate, handled = asyncio.run(scenario())
+    assert immediate == [1, 3]
+    assert handled == [1, 3] # n=2 was superseded by the phase change
+
+
+def test_cancel_pending_drops_held_updates():
+    async def scenario():
+        coalescer, ingest, handled = make_stage()
+        await ingest(None, event("UPDATE", "held"))
+        await coalescer.cancel_pending()
+        await asyncio.sleep(0.1)
+        return handled
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_update_arriving_while_the_handler_runs_is_not_lost():
+    async def scenario():
+        handled = []
+        async def slow_handler(connection, lcu_event):
+            await asyncio.sleep(0.1)
+            handled.append(lcu_event.data)
+        coalescer = LcuEventCoalescer(window=0.05)
+        ingest = coalescer.wrap(URI, slow_handler)
+        await ingest(None, event("UPDATE", 1))
+        await asyncio.sleep(0.08) # The window has passed and the handler is running
+        await ingest(None, event("UPDATE", 2))
+        await ingest(None, event("UPDATE", 3))
+        await asyncio.sleep(0.4)
+        return coalescer, handled
+
+    coalescer, handled = asyncio.run(scenario())
+    assert handled == [1, 3]
+    assert coalescer.stats()[URI] == {"received": 3, "processed": 2}
@@ -0,0 +1,95 @@
+import asyncio
+
+from src.lcustate import RankedStatsStore, LobbyState, GameflowPhaseState, RANKED_STATS_ENDPOINT, LOBBY_ENDPOINT, GAMEFLOW_PHASE_ENDPOINT
+
+SOLO_RANK = {"tier": "GOLD", "division": "II", "leaguePoints": 40, "wins": 10, "losses": 8}
+
+
+def test_ranked_stats_are_primed_once_then_follow_websocket_events(lcu_connection):
+    lcu_connection.responses[RANKED_STATS_ENDPOINT] = {"queueMap": {"RANKED_SOLO_5x5": SOLO_RANK, "RANKED_FLEX_SR": "bad"}}
+    ranked_stats = RankedStatsStore()
+    assert not ranked_stats.ready and ranked_stats.get("RANKED_SOLO_5x5") is None
+
+    assert asyncio.run(ranked_stats.prime(lcu_connection))
+    assert ranked_stats.get("RANKED_SOLO_5x5") == SOLO_RANK
+    assert ranked_stats.get("RANKED_FLEX_SR") is None and ranked_stats.get("RANKED_TFT") is None
+
+    ranked_stats.apply({"queueMap": {"RANKED_SOLO_5x5": {**SOLO_RANK, "leaguePoints": 60}}}) # Websocket update after a win
+    assert ranked_stats.get("RANKED_SOLO_5x5")["leaguePoints"] == 60
+    assert lcu_connection.requested == [RANKED_STATS_ENDPOINT] # Reads are served from memory
+    assert ranked_stats.stats() == {"queues": 1, "primes": 1, "updates": 2}
+
+    ranked_stats.apply(None) # Unexpected payload: ready, but nothing known
+    assert ranked_stats.ready and ranked_stats.get("RANKED_SOLO_5x5") is None
+    ranked_stats.reset()
+    assert not ranked_stats.ready
+
+
+def test_ranked_stats_prime_failure_leaves_the_store_unprimed(lcu_connection):
+    ranked_stats = RankedStatsStore()
+    assert not asyncio.run(ranked_stats.prime(lcu_connection)) # 404
+    assert not ranked_stats.ready and ranked_stats.stats()["primes"] == 0
+
+
+def test_lobby_state_tracks_member_count_changes(lcu_connection):
+    lobby_state = LobbyState()
+    assert asyncio.run(lobby_state.prime(lcu_connection)) # 404: no lobby
+    assert lobby_state.ready and lobby_state.member_count == 0
+
+    lobby = {"partyId": "p1", "partyType": "open", "members": [{"puuid": "me"}]}
+    assert lobby_state.apply(lobby)
+    assert not lobby_state.apply({**lobby, "partyType": "closed"}) # Same members: the presence needs no refresh
+    assert lobby_state.apply({**lobby, "members": [{"puuid": "me"}, {"puuid": "friend"}]})
+    assert lobby_state.stats() == {"members": 2, "party_type": "open", "known": True, "updates": 4}
+
+    assert lobby_state.apply(None) # Lobby deleted
+    assert (lobby_state.member_count, lobby_state.party_id) == (0, None)
+    lobby_state.reset()
+    assert not lobby_state.ready
+
+
+def test_lobby_state_is_primed_from_the_current_lobby(lcu_connection):
+    lcu_connection.responses[LOBBY_ENDPOINT] = {"partyId": "p1", "partyType": "open", "members": [{}, {}, {}]}
+    lobby_state = LobbyState()
+    assert asyncio.run(lobby_state.prime(lcu_connection))
+    assert (lobby_state.member_count, lobby_state.party_id) == (3, "p1")
+    assert lcu_connection.requested == [LOBBY_ENDPOINT]
+
+
+def test_gameflow_phase_is_read_over_http_only_until_an_event_arrives(lcu_connection):
+    lcu_connection.responses[GAMEFLOW_PHASE_ENDPOINT] = "Lobby"
+    phase_state = GameflowPhaseState()
+    assert asyncio.run(phase_state.current(lcu_connection)) == "Lobby"
+    assert asyncio.run(phase_state.current(lcu_connection)) == "Lobby"
+    assert lcu_connection.requested == [GAMEFLOW_PHASE_ENDPOINT]
+
+    assert phase_state.apply('"ChampSelect"') and not phase_state.apply("ChampSelect")
+    assert asyncio.run(phase_state.current(lcu_connection)) == "ChampSelect"
+    assert lcu_connection.requested == [GAMEFLOW_PHASE_ENDPOINT]
+
+
+def test_stale_http_phase_never_overwrites_a_newer_event(lcu_connection):
+    lcu_connection.responses[GAMEFLOW_PHASE_ENDPOINT] = "Lobby"
+    phase_state = GameflowPhaseState()
+    request = lcu_connection.request
+
+    async def scenario():
+        released = asyncio.Event()
+
+        async def slow_request(method, endpoint):
+            await released.wait()
+            return await request(method, endpoint)
+
+        lcu_connection.request = slow_request
+        read = asyncio.create_task(phase_state.current(lcu_connection))
+        await asyncio.sleep(0)
+        phase_state.apply("Matchmaking") # The event overtakes the HTTP response
+        released.set()
+        return await read
+
+    assert asyncio.run(scenario()) == "Matchmaking"
+    assert phase_state.stats() == {"phase": "Matchmaking", "sequence": 1, "http_reads": 1, "stale_http_reads": 1}
+
+    phase_state.reset() # LCU disconnected: read again on next use
+    lcu_connection.request = request
+    assert asyncio.run(phase_state.current(lcu_connection)) == "Lobby"
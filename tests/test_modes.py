@@ -0,0 +1,272 @@
+import asyncio
+import threading
+from time import time
+
+import pytest
+
+from src import modes, timeline
+from src.catalog import SkinCatalog, ChampionIndex
+from src.cdngen import assetsLink, defaultTileLink, tftImg
+from src.gamestats import LiveGameSnapshot
+from src.polling import AdaptivePollScheduler
+from src.presence import PresenceState
+from src.utilities import ConfigSnapshot, DEFAULT_CONFIG
+
+CONVERGENCE = {"name": "Convergence", "mapStringId": "TFT", "id": 22, "gameMode": "TFT"}
+SUMMONERS_RIFT = {"name": "Summoner's Rift", "mapStringId": "SR", "id": 11, "gameMode": "CLASSIC"}
+RANKED_SOLO = {"description": "Ranked Solo/Duo", "type": "RANKED_SOLO_5x5", "category": "PvP", "gameMode": "CLASSIC"}
+AHRI_SKINS = [
+    {"id": 103000, "isBase": True, "name": "Ahri", "tilePath": "/lol-game-data/assets/ahri/tile.png", "chromas": []},
+    {"id": 103002, "isBase": False, "name": "Dynasty Ahri", "tilePath": "/lol-game-data/assets/ASSETS/ahri/dynasty.png",
+     "uncenteredSplashPath": "/lol-game-data/assets/ASSETS/ahri/dynasty.jpg", "chromas": [{"id": 103003}]},
+    {"id": 103085, "isBase": False, "name": "Arcana Ahri", "tilePath": "/lol-game-data/assets/ASSETS/ahri/arcana.png",
+     "questSkinInfo": {"tiers": [{"id": 103086, "name": "Arcana Ahri Ascended", "tilePath": "/lol-game-data/assets/ASSETS/ahri/ascended.png"}]}},
+]
+AHRI_SKINS_ENDPOINT = "/lol-champions/v1/inventories/1/champions/103/skins"
+
+
+class RecordingPresenceState(PresenceState):
+    def __init__(self):
+        super().__init__()
+        self.frames = []
+
+    def submit(self, payload=None, clear=False):
+        self.frames.append("clear" if clear else payload)
+        super().submit(payload, clear)
+
+
+def make_config(**overrides):
+    return ConfigSnapshot(1, {**DEFAULT_CONFIG, **overrides})
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalogs(monkeypatch):
+    """Empty skin catalog and champion index, so each test starts from a new LCU session."""
+    monkeypatch.setattr(modes, "skin_catalog", SkinCatalog())
+    monkeypatch.setattr(modes, "champion_index", ChampionIndex())
+
+
+@pytest.fixture(autouse=True)
+def timeline_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeline, "TIMELINE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_in_game_ticks_poll_event_feed_and_player_list_only(live_client, lcu_connection):
+    me = {"riotId": "Me#EUW", "championName": "Ahri", "skinID": 0, "level": 3,
+          "scores": {"kills": 0, "deaths": 0, "assists": 0, "creepScore": 10}}
+    live_client.payloads.update({
+        "allgamedata": {"activePlayer": {"riotId": "Me#EUW"}, "allPlayers": [me], "gameData": {"gameTime": 300.0}},
+        "playerlist": lambda endpoint: [me], "gamestats": {"gameTime": 300.0}, "eventdata": {"Events": []}})
+    lcu_connection.responses[AHRI_SKINS_ENDPOINT] = AHRI_SKINS
+    presence_state = RecordingPresenceState()
+    ticks = []
+
+    def stop_condition():
+        ticks.append(len(live_client.requested))
+        if len(ticks) == 5: me["scores"]["creepScore"] = 11 # No Live Client event for CS
+        if len(ticks) == 7: me["level"] = 4
+        return len(ticks) > 8
+
+    asyncio.run(modes.updateInProgressRPC(stop_condition, time(), (103, 103000), SUMMONERS_RIFT, None, RANKED_SOLO, {"gameId": 1},
+                                          "Ahri", "Ahri", lcu_connection, 1, {"inGame": "In Game"}, presence_state,
+                                          AdaptivePollScheduler(base_interval=0.01, steady_max_interval=0.01)))
+
+    assert live_client.requested[0] == "allgamedata"
+    for before, after in zip(ticks[1:], ticks[2:]): # Every in-game tick after the first
+        assert sorted(endpoint.partition("?")[0] for endpoint in live_client.requested[before:after]) == ["eventdata", "playerlist"]
+    assert [frame["state"] for frame in presence_state.frames] == [
+        "In Game • 0/0/0 • 10 CS • Lvl 3", "In Game • 0/0/0 • 11 CS • Lvl 3", "In Game • 0/0/0 • 11 CS • Lvl 4"]
+    assert lcu_connection.requested == [AHRI_SKINS_ENDPOINT]
+
+
+def test_stats_timeline_samples_every_tick_and_flushes_off_the_event_loop(live_client, lcu_connection, monkeypatch, timeline_dir):
+    me = {"riotId": "Me#EUW", "level": 1, "scores": {"kills": 0, "deaths": 0, "assists": 0, "creepScore": 0}}
+    live_client.payloads.update({
+        "allgamedata": {"activePlayer": {"riotId": "Me#EUW"}, "allPlayers": [me], "gameData": {"gameTime": 60.0}},
+        "playerlist": lambda endpoint: [me], "gamestats": {"gameTime": 60.0}, "eventdata": {"Events": []}})
+    flushed_on_event_loop = []
+
+    class SmallStatsTimeline(timeline.StatsTimeline):
+        def __init__(self, match_key):
+            super().__init__(match_key, capacity=3)
+
+        def flush(self):
+            flushed_on_event_loop.append(threading.current_thread() is threading.main_thread())
+            super().flush()
+
+    monkeypatch.setattr(modes, "StatsTimeline", SmallStatsTimeline)
+    presence_state = RecordingPresenceState()
+    ticks = []
+
+    def stop_condition():
+        ticks.append(None)
+        me["scores"]["creepScore"] = len(ticks) # Not displayed in TFT, so no refresh
+        return len(ticks) > 8
+
+    asyncio.run(modes.updateInProgressRPC(stop_condition, time(), (0, 0), CONVERGENCE, None, RANKED_SOLO, {"gameId": 2},
+                                          "TFT", "TFT", lcu_connection, 1, {"inGame": "In Game"}, presence_state,
+                                          AdaptivePollScheduler(base_interval=0.01, steady_max_interval=0.01)))
+
+    assert len(presence_state.frames) == 1
+    assert [sample[4] for sample in timeline.read_timeline(str(timeline_dir / "2.dlt"))] == list(range(1, 9))
+    assert len(flushed_on_event_loop) >= 3 and not any(flushed_on_event_loop)
+
+
+def test_skin_presentation_is_resolved_once_per_match(lcu_connection):
+    lcu_connection.responses[AHRI_SKINS_ENDPOINT] = AHRI_SKINS
+    skin_presentation = modes.MatchSkinPresentation(103, 103003) # A chroma of Dynasty Ahri
+
+    first = asyncio.run(skin_presentation.resolve(lcu_connection, 1, None, make_config(showViewArtButton=True)))
+    assert (first.skin_name, first.tile_image, first.splash_url) == (
+        "Dynasty Ahri", assetsLink("/lol-game-data/assets/ASSETS/ahri/dynasty.png"), assetsLink("/lol-game-data/assets/ASSETS/ahri/dynasty.jpg"))
+    assert asyncio.run(skin_presentation.resolve(lcu_connection, 1, None, make_config())) is first
+    assert lcu_connection.requested == [AHRI_SKINS_ENDPOINT] and skin_presentation.lcu_fetches == 1
+
+    base = asyncio.run(skin_presentation.resolve(lcu_connection, 1, None, make_config(useSkinSplash=False))) # Rebuilt from the fetched list
+    assert (base.skin_name, base.tile_image) == ("Ahri", defaultTileLink(103))
+    assert lcu_connection.requested == [AHRI_SKINS_ENDPOINT]
+
+
+def test_quest_skin_tier_overrides_the_parent_skin(lcu_connection):
+    lcu_connection.responses[AHRI_SKINS_ENDPOINT] = AHRI_SKINS
+    tier = asyncio.run(modes.MatchSkinPresentation(103, 103086).resolve(lcu_connection, 1, None, make_config()))
+    assert (tier.skin_name, tier.tile_image) == ("Arcana Ahri Ascended", assetsLink("/lol-game-data/assets/ASSETS/ahri/ascended.png"))
+
+
+def test_failed_skin_fetch_is_retried_on_the_next_tick(lcu_connection):
+    skin_presentation = modes.MatchSkinPresentation(103, 103002)
+    fallback = asyncio.run(skin_presentation.resolve(lcu_connection, 1, None, make_config()))
+    assert (fallback.skin_name, fallback.tile_image) == ("Champion", defaultTileLink(103))
+
+    lcu_connection.responses[AHRI_SKINS_ENDPOINT] = AHRI_SKINS
+    assert asyncio.run(skin_presentation.resolve(lcu_connection, 1, None, make_config())).skin_name == "Dynasty Ahri"
+    assert lcu_connection.requested == [AHRI_SKINS_ENDPOINT, AHRI_SKINS_ENDPOINT]
+
+
+def test_bravery_champion_is_resolved_from_the_live_client_once(lcu_connection):
+    lcu_connection.responses["/lol-champions/v1/inventories/1/champions"] = [{"id": 103, "name": "Ahri", "skins": AHRI_SKINS}]
+    skin_presentation = modes.MatchSkinPresentation(-3, 0)
+    live_snapshot = LiveGameSnapshot(100.0, "Me#EUW", {"championName": "Ahri", "skinID": 2}, [], {})
+
+    presentation = asyncio.run(skin_presentation.resolve(lcu_connection, 1, live_snapshot, make_config()))
+    assert presentation.skin_name == "Dynasty Ahri"
+    assert asyncio.run(skin_presentation.resolve(lcu_connection, 1, None, make_config())) is presentation
+    assert lcu_connection.requested == ["/lol-champions/v1/inventories/1/champions"] # Skins came from the champion index
+
+
+STATS = {"kda": "1/2/3", "cs": "42", "level": "7"}
+SWARM = {"name": "Swarm", "mapStringId": "SWARM", "id": 33, "gameMode": "STRAWBERRY"}
+ARENA = {"name": "Rings of Wrath", "mapStringId": "CHERRY", "id": 30, "gameMode": "CHERRY"}
+
+
+def test_standard_and_arena_plans_show_the_skin_and_their_stats(lcu_connection):
+    lcu_connection.responses[AHRI_SKINS_ENDPOINT] = AHRI_SKINS
+    plan = modes.make_render_plan(SUMMONERS_RIFT, None, RANKED_SOLO, {}, 103, 103002, modes.MatchLookupMemo())
+    assert type(plan) is modes.StandardRenderPlan
+    asyncio.run(plan.resolve_art(lcu_connection, 1, None, make_config(showViewArtButton=True)))
+    assert plan.render(STATS, 1000, make_config()) == {
+        "details": "Summoner's Rift (Ranked Solo/Duo)", "large_image": assetsLink("/lol-game-data/assets/ASSETS/ahri/dynasty.png"),
+        "large_text": "Dynasty Ahri", "state": "In Game • 1/2/3 • 42 CS • Lvl 7", "start": 1000,
+        "buttons": [{"label": "View Splash Art", "url": assetsLink("/lol-game-data/assets/ASSETS/ahri/dynasty.jpg")}]}
+    assert plan.render(STATS, 1000, make_config(stats={"kda": True, "cs": False, "level": True}))["state"] == "In Game • 1/2/3 • Lvl 7"
+
+    arena = modes.make_render_plan(ARENA, None, {"description": "Arena", "gameMode": "CHERRY"}, {}, 103, 103002, modes.MatchLookupMemo())
+    assert type(arena) is modes.ArenaRenderPlan
+    assert arena.render(STATS, 1000, make_config())["state"] == "In Game • 1/2/3 • Lvl 7" # No CS in Arena
+    assert arena.render_without_clock(STATS, 1000, make_config())["state"] == "In Game • 1/2/3 • 42 CS • Lvl 7"
+    assert arena.render_loading(1000) == {"details": "Rings of Wrath (Arena)", "state": "Loading Match...",
+                                          "large_image": "lol_icon", "large_text": "Rings of Wrath", "start": 1000}
+
+
+def test_tft_and_swarm_plans_show_no_stats(lcu_connection):
+    companion = {"selectedLoadoutItem": {"name": "Pengu", "loadoutsIcon": "/lol-game-data/assets/ASSETS/Loadouts/Companions/pengu.png"}}
+    lcu_connection.responses.update({"/lol-cosmetics/v1/inventories/tft/companions": companion,
+                                     "/lol-champions/v1/inventories/1/champions/92": {"name": "Riven"}})
+    tft = modes.make_render_plan(CONVERGENCE, None, {"description": "Normal", "gameMode": "TFT"}, {}, 0, 0, modes.MatchLookupMemo())
+    asyncio.run(tft.resolve_art(lcu_connection, 1, None, make_config()))
+    assert type(tft) is modes.TftRenderPlan
+    assert tft.render(STATS, 1000, make_config()) == {"details": "Convergence (Normal)", "large_image": tftImg(companion["selectedLoadoutItem"]["loadoutsIcon"]),
+                                                      "large_text": "Pengu", "state": "In Game", "start": 1000}
+
+    swarm = modes.make_render_plan(SWARM, None, {"description": "Swarm", "gameMode": "STRAWBERRY"}, {}, 3147, 0, modes.MatchLookupMemo())
+    asyncio.run(swarm.resolve_art(lcu_connection, 1, None, make_config()))
+    assert type(swarm) is modes.SwarmRenderPlan
+    assert swarm.render(STATS, 1000, make_config()) == {"details": "Swarm (PvE)", "large_image": defaultTileLink(92),
+                                                        "large_text": "Riven", "state": "In Game", "start": 1000}
+
+
+def test_plan_is_relocalized_when_the_locale_strings_arrive():
+    locale_strings = {}
+    plan = modes.make_render_plan(SUMMONERS_RIFT, None, {"description": "Co-op vs. AI", "type": "BOT", "gameMode": "CLASSIC"},
+                                  locale_strings, 103, 103000, modes.MatchLookupMemo())
+    assert plan.render(STATS, 1000, make_config())["details"] == "Summoner's Rift (Bot Co-op vs. AI)"
+    locale_strings.update({"inGame": "En partie", "bot": "IA"}) # Filled in place by the app
+    payload = plan.render(STATS, 1000, make_config())
+    assert (payload["details"], payload["state"]) == ("Summoner's Rift (IA Co-op vs. AI)", "En partie • 1/2/3 • 42 CS • Lvl 7")
+
+
+def test_match_lookup_memo_keeps_successful_responses_until_cleared(lcu_connection):
+    endpoint = "/lol-champions/v1/inventories/1/champions/92"
+    lookup_memo = modes.MatchLookupMemo()
+    swarm = modes.make_render_plan(SWARM, None, {"description": "Swarm"}, {}, 3147, 0, lookup_memo)
+    asyncio.run(swarm.resolve_art(lcu_connection, 1, None, make_config()))
+    assert swarm.large_text == "Champion" # Failed: not kept, so retried next tick
+
+    lcu_connection.responses[endpoint] = {"name": "Riven"}
+    for _ in range(3):
+        asyncio.run(swarm.resolve_art(lcu_connection, 1, None, make_config()))
+    assert swarm.large_text == "Riven"
+    assert lcu_connection.requested == [endpoint, endpoint] and lookup_memo.stats() == {"hits": 2, "misses": 2}
+
+    lookup_memo.clear() # Match ended
+    assert asyncio.run(lookup_memo.fetch(lcu_connection, endpoint, "Swarm champion details")) == {"name": "Riven"}
+    assert lcu_connection.requested == [endpoint] * 3
+
+
+def test_prefetched_skin_presentation_is_handed_to_the_match(lcu_connection):
+    lcu_connection.responses[AHRI_SKINS_ENDPOINT] = AHRI_SKINS
+    prefetcher = modes.SkinPresentationPrefetcher()
+
+    async def scenario():
+        prefetcher.select(lcu_connection, 1, 103, 103000)
+        prefetcher.select(lcu_connection, 1, 103, 103002) # Skin changed: the first warm-up is cancelled
+        await asyncio.sleep(0.01)
+        assert prefetcher.take(103, 103000) is None # Not the selection that was warmed
+        prefetcher.select(lcu_connection, 1, 103, 103002)
+        await asyncio.sleep(0.01)
+        return prefetcher.take(103, 103002)
+
+    presentation = asyncio.run(scenario())
+    requested = list(lcu_connection.requested)
+    assert asyncio.run(presentation.resolve(lcu_connection, 1, None, make_config())).skin_name == "Dynasty Ahri"
+    assert lcu_connection.requested == requested and presentation.lcu_fetches == 1 # The first frame renders from memory
+    assert prefetcher.take(103, 103002) is None # Handed over once
+
+
+def test_prefetch_in_flight_is_cancelled_not_raced(lcu_connection):
+    lcu_connection.responses[AHRI_SKINS_ENDPOINT] = AHRI_SKINS
+
+    async def scenario():
+        prefetcher = modes.SkinPresentationPrefetcher()
+        prefetcher.select(lcu_connection, 1, 103, 103002)
+        task = prefetcher._task
+        presentation = prefetcher.take(103, 103002) # The match started before the warm-up ran
+        await asyncio.sleep(0)
+        return presentation, task
+
+    presentation, task = asyncio.run(scenario())
+    assert presentation is None and task.cancelled()
+
+
+def test_bravery_prefetch_warms_the_champion_index(lcu_connection):
+    lcu_connection.responses["/lol-champions/v1/inventories/1/champions"] = [{"id": 103, "name": "Ahri", "skins": AHRI_SKINS}]
+
+    async def scenario():
+        prefetcher = modes.SkinPresentationPrefetcher()
+        prefetcher.select(lcu_connection, 1, -3, 0)
+        await asyncio.sleep(0.01)
+        return prefetcher.take(-3, 0)
+
+    assert asyncio.run(scenario()) is None # The champion is only known in game
+    assert modes.champion_index.champion_id("Ahri") == 103
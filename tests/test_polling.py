@@ -0,0 +1,64 @@
+import asyncio
+
+from src.polling import AdaptivePollScheduler, UNCHANGED_TICKS_BEFORE_BACKOFF, STEADY_INTERVAL_GROWTH
+
+
+def make_scheduler():
+    return AdaptivePollScheduler(base_interval=1.0, steady_max_interval=4.0, loading_max_interval=5.0, muted_interval=5.0)
+
+
+def test_steady_backoff_starts_after_unchanged_ticks_and_is_capped():
+    scheduler = make_scheduler()
+    for _ in range(UNCHANGED_TICKS_BEFORE_BACKOFF - 1):
+        scheduler.on_update(changed=False)
+        assert scheduler.next_interval == 1.0
+    scheduler.on_update(changed=False)
+    assert scheduler.next_interval == STEADY_INTERVAL_GROWTH
+    for _ in range(20):
+        scheduler.on_update(changed=False)
+    assert scheduler.next_interval == 4.0
+
+
+def test_change_returns_to_base_interval():
+    scheduler = make_scheduler()
+    for _ in range(10):
+        scheduler.on_update(changed=False)
+    scheduler.on_update(changed=True)
+    assert scheduler.next_interval == 1.0
+
+
+def test_loading_backs_off_exponentially_up_to_cap():
+    scheduler = make_scheduler()
+    intervals = []
+    for _ in range(5):
+        scheduler.on_loading()
+        intervals.append(scheduler.next_interval)
+    assert intervals == [1.0, 2.0, 4.0, 5.0, 5.0]
+    scheduler.on_update(changed=False) # First regular tick after loading
+    assert scheduler.next_interval == 1.0
+    scheduler.on_loading()
+    assert scheduler.next_interval == 1.0 # Loading backoff restarts from the base
+
+
+def test_muted_uses_muted_interval_then_resets():
+    scheduler = make_scheduler()
+    scheduler.on_muted()
+    assert scheduler.next_interval == 5.0
+    scheduler.on_update(changed=False)
+    assert scheduler.next_interval == 1.0
+
+
+def test_wake_ends_sleep_early():
+    async def scenario():
+        scheduler = AdaptivePollScheduler(base_interval=5.0)
+        asyncio.get_running_loop().call_later(0.01, scheduler.wake, "test")
+        await asyncio.wait_for(scheduler.sleep(), timeout=1.0)
+        woken = scheduler.woken_early
+        scheduler.next_interval = 0.01
+        await scheduler.sleep()
+        return woken, scheduler.woken_early, scheduler.stats()
+
+    woken, woken_after_timeout, stats = asyncio.run(scenario())
+    assert woken is True
+    assert woken_after_timeout is False
+    assert stats["ticks"] == 2 and stats["early_wakeups"] == 1
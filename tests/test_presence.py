@@ -0,0 +1,153 @@
+import asyncio
+from time import monotonic
+
+from src.presence import (presence_changed, PresenceSink, PresenceDispatcher, PresenceState, PresenceRenderLoop,
+                          PRESENCE_START_TOLERANCE, PRESENCE_CLEAR)
+
+
+class FakeRpc:
+    def __init__(self):
+        self.sent = [] # (monotonic time, payload or "clear")
+
+    def update(self, **payload):
+        self.sent.append((monotonic(), payload))
+
+    def clear(self):
+        self.sent.append((monotonic(), "clear"))
+
+
+def test_presence_changed_tolerates_small_timestamp_moves():
+    previous = {"details": "SR", "state": "In Game", "start": 1000}
+    assert not presence_changed(previous, {**previous, "start": 1000 + PRESENCE_START_TOLERANCE})
+    assert presence_changed(previous, {**previous, "start": 1000 + PRESENCE_START_TOLERANCE + 1})
+    assert presence_changed(previous, {**previous, "state": "In Game • 1/0/0"})
+    assert presence_changed(previous, {"details": "SR", "state": "In Game"}) # Key removed
+    assert presence_changed(None, previous) and not presence_changed(None, None)
+
+
+def test_sink_skips_unchanged_payloads_and_repeated_clears():
+    async def scenario():
+        rpc = FakeRpc()
+        sink = PresenceSink(rpc)
+        results = [await sink.update(details="SR", state="In Game", start=1000),
+                   await sink.update(details="SR", state="In Game", start=1001, large_image=None),
+                   await sink.clear(), await sink.clear()]
+        sink.invalidate()
+        results.append(await sink.clear())
+        return rpc, sink, results
+
+    rpc, sink, results = asyncio.run(scenario())
+    assert results == [True, False, True, False, True]
+    assert [payload if payload == "clear" else payload["state"] for _, payload in rpc.sent] == ["In Game", "clear", "clear"]
+    assert sink.stats() == {"sent": 3, "skipped": 2}
+
+
+def test_dispatcher_paces_sends_with_token_bucket_and_keeps_newest():
+    async def scenario():
+        rpc = FakeRpc()
+        dispatcher = PresenceDispatcher(PresenceSink(rpc), asyncio.Lock(), capacity=2, window=0.4) # One token per 0.2 s
+        started_at = monotonic()
+        dispatcher.submit({"state": "a"})
+        await asyncio.sleep(0.02)
+        dispatcher.submit({"state": "b"})
+        await asyncio.sleep(0.02)
+        dispatcher.submit({"state": "c"}) # Bucket is empty: waits for a token...
+        await asyncio.sleep(0.02)
+        dispatcher.submit({"state": "d"}) # ...and is replaced before it is sent
+        await asyncio.sleep(0.4)
+        await dispatcher.stop()
+        return rpc, dispatcher, started_at
+
+    rpc, dispatcher, started_at = asyncio.run(scenario())
+    assert [payload["state"] for _, payload in rpc.sent] == ["a", "b", "d"]
+    assert rpc.sent[2][0] - started_at >= 0.15 # Had to wait for a refill
+    assert dispatcher.stats()["coalesced"] == 1 and dispatcher.stats()["sent"] == 3
+
+
+def test_dispatcher_unchanged_payload_uses_no_token():
+    async def scenario():
+        rpc = FakeRpc()
+        dispatcher = PresenceDispatcher(PresenceSink(rpc), asyncio.Lock(), capacity=1, window=10.0)
+        dispatcher.submit({"state": "a"})
+        await asyncio.sleep(0.02)
+        dispatcher.submit({"state": "a"}) # Skipped by the sink before a token is needed
+        await asyncio.sleep(0.02)
+        stats = dispatcher.stats()
+        await dispatcher.stop()
+        return rpc, stats
+
+    rpc, stats = asyncio.run(scenario())
+    assert len(rpc.sent) == 1
+    assert stats["skipped_unchanged"] == 1
+
+
+def test_dispatcher_drops_updates_while_discord_disconnected():
+    async def scenario():
+        rpc = FakeRpc()
+        dispatcher = PresenceDispatcher(PresenceSink(rpc), asyncio.Lock(), is_connected=lambda: False)
+        dispatcher.submit(clear=True)
+        await asyncio.sleep(0.02)
+        await dispatcher.stop()
+        return rpc, dispatcher.stats()
+
+    rpc, stats = asyncio.run(scenario())
+    assert rpc.sent == [] and stats["dropped"] == 1
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, payload=None, clear=False):
+        self.submitted.append("clear" if clear else payload)
+
+
+def test_presence_state_records_causes_and_resets_on_phase_change():
+    presence_state = PresenceState()
+    presence_state.update("phase", phase="Lobby")
+    presence_state.update("idle-timer", idle_confirmed=True, idle_since=1000)
+    presence_state.update("phase", phase="Lobby") # Same phase: the idle confirmation is kept
+    assert presence_state.idle_confirmed and presence_state.changed.is_set()
+    causes, since = presence_state.take_changes()
+    assert causes == ["phase", "idle-timer"] and since is not None
+    assert not presence_state.changed.is_set() and presence_state.take_changes() == ([], None)
+
+    presence_state.submit({"details": "SR", "small_image": None})
+    assert presence_state.in_game == {"details": "SR"} # None fields are dropped
+    presence_state.update("phase", phase="InProgress")
+    assert (presence_state.idle_confirmed, presence_state.idle_since, presence_state.in_game) == (False, None, None)
+    presence_state.submit(clear=True)
+    assert presence_state.in_game is PRESENCE_CLEAR and presence_state.version == 6
+
+
+def test_render_loop_derives_once_per_batch_and_submits_only_changes():
+    async def scenario():
+        presence_state = PresenceState()
+        dispatcher = RecordingDispatcher()
+        shown = {"presence": {"details": "Lobby", "state": "In Lobby"}}
+        def derive():
+            if shown["presence"] == "boom":
+                raise ValueError("bad state")
+            return shown["presence"]
+        render_loop = PresenceRenderLoop(presence_state, derive, dispatcher)
+        render_loop.start()
+        for i in range(3): # A burst before the loop runs is rendered once
+            presence_state.update("session", session={"n": i})
+        await asyncio.sleep(0.01)
+        presence_state.update("chat", chat={}) # Derives the same presence: not resubmitted
+        await asyncio.sleep(0.01)
+        for presence in ("boom", None, PRESENCE_CLEAR, {"details": "Lobby", "state": "In Lobby"}): # An error or None keeps what is shown
+            shown["presence"] = presence
+            presence_state.update("phase", phase=str(presence))
+            await asyncio.sleep(0.01)
+        render_loop.invalidate() # Discord reconnected
+        presence_state.update("chat", chat={})
+        await asyncio.sleep(0.01)
+        await render_loop.stop()
+        return dispatcher.submitted, render_loop.stats()
+
+    submitted, stats = asyncio.run(scenario())
+    lobby = {"details": "Lobby", "state": "In Lobby"}
+    assert submitted == [lobby, "clear", lobby, lobby]
+    assert (stats["renders"], stats["emits"]) == (7, 4)
+    assert set(stats["latency"]) == {"session", "phase", "chat"} and stats["latency"]["phase"]["count"] == 2
@@ -0,0 +1,59 @@
+import pytest
+
+from src import timeline
+from src.timeline import StatsTimeline, read_timeline, TIMELINE_RECORD
+
+
+@pytest.fixture(autouse=True)
+def timeline_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeline, "TIMELINE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_round_trip_across_ring_buffer_flushes(timeline_dir):
+    stats_timeline = StatsTimeline("match", capacity=4)
+    expected = []
+    for second in range(10):
+        sample = (float(second * 10), second, 1, 2, second * 5, 1 + second // 3)
+        assert stats_timeline.record(*sample)
+        expected.append(sample)
+        if stats_timeline.flush_due: # As the in-game loop does, in a thread
+            stats_timeline.flush()
+    stats_timeline.close()
+
+    assert stats_timeline.flushes == 2 # Each flush also wrote the sample that filled the buffer, so close had nothing left
+    assert read_timeline(stats_timeline.path) == expected
+
+
+def test_record_never_writes_to_disk(timeline_dir):
+    stats_timeline = StatsTimeline("match", capacity=2)
+    for second in range(5):
+        stats_timeline.record(float(second), second, 0, 0, 0, 1)
+    assert stats_timeline.flush_due and stats_timeline.flushes == 0
+    assert not (timeline_dir / "match.dlt").exists()
+    stats_timeline.flush()
+    assert not stats_timeline.flush_due and stats_timeline.flushes == 1
+    assert [sample[1] for sample in read_timeline(stats_timeline.path)] == [0, 1, 2, 3, 4]
+
+
+def test_unchanged_and_malformed_samples_are_skipped(timeline_dir):
+    stats_timeline = StatsTimeline("match", capacity=8)
+    assert stats_timeline.record_scores(1.0, {"kills": 1, "creepScore": 10}, 2)
+    assert not stats_timeline.record_scores(2.0, {"kills": 1, "creepScore": 10}, 2)
+    assert not stats_timeline.record_scores(3.0, {"kills": "n/a"}, 2)
+    stats_timeline.close()
+    assert read_timeline(stats_timeline.path) == [(1.0, 1, 0, 0, 10, 2)]
+
+
+def test_torn_record_and_unknown_format(timeline_dir):
+    stats_timeline = StatsTimeline("match", capacity=8)
+    stats_timeline.record(5.0, 1, 2, 3, 4, 5)
+    stats_timeline.close()
+    with open(stats_timeline.path, "ab") as f:
+        f.write(b"\x00" * (TIMELINE_RECORD.size - 1)) # Crash mid-write
+    assert read_timeline(stats_timeline.path) == [(5.0, 1, 2, 3, 4, 5)]
+
+    bad_path = timeline_dir / "bad.dlt"
+    bad_path.write_bytes(b"NOPE\x01" + b"\x00" * TIMELINE_RECORD.size)
+    assert read_timeline(str(bad_path)) == []
+    assert read_timeline(str(timeline_dir / "missing.dlt")) == []
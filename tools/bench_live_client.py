@@ -0,0 +1,149 @@
+"""
+Headless benchmark of the in-game polling path against tools/live_client_emulator.py.
+
+Starts the emulator in-process and runs the real updateInProgressRPC loop against it, with a stub LCU connection
+for the skin art, then reports wall/CPU time per tick, Live Client requests per endpoint and connection reuse.
+Game speeds other than 1 make the Live Client events disagree with the local game clock, so the loop resyncs often.
+
+    python tools/bench_live_client.py --ticks 200 --players 16 --latency-ms 2 --port 0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import live_client_emulator as emulator
+
+BENCH_CHAMPION_ID = 103 # Ahri, the emulator's active player
+BENCH_SKINS = [{"id": BENCH_CHAMPION_ID * 1000, "isBase": True, "name": "Ahri", "tilePath": "/lol-game-data/assets/bench/tile.png"}]
+BENCH_MAP = {"name": "Summoner's Rift", "mapStringId": "SR", "id": 11, "gameMode": "CLASSIC"}
+BENCH_QUEUE = {"description": "Ranked Solo/Duo", "type": "RANKED_SOLO_5x5", "category": "PvP", "gameMode": "CLASSIC"}
+
+
+class _StubLcuResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+
+class StubLcuConnection:
+    """Answers the champion skins request the in-game loop makes; every other LCU request gets a 404."""
+    def __init__(self):
+        self.requests = 0
+
+    async def request(self, method, endpoint):
+        self.requests += 1
+        if endpoint.endswith(f"/champions/{BENCH_CHAMPION_ID}/skins"):
+            return _StubLcuResponse(200, BENCH_SKINS)
+        return _StubLcuResponse(404, {})
+
+
+async def run_ticks(ticks, interval, port):
+    from src import gamestats
+    from src.modes import updateInProgressRPC
+    from src.polling import AdaptivePollScheduler
+    from src.presence import PresenceState
+
+    class TimedPollScheduler(AdaptivePollScheduler):
+        """Fixed-interval scheduler that records the wall and CPU time of each tick, i.e. the work between two sleeps."""
+        def __init__(self):
+            super().__init__(base_interval=interval, steady_max_interval=interval, loading_max_interval=interval, muted_interval=interval)
+            self.wall_times, self.cpu_times = [], []
+            self._tick_started = (time.perf_counter(), time.process_time())
+
+        async def sleep(self):
+            wall_started, cpu_started = self._tick_started
+            self.wall_times.append(time.perf_counter() - wall_started)
+            self.cpu_times.append(time.process_time() - cpu_started)
+            await super().sleep()
+            self._tick_started = (time.perf_counter(), time.process_time())
+
+    gamestats.LIVE_CLIENT_API_BASE_URL = f"https://{emulator.HOST}:{port}/liveclientdata"
+    poll_scheduler = TimedPollScheduler()
+    presence_state = PresenceState()
+    lcu_connection = StubLcuConnection()
+    await updateInProgressRPC(lambda: poll_scheduler.ticks >= ticks, time.time(), (BENCH_CHAMPION_ID, BENCH_CHAMPION_ID * 1000),
+                              BENCH_MAP, None, BENCH_QUEUE, {"gameId": "bench"}, "Ahri", "Ahri", lcu_connection, 1,
+                              {"inGame": "In Game"}, presence_state, poll_scheduler)
+
+    connection_stats = {**gamestats.get_live_client_connection_stats(), **gamestats.get_response_cache_stats()}
+    await gamestats.close_live_client_session()
+    return poll_scheduler, presence_state.version, lcu_connection.requests, connection_stats
+
+
+def _prepare_appdata():
+    """
+    src.utilities reads its config from APPDATA at import time. Without one, the benchmark uses a temporary
+    APPDATA with a config pointing at a stub Riot Games folder, so loading it never prompts for the path.
+    Returns the temporary directory, or None if APPDATA was already set.
+    """
+    if "APPDATA" in os.environ:
+        return None
+    appdata_dir = tempfile.mkdtemp(prefix="lol-bench-appdata-")
+    riot_games_path = os.path.join(appdata_dir, "Riot Games")
+    for folder in ("League of Legends", "Riot Client"):
+        os.makedirs(os.path.join(riot_games_path, folder))
+    os.makedirs(os.path.join(appdata_dir, "DetailedLoLRPC"))
+    with open(os.path.join(appdata_dir, "DetailedLoLRPC", "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"riotPath": riot_games_path}, f)
+    os.environ["APPDATA"] = appdata_dir
+    return appdata_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the in-game Live Client polling path.")
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds between ticks.")
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speed", type=float, default=1.0, help="Game seconds replayed per real second.")
+    parser.add_argument("--loading-seconds", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=emulator.PORT, help="Port for the emulator and the client; 0 picks a free one.")
+    parser.add_argument("--timeline")
+    args = parser.parse_args(argv)
+
+    appdata_dir = _prepare_appdata()
+    timeline = emulator.load_timeline(args.timeline) if args.timeline else emulator.build_synthetic_timeline(args.players, seed=args.seed)
+    cert_dir = tempfile.mkdtemp(prefix="lol-live-client-emulator-")
+    certfile, keyfile = emulator.generate_self_signed_cert(cert_dir)
+    state = emulator.EmulatorState(timeline, args.loading_seconds, args.speed, args.latency_ms, args.jitter_ms, args.seed)
+    server = emulator.start_emulator(state, certfile, keyfile, port=args.port)
+    port = server.server_address[1]
+    try:
+        poll_scheduler, presence_updates, lcu_requests, connection_stats = asyncio.run(run_ticks(args.ticks, args.interval, port))
+    finally:
+        server.shutdown()
+        shutil.rmtree(cert_dir, ignore_errors=True)
+        if appdata_dir:
+            shutil.rmtree(appdata_dir, ignore_errors=True)
+
+    wall_ms = sorted(t * 1000 for t in poll_scheduler.wall_times)
+    live_client_requests = state.stats()["requests"]
+    total_requests = sum(live_client_requests.values())
+    print(f"Emulator port: {port}")
+    print(f"Ticks: {len(wall_ms)} ({poll_scheduler.loading_ticks} loading)")
+    print(f"Wall per tick: mean {statistics.mean(wall_ms):.2f} ms, p50 {wall_ms[len(wall_ms) // 2]:.2f} ms, p95 {wall_ms[int(len(wall_ms) * 0.95) - 1]:.2f} ms")
+    print(f"CPU per tick: mean {statistics.mean(poll_scheduler.cpu_times) * 1000:.2f} ms")
+    print(f"Live Client requests: {total_requests} ({total_requests / len(wall_ms):.2f} per tick) {live_client_requests}")
+    print(f"Client connections: {connection_stats}")
+    print(f"Presence state updates: {presence_updates}, LCU requests: {lcu_requests}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
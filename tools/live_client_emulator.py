@@ -0,0 +1,315 @@
+"""
+Deterministic emulator of the League of Legends Live Client API, for exercising src/gamestats.py
+and src/modes.py without a running game.
+
+Serves https://127.0.0.1:2999/liveclientdata/{activeplayername,activeplayer,playerlist,playerscores,gamestats,allgamedata,eventdata}
+with a self-signed certificate and replays a timeline: either a recorded one (--timeline file.json)
+or a synthetic one generated from a seed (--players, --seed). Uses only the standard library and the
+openssl CLI (for the certificate), so it runs on a headless Linux box.
+
+    python tools/live_client_emulator.py --players 16 --loading-seconds 10 --latency-ms 5
+
+Timeline format (JSON):
+    {
+        "activePlayer": "Name#TAG",
+        "frames": [{"gameTime": 0.0, "players": [<playerlist entry>, ...]}, ...],
+        "events": [{"EventID": 0, "EventName": "GameStart", "EventTime": 0.0}, ...]
+    }
+Each request is answered from the last frame whose gameTime is at or before the emulated game time.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import signal
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+HOST = "127.0.0.1"
+PORT = 2999
+API_PREFIX = "/liveclientdata/"
+
+CHAMPIONS = ["Ahri", "Garen", "Lux", "Jinx", "Thresh", "LeeSin", "Yasuo", "Ezreal", "Leona", "Darius",
+             "Annie", "MissFortune", "Nautilus", "Zed", "Sona", "Vi"]
+
+
+def build_synthetic_timeline(player_count=10, duration=1800, seed=0):
+    """Builds a deterministic timeline: one frame per second, kills every ~45s, CS and levels growing steadily."""
+    rng = random.Random(seed)
+    players = []
+    for index in range(player_count):
+        riot_id = f"Player{index}#EMU"
+        players.append({
+            "riotId": riot_id,
+            "riotIdGameName": f"Player{index}",
+            "riotIdTagLine": "EMU",
+            "summonerName": riot_id,
+            "championName": CHAMPIONS[index % len(CHAMPIONS)],
+            "skinID": index % 3,
+            "team": "ORDER" if index < player_count / 2 else "CHAOS",
+            "isBot": False,
+            "isDead": False,
+            "level": 1,
+            "scores": {"kills": 0, "deaths": 0, "assists": 0, "creepScore": 0, "wardScore": 0.0},
+        })
+
+    events = [{"EventID": 0, "EventName": "GameStart", "EventTime": 0.0}]
+    kills = {player["riotId"]: [0, 0, 0] for player in players}
+    frames = []
+    next_kill_at = 45.0
+    for second in range(duration + 1):
+        game_time = float(second)
+        if game_time >= next_kill_at and player_count > 1:
+            killer, victim = rng.sample(players, 2)
+            kills[killer["riotId"]][0] += 1
+            kills[victim["riotId"]][1] += 1
+            events.append({
+                "EventID": len(events), "EventName": "ChampionKill", "EventTime": game_time,
+                "KillerName": killer["riotIdGameName"], "VictimName": victim["riotIdGameName"], "Assisters": []
+            })
+            next_kill_at += rng.uniform(20.0, 70.0)
+        frame_players = []
+        for index, player in enumerate(players):
+            k, d, a = kills[player["riotId"]]
+            frame_players.append({
+                **player,
+                "level": min(18, 1 + second // 90),
+                "scores": {"kills": k, "deaths": d, "assists": a, "creepScore": max(0, (second - 90) // 6 + index % 3), "wardScore": 0.0},
+            })
+        frames.append({"gameTime": game_time, "players": frame_players})
+    events.append({"EventID": len(events), "EventName": "GameEnd", "EventTime": float(duration), "Result": "Win"})
+
+    return {"activePlayer": players[0]["riotId"], "frames": frames, "events": events}
+
+
+def load_timeline(path):
+    with open(path, "r", encoding="utf-8") as f:
+        timeline = json.load(f)
+    if not timeline.get("frames") or not timeline.get("activePlayer"):
+        raise ValueError(f"Timeline {path} needs 'activePlayer' and a non-empty 'frames' list.")
+    timeline["frames"].sort(key=lambda frame: frame["gameTime"])
+    timeline.setdefault("events", [])
+    return timeline
+
+
+class EmulatorState:
+    """The replay clock plus per-endpoint request counters, shared by all handler threads."""
+    def __init__(self, timeline, loading_seconds=0.0, speed=1.0, latency_ms=0.0, jitter_ms=0.0, seed=0):
+        self.timeline = timeline
+        self.loading_seconds = loading_seconds
+        self.speed = speed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self.request_counts = {}
+        self.bytes_sent = 0
+
+    def game_time(self):
+        """Emulated game time, or None during the loading phase."""
+        elapsed = time.monotonic() - self._started_at - self.loading_seconds
+        if elapsed < 0:
+            return None
+        return min(elapsed * self.speed, self.timeline["frames"][-1]["gameTime"])
+
+    def frame_at(self, game_time):
+        frames = self.timeline["frames"]
+        low, high = 0, len(frames) - 1
+        while low < high: # Last frame with gameTime <= game_time
+            mid = (low + high + 1) // 2
+            if frames[mid]["gameTime"] <= game_time:
+                low = mid
+            else:
+                high = mid - 1
+        return frames[low]
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay_ms = max(0.0, self.latency_ms + jitter)
+        if delay_ms:
+            time.sleep(delay_ms / 1000.0)
+
+    def record(self, endpoint, size):
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            self.bytes_sent += size
+
+    def stats(self):
+        with self._lock:
+            return {"requests": dict(self.request_counts), "bytesSent": self.bytes_sent, "gameTime": self.game_time()}
+
+
+def _active_player_payload(timeline, frame, game_time):
+    active_name = timeline["activePlayer"]
+    entry = next((player for player in frame["players"] if player.get("riotId") == active_name), {})
+    game_name, _, tag_line = active_name.partition("#")
+    return {
+        "riotId": active_name, "riotIdGameName": game_name, "riotIdTagLine": tag_line,
+        "summonerName": active_name, "level": entry.get("level", 1), "currentGold": round(500 + game_time * 2.1, 1),
+    }
+
+
+def _events_since(timeline, game_time, first_event_id):
+    return [event for event in timeline["events"] if event["EventTime"] <= game_time and event["EventID"] >= first_event_id]
+
+
+def make_handler(state):
+    class LiveClientHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, like the game
+        disable_nagle_algorithm = True # Headers and body go out in separate writes; Nagle would add ~40ms per response
+
+        def _send(self, status, payload, endpoint):
+            body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            state.record(endpoint, len(body))
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/emulator/stats":
+                self._send(200, state.stats(), "emulator/stats")
+                return
+            if not parsed.path.startswith(API_PREFIX):
+                self._send(404, {"errorCode": "RESOURCE_NOT_FOUND"}, "unknown")
+                return
+
+            endpoint = parsed.path[len(API_PREFIX):]
+            state.delay()
+            game_time = state.game_time()
+            if game_time is None: # Loading screen: the game answers 404 until the match starts
+                self._send(404, {"errorCode": "RESOURCE_NOT_FOUND", "message": "Loading"}, endpoint)
+                return
+
+            timeline = state.timeline
+            frame = state.frame_at(game_time)
+            game_stats = {"gameMode": "CLASSIC", "gameTime": round(game_time, 3), "mapName": "Map11", "mapNumber": 11, "mapTerrain": "Default"}
+
+            if endpoint == "activeplayername":
+                self._send(200, timeline["activePlayer"], endpoint)
+            elif endpoint == "activeplayer":
+                self._send(200, _active_player_payload(timeline, frame, game_time), endpoint)
+            elif endpoint == "playerlist":
+                self._send(200, frame["players"], endpoint)
+            elif endpoint == "playerscores":
+                query = parse_qs(parsed.query)
+                player_id = (query.get("riotId") or query.get("summonerName") or [""])[0]
+                entry = next((player for player in frame["players"] if player_id in (player.get("riotId"), player.get("summonerName"))), None)
+                if entry is None:
+                    self._send(400, {"errorCode": "BAD_REQUEST", "message": "Player not found"}, endpoint)
+                else:
+                    self._send(200, entry.get("scores", {}), endpoint)
+            elif endpoint == "gamestats":
+                self._send(200, game_stats, endpoint)
+            elif endpoint == "eventdata":
+                first_event_id = int(parse_qs(parsed.query).get("eventID", ["0"])[0])
+                self._send(200, {"Events": _events_since(timeline, game_time, first_event_id)}, endpoint)
+            elif endpoint == "allgamedata":
+                self._send(200, {
+                    "activePlayer": _active_player_payload(timeline, frame, game_time),
+                    "allPlayers": frame["players"],
+                    "events": {"Events": _events_since(timeline, game_time, 0)},
+                    "gameData": game_stats,
+                }, endpoint)
+            else:
+                self._send(404, {"errorCode": "RESOURCE_NOT_FOUND"}, endpoint)
+
+        def log_message(self, format, *args):
+            pass # One line per request would dominate the benchmark
+
+    return LiveClientHandler
+
+
+def generate_self_signed_cert(directory):
+    if not shutil.which("openssl"):
+        raise RuntimeError("openssl was not found on PATH. Pass --certfile and --keyfile instead.")
+    certfile = os.path.join(directory, "emulator-cert.pem")
+    keyfile = os.path.join(directory, "emulator-key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", f"/CN={HOST}", "-keyout", keyfile, "-out", certfile],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return certfile, keyfile
+
+
+def start_emulator(state, certfile, keyfile, host=HOST, port=PORT):
+    """Starts the HTTPS server on a daemon thread and returns it; call server.shutdown() to stop."""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, name="live-client-emulator", daemon=True).start()
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a League of Legends Live Client API timeline on https://127.0.0.1:2999.")
+    parser.add_argument("--timeline", help="Recorded timeline JSON to replay. Defaults to a synthetic timeline.")
+    parser.add_argument("--write-timeline", help="Write the synthetic timeline to this file and exit.")
+    parser.add_argument("--players", type=int, default=10, help="Player count for the synthetic timeline (default 10; Arena uses 16).")
+    parser.add_argument("--duration", type=int, default=1800, help="Synthetic match length in game seconds.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic timeline and latency jitter.")
+    parser.add_argument("--loading-seconds", type=float, default=0.0, help="Answer 404 for this many seconds before the match starts.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Game seconds replayed per real second.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added response latency.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the added latency.")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.timeline:
+        timeline = load_timeline(args.timeline)
+    else:
+        timeline = build_synthetic_timeline(args.players, args.duration, args.seed)
+    if args.write_timeline:
+        with open(args.write_timeline, "w", encoding="utf-8") as f:
+            json.dump(timeline, f)
+        print(f"Synthetic timeline written to {args.write_timeline}.")
+        return 0
+
+    cert_dir = None
+    certfile, keyfile = args.certfile, args.keyfile
+    if not certfile or not keyfile:
+        cert_dir = tempfile.mkdtemp(prefix="lol-live-client-emulator-")
+        certfile, keyfile = generate_self_signed_cert(cert_dir)
+
+    state = EmulatorState(timeline, args.loading_seconds, args.speed, args.latency_ms, args.jitter_ms, args.seed)
+    server = start_emulator(state, certfile, keyfile, port=args.port)
+    print(f"Live Client API emulator listening on https://{HOST}:{args.port}{API_PREFIX} "
+          f"({len(timeline['frames'][0]['players'])} players, loading {args.loading_seconds}s). Ctrl+C to stop.", flush=True)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    try:
+        while not stop_event.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"Emulator stats: {json.dumps(state.stats())}", flush=True)
+        if cert_dir:
+            shutil.rmtree(cert_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())